@@ -1,30 +1,143 @@
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import classification_report
-import joblib
+import numpy as np
+
+# scikit-learn, joblib and pandas (via columnar) are imported inside the methods
+# that need them, so importing this module does not pay their start-up cost.
+
+# Labels: 1 = BUY, -1 = SELL, 0 = HOLD
+CLASSES = np.array([-1, 0, 1])
+
+
+def make_online_model():
+    """Scaler + logistic-loss SGD classifier; both support partial_fit."""
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    return Pipeline([
+        ("scaler", StandardScaler()),
+        ("clf", SGDClassifier(loss="log_loss", random_state=42)),
+    ])
 
 class AIModel:
-    def __init__(self, model_path='ai_model.pkl'):
+    def __init__(self, model_path='ai_model.pkl', fast=True):
         self.model_path = model_path
         self.model = None
+        # Use the NumPy linear fast path when the model exposes coefficients
+        self.fast = fast
+        self._coef = None
+        self._intercept = None
+        self._classes = None
 
     def train(self, csv_path, feature_cols, target_col):
-        df = pd.read_csv(csv_path)
-        X = df[feature_cols]
-        y = df[target_col]
+        from columnar import open_csv
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.metrics import classification_report
+        from sklearn.model_selection import train_test_split
+        # Memory-mapped columns: the feature matrix is built without a DataFrame round-trip
+        df = open_csv(csv_path)
+        X = np.column_stack([df[col] for col in feature_cols])
+        y = np.asarray(df[target_col])
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
         self.model = LogisticRegression(max_iter=1000)
         self.model.fit(X_train, y_train)
+        self._extract_coefficients()
         y_pred = self.model.predict(X_test)
         print(classification_report(y_test, y_pred))
+        self.save()
+
+    def train_from_ohlcv(self, csv_path, bot=None, horizon=5, threshold=0.0):
+        """Fit on features regenerated from raw bars, so training matches live features."""
+        from columnar import open_csv
+        from features import training_set
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.metrics import classification_report
+        from sklearn.model_selection import train_test_split
+        X, y = training_set(open_csv(csv_path), bot=bot, horizon=horizon, threshold=threshold)
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        self.model = LogisticRegression(max_iter=1000)
+        self.model.fit(X_train, y_train)
+        self._extract_coefficients()
+        print(classification_report(y_test, self.model.predict(X_test), zero_division=0))
+        self.save()
+
+    def partial_fit(self, X, y, classes=CLASSES):
+        """Incrementally update an online model on new labeled rows (no full refit)."""
+        from sklearn.pipeline import Pipeline
+        if self.model is None:
+            self.model = make_online_model()
+        if not isinstance(self.model, Pipeline):
+            raise ValueError(f"{type(self.model).__name__} does not support partial_fit; "
+                             "start from make_online_model() instead")
+        X = np.asarray(X, dtype="float64")
+        scaler = self.model.named_steps["scaler"]
+        clf = self.model.named_steps["clf"]
+        scaler.partial_fit(X)
+        clf.partial_fit(scaler.transform(X), np.asarray(y), classes=np.asarray(classes))
+        self._extract_coefficients()
+
+    def save(self):
+        import joblib
         joblib.dump(self.model, self.model_path)
         print(f"Model saved to {self.model_path}")
 
     def load(self):
+        import joblib
         self.model = joblib.load(self.model_path)
+        self._extract_coefficients()
 
-    def predict(self, features):
+    @property
+    def loaded(self):
+        return self.model is not None
+
+    def _extract_coefficients(self):
+        """Cache the linear decision function of a logistic-regression-like model.
+
+        For a scaler + linear pipeline the scaling is folded into the
+        coefficients, so the fast path is still a single matrix product.
+        """
+        from sklearn.linear_model import LogisticRegression, SGDClassifier
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import StandardScaler
+        self._coef = self._intercept = self._classes = None
+        model = self.model
+        mean, scale = None, None
+        if isinstance(model, Pipeline):
+            if len(model.steps) != 2 or not isinstance(model.steps[0][1], StandardScaler):
+                return
+            scaler, model = model.steps[0][1], model.steps[1][1]
+            if getattr(scaler, "scale_", None) is None or not scaler.with_mean:
+                return
+            mean, scale = scaler.mean_, scaler.scale_
+        if not isinstance(model, (LogisticRegression, SGDClassifier)) or not hasattr(model, "coef_"):
+            return
+        coef = np.asarray(model.coef_, dtype="float64").T
+        intercept = np.asarray(model.intercept_, dtype="float64")
+        if scale is not None:
+            coef = coef / scale[:, None]
+            intercept = intercept - mean @ coef
+        self._coef = np.ascontiguousarray(coef)
+        self._intercept = intercept
+        self._classes = np.asarray(model.classes_)
+
+    def predict_batch(self, features, fast=None):
+        """Predict one label per row of a 2-D feature matrix in a single call.
+
+        A batch with a NaN or infinite feature skips the fast path and goes to
+        ``self.model.predict``, so those rows get the model's own answer (or error).
+        """
         if self.model is None:
-            self.load()
-        return self.model.predict([features])[0]
+            raise RuntimeError(f"AI model not loaded (call load() at startup): {self.model_path}")
+        X = np.asarray(features, dtype="float64")
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        fast = self.fast if fast is None else fast
+        # A NaN score compares False and argmaxes to 0, which would quietly pick classes_[0]
+        if fast and self._coef is not None and np.isfinite(X).all():
+            # Same rule as LogisticRegression.predict: sign for binary, argmax otherwise
+            scores = X @ self._coef + self._intercept
+            if scores.shape[1] == 1:
+                return self._classes[(scores[:, 0] > 0).astype(np.intp)]
+            return self._classes[scores.argmax(axis=1)]
+        return self.model.predict(X)
+
+    def predict(self, features):
+        return self.predict_batch([features])[0]
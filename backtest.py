@@ -1,5 +1,5 @@
-import pandas as pd
 from bot import MomentumBot
+from performance import PerformanceTracker
 
 if __name__ == "__main__":
     # Path to your historical CSV file
@@ -7,11 +7,20 @@ if __name__ == "__main__":
 
     # Initialize your bot
     bot = MomentumBot()
+    initial_balance = bot.account_balance
+
+    # Trades and the per-bar equity curve are appended to the CSVs in batches as they are produced
+    performance = PerformanceTracker("equity_curve.csv", "backtest_trades.csv")
 
     # Run backtest
-    results = bot.backtest_from_csv(csv_path)
+    trades, equity_curve = bot.backtest_from_csv(csv_path, performance=performance)
+    performance.close()
 
     # Show results
-    print(results)
-    # Optionally, save to a new CSV
-    results.to_csv("backtest_results.csv", index=False)
+    print(trades)
+    print(f"💰 Final Balance: ${bot.account_balance:,.2f} (start ${initial_balance:,.2f})")
+    print(f"📈 Final Equity: ${equity_curve['equity'].iloc[-1]:,.2f} over {len(equity_curve)} bars")
+    m = performance.metrics()
+    print(f"📊 Return {m['total_return']:.2%} | Sharpe {m['sharpe']:.2f} | Sortino {m['sortino']:.2f} | "
+          f"max DD {m['max_drawdown']:.2%} | profit factor {m['profit_factor']:.2f} | "
+          f"win rate {m['win_rate']:.0%} over {m['trades']} trades | exposure {m['exposure']:.0%}")
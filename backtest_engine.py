@@ -0,0 +1,249 @@
+import numpy as np
+import pandas as pd
+
+import kernels
+from indicators import MIN_HISTORY
+
+
+def ema_column(close, window):
+    """EMA of ``close`` per bar; NaN until ``window`` bars are available."""
+    close = pd.Series(np.asarray(close, dtype="float64"))
+    ema = close.ewm(span=window, adjust=False).mean().to_numpy()
+    return np.where(np.arange(1, len(close) + 1) >= window, ema, np.nan)
+
+
+def stochastic_columns(high, low, close, k_period=14, d_period=3):
+    """EMA-smoothed stochastic ``(%K, %D)`` per bar, as in ``calculate_stochastic``."""
+    k_percent, d_percent = kernels.stochastic(high, low, close, k_period, d_period)
+    ready = np.arange(1, len(k_percent) + 1) >= k_period + d_period
+    return np.where(ready, k_percent, np.nan), np.where(ready, d_percent, np.nan)
+
+
+def awesome_oscillator_columns(high, low, fast_period=1, slow_period=34):
+    """Awesome Oscillator ``(current, previous)`` per bar, as in ``calculate_awesome_oscillator``."""
+    ao = kernels.awesome_oscillator(high, low, fast_period, slow_period)
+    ready = np.arange(1, len(ao) + 1) >= slow_period
+    ao_prev = np.concatenate(([np.nan], ao[:-1]))
+    return np.where(ready, ao, np.nan), np.where(ready, ao_prev, np.nan)
+
+
+def atr_column(high, low, close, window=14):
+    """Average True Range per bar, as in ``calculate_atr``."""
+    atr = kernels.atr(high, low, close, window)
+    return np.where(np.arange(1, len(atr) + 1) >= window + 1, atr, np.nan)
+
+
+def compute_indicator_frame(close, high, low, ema_windows=(13, 20, 50), k_period=14, d_period=3,
+                            ao_fast=1, ao_slow=34, atr_window=14):
+    """Compute every indicator column used by ``momentum_strategy`` for the whole history in one pass.
+
+    Each row holds the value ``momentum_strategy`` would see with the history
+    truncated at that row; rows where the per-call method returns ``None`` are NaN.
+    """
+    cols = {}
+    for window in ema_windows:
+        cols[f"ema_{window}"] = ema_column(close, window)
+    cols["stoch_k"], cols["stoch_d"] = stochastic_columns(high, low, close, k_period, d_period)
+    cols["ao_current"], cols["ao_prev"] = awesome_oscillator_columns(high, low, ao_fast, ao_slow)
+    cols["atr"] = atr_column(high, low, close, atr_window)
+    return pd.DataFrame(cols)
+
+
+def bot_indicator_frame(bot, df):
+    """``compute_indicator_frame`` for ``df`` using the parameters configured on ``bot``."""
+    return compute_indicator_frame(
+        np.asarray(df["Close"], dtype="float64"), np.asarray(df["High"], dtype="float64"),
+        np.asarray(df["Low"], dtype="float64"), ema_windows=bot.ema_windows,
+        k_period=bot.k_period, d_period=bot.d_period, ao_fast=bot.ao_fast, ao_slow=bot.ao_slow)
+
+
+def consensus_votes(close, indicators, ema_windows=(13, 20, 50), overbought=80, oversold=20,
+                    min_history=MIN_HISTORY):
+    """Derive the 2 out of 3 vote of ``momentum_strategy`` as boolean arrays.
+
+    Returns ``(buy, sell, trend)`` where ``trend`` is +1 for UPTREND, -1 for
+    DOWNTREND and 0 for NEUTRAL. ``close`` may also be a ``(symbols x bars)``
+    matrix with matching indicator matrices (see cross_section.py).
+    """
+    close = np.asarray(close, dtype="float64")
+    fast, mid, slow = (np.asarray(indicators[f"ema_{w}"]) for w in ema_windows)
+    with np.errstate(invalid="ignore"):
+        ema_buy = (fast > mid) & (mid > slow) & (close > fast)
+        ema_sell = (fast < mid) & (mid < slow) & (close < fast)
+
+        k = np.asarray(indicators["stoch_k"])
+        d = np.asarray(indicators["stoch_d"])
+        oversold_both = (k < oversold) & (d < oversold)
+        overbought_both = (k > overbought) & (d > overbought)
+        stoch_buy = oversold_both | (~overbought_both & (k > d))
+        stoch_sell = ~oversold_both & (overbought_both | (k < d))
+
+        cur = np.asarray(indicators["ao_current"])
+        prev = np.asarray(indicators["ao_prev"])
+        ao_buy = (prev <= 0) & (cur > 0)
+        ao_sell = (prev >= 0) & (cur < 0)
+
+    ready = np.arange(1, close.shape[-1] + 1) >= min_history
+    buy_votes = ema_buy.astype(np.int8) + stoch_buy + ao_buy
+    sell_votes = ema_sell.astype(np.int8) + stoch_sell + ao_sell
+    buy = ready & (buy_votes >= 2)
+    sell = ready & (sell_votes >= 2)
+    trend = ema_buy.astype(np.int8) - ema_sell.astype(np.int8)
+    return buy, sell, trend
+
+
+TREND_NAMES = {1: "UPTREND", -1: "DOWNTREND", 0: "NEUTRAL"}
+
+
+def run_backtest(bot, df, indicators=None, start=0, stop=None, performance=None):
+    """Replay ``df`` through the bot's entry/exit rules and return ``(trades, equity_curve)``.
+
+    Indicators and votes are computed vectorized; only the position loop is
+    sequential.  Per bar the loop mirrors main.py: ``check_exit_conditions``
+    on the close first, then a new trade on a consensus signal when flat.
+    Strategy and risk parameters come from ``bot``; sizing uses
+    ``bot.calculate_position_size`` and levels use
+    ``bot.calculate_stop_loss_take_profit``, so the account accounting matches
+    ``execute_trade``: a short's sale credits cash and its ``pnl`` is
+    ``(entry - exit) * size``.  ``bot.account_balance`` is updated in place.
+
+    ``df`` may be a DataFrame or a memory-mapped ``columnar.ColumnarFrame``.
+    ``indicators`` may be a precomputed frame (or dict of columns) aligned with
+    ``df``.  ``start``/``stop`` restrict trading to a bar range while the
+    indicators still see the full history before it, which is what
+    walk-forward testing needs.
+
+    With a ``performance.PerformanceTracker`` the equity curve and closed
+    trades are also folded into its running metrics (and its CSV files).
+    """
+    close_arr = np.asarray(df["Close"], dtype="float64")
+    if indicators is None:
+        indicators = bot_indicator_frame(bot, df)
+    buy, sell, trend = consensus_votes(close_arr, indicators, ema_windows=bot.ema_windows,
+                                       overbought=bot.overbought, oversold=bot.oversold)
+
+    n = len(close_arr) if stop is None else min(stop, len(close_arr))
+    close = close_arr.tolist()
+    atr = np.asarray(indicators["atr"]).tolist()
+    trend_list = trend.tolist()
+    signal_idx = (np.flatnonzero((buy | sell)[start:n]) + start).tolist()
+    is_buy = buy.tolist()
+
+    # Cash/holding change only at trade events; record them and forward-fill afterwards
+    event_bars = [start]
+    event_cash = [bot.account_balance]
+    event_size = [0.0]
+    trades = []
+
+    balance = bot.account_balance
+    i = 0
+    next_signal = 0
+    n_signals = len(signal_idx)
+    while next_signal < n_signals:
+        i = signal_idx[next_signal]
+        next_signal += 1
+        side = "BUY" if is_buy[i] else "SELL"
+        direction = 1 if is_buy[i] else -1
+        entry = close[i]
+        bar_atr = atr[i]
+        bar_atr = None if bar_atr != bar_atr else bar_atr
+        bot.account_balance = balance
+        size = bot.calculate_position_size(entry, bar_atr, bot.risk_per_trade)
+        stop_loss, take_profit = bot.calculate_stop_loss_take_profit(
+            entry, TREND_NAMES[trend_list[i]], bar_atr, bot.risk_reward_ratio)
+        balance -= direction * size * entry
+        event_bars.append(i)
+        event_cash.append(balance)
+        event_size.append(direction * size)
+
+        # Same tests as check_exit_conditions, hoisted out of the per-bar loop
+        stop_below = entry > stop_loss
+        stop_above = entry < stop_loss
+        target_above = entry < take_profit
+        target_below = entry > take_profit
+        exit_bar = None
+        reason = None
+        for j in range(i + 1, n):
+            price = close[j]
+            if (stop_below and price <= stop_loss) or (stop_above and price >= stop_loss):
+                exit_bar, reason = j, "STOP-LOSS"
+                break
+            if (target_above and price >= take_profit) or (target_below and price <= take_profit):
+                exit_bar, reason = j, "TAKE-PROFIT"
+                break
+
+        trade = {
+            "entry_time": df.index[i],
+            "side": side,
+            "entry_price": entry,
+            "size": size,
+            "stop_loss": stop_loss,
+            "take_profit": take_profit,
+            "exit_time": None,
+            "exit_price": np.nan,
+            "exit_reason": "OPEN",
+            "pnl": np.nan,
+            "balance": np.nan,
+        }
+        trades.append(trade)
+        if exit_bar is None:
+            break
+        exit_price = close[exit_bar]
+        balance += direction * size * exit_price
+        trade.update(exit_time=df.index[exit_bar], exit_price=exit_price, exit_reason=reason,
+                     pnl=direction * (exit_price - entry) * size, balance=balance)
+        event_bars.append(exit_bar)
+        event_cash.append(balance)
+        event_size.append(0.0)
+        # A signal on the exit bar itself may open the next trade, as in main.py
+        while next_signal < n_signals and signal_idx[next_signal] < exit_bar:
+            next_signal += 1
+
+    bot.account_balance = balance
+
+    # Later events on the same bar override earlier ones (exit then re-entry)
+    positions = np.searchsorted(np.asarray(event_bars), np.arange(start, n), side="right") - 1
+    cash = np.asarray(event_cash)[positions]
+    holding = np.asarray(event_size)[positions]
+    prices = close_arr[start:n]
+    equity_curve = pd.DataFrame({
+        "price": prices,
+        "cash": cash,
+        "position_size": holding,  # negative while short
+        "equity": cash + holding * prices,
+    }, index=df.index[start:n])
+    equity_curve.index.name = "date"
+
+    if performance is not None:
+        performance.update_many(equity_curve.index, prices, cash, holding)
+        for trade in trades:
+            performance.record_trade(trade)
+
+    trade_columns = ["entry_time", "side", "entry_price", "size", "stop_loss", "take_profit",
+                     "exit_time", "exit_price", "exit_reason", "pnl", "balance"]
+    return pd.DataFrame(trades, columns=trade_columns), equity_curve
+
+
+def performance_metrics(trades, equity_curve, periods_per_year=252):
+    """Summary statistics for a backtest: return, Sharpe, max drawdown, profit factor, win rate."""
+    equity = equity_curve["equity"].to_numpy(dtype="float64")
+    returns = np.diff(equity) / equity[:-1] if len(equity) > 1 else np.empty(0)
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    sharpe = returns.mean() / std * np.sqrt(periods_per_year) if std > 0 else 0.0
+    running_max = np.maximum.accumulate(equity) if len(equity) else equity
+    drawdown = (running_max - equity) / running_max if len(equity) else equity
+    closed = trades["pnl"].dropna().to_numpy(dtype="float64")
+    gross_profit = closed[closed > 0].sum()
+    gross_loss = -closed[closed < 0].sum()
+    if gross_loss > 0:
+        profit_factor = gross_profit / gross_loss
+    else:
+        profit_factor = np.inf if gross_profit > 0 else 0.0
+    return {
+        "total_return": equity[-1] / equity[0] - 1 if len(equity) else 0.0,
+        "sharpe": float(sharpe),
+        "max_drawdown": float(drawdown.max()) if len(drawdown) else 0.0,
+        "profit_factor": float(profit_factor),
+        "win_rate": float((closed > 0).mean()) if len(closed) else 0.0,
+        "trades": int(len(closed)),
+    }
@@ -0,0 +1,150 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+
+BAR_DTYPE = np.dtype([
+    ('timestamp', 'int64'),   # nanoseconds since epoch, UTC
+    ('open', 'float64'),
+    ('high', 'float64'),
+    ('low', 'float64'),
+    ('close', 'float64'),
+    ('volume', 'float64'),
+])
+
+PERIOD_UNITS = {'m': 'min', 'h': 'h', 'd': 'D', 'wk': 'W', 'mo': 'D', 'y': 'D'}
+
+
+def period_to_timedelta(period):
+    """Convert a yfinance period string such as ``1d``, ``5d``, ``1mo`` or ``1y`` to a Timedelta."""
+    for suffix in ('mo', 'wk', 'y', 'd', 'h', 'm'):
+        if period.endswith(suffix):
+            count = int(period[:-len(suffix)])
+            if suffix == 'mo':
+                count *= 31
+            elif suffix == 'y':
+                count *= 366
+            return pd.Timedelta(count, unit=PERIOD_UNITS[suffix])
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def period_start(period, end):
+    """Where ``period`` reaching back from ``end`` begins; None for ``max`` (everything).
+
+    ``ytd`` starts on January 1 of ``end``'s year; the others are
+    ``period_to_timedelta`` before ``end``.
+    """
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=end.year, month=1, day=1, tz=end.tz)
+    return end - period_to_timedelta(period)
+
+
+def _utc(ts):
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
+
+
+class BarStore:
+    """Persistent OHLCV bars as memory-mapped NumPy files, one per symbol/interval/UTC day.
+
+    Layout: ``<root>/<symbol>/<interval>/<YYYY-MM-DD>.npy``, each a sorted
+    structured array of ``BAR_DTYPE``. Live runs, backtests and warm starts
+    all read the same files.
+    """
+
+    def __init__(self, root="data_cache"):
+        self.root = root
+
+    def _dir(self, symbol, interval):
+        return os.path.join(self.root, symbol.replace("/", "_"), interval)
+
+    def days(self, symbol, interval):
+        """Sorted list of day partitions stored for ``symbol``/``interval``."""
+        path = self._dir(symbol, interval)
+        if not os.path.isdir(path):
+            return []
+        return sorted(name[:-4] for name in os.listdir(path) if name.endswith(".npy"))
+
+    def _load_day(self, symbol, interval, day):
+        return np.load(os.path.join(self._dir(symbol, interval), day + ".npy"), mmap_mode="r")
+
+    def write(self, symbol, interval, df):
+        """Merge an OHLCV DataFrame (DatetimeIndex, Open/High/Low/Close/Volume) into the store.
+
+        Bars with a timestamp already on disk are replaced, so re-fetching the
+        last, still-forming bar is safe.
+        """
+        if df is None or df.empty:
+            return 0
+        index = pd.DatetimeIndex(df.index)
+        index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+        bars = np.empty(len(df), dtype=BAR_DTYPE)
+        bars['timestamp'] = index.as_unit("ns").asi8
+        for field, col in (('open', 'Open'), ('high', 'High'), ('low', 'Low'),
+                           ('close', 'Close'), ('volume', 'Volume')):
+            bars[field] = df[col].to_numpy(dtype="float64") if col in df.columns else 0.0
+
+        path = self._dir(symbol, interval)
+        os.makedirs(path, exist_ok=True)
+        day_of = index.strftime("%Y-%m-%d")
+        for day in np.unique(day_of):
+            new = bars[day_of == day]
+            file = os.path.join(path, day + ".npy")
+            if os.path.exists(file):
+                # Keep the newest copy of each timestamp
+                merged = np.concatenate([new, np.load(file)])
+                _, first = np.unique(merged['timestamp'], return_index=True)
+                new = merged[first]
+            else:
+                new = np.sort(new, order='timestamp')
+            tmp = file + ".tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, new)
+            os.replace(tmp, file)
+        return len(bars)
+
+    def last_timestamp(self, symbol, interval):
+        """Timestamp of the newest stored bar, or None if nothing is cached."""
+        days = self.days(symbol, interval)
+        if not days:
+            return None
+        bars = self._load_day(symbol, interval, days[-1])
+        if not len(bars):
+            return None
+        return pd.Timestamp(int(bars['timestamp'][-1]), unit="ns", tz="UTC")
+
+    def load(self, symbol, interval, start=None, end=None):
+        """Read stored bars in ``[start, end]`` as a DataFrame with Open/High/Low/Close/Volume columns."""
+        days = self.days(symbol, interval)
+        if start is not None:
+            start = _utc(start)
+            days = [d for d in days if d >= start.strftime("%Y-%m-%d")]
+        if end is not None:
+            end = _utc(end)
+            days = [d for d in days if d <= end.strftime("%Y-%m-%d")]
+        parts = [self._load_day(symbol, interval, d) for d in days]
+        bars = np.concatenate(parts) if parts else np.empty(0, dtype=BAR_DTYPE)
+        ts = bars['timestamp']
+        mask = np.ones(len(bars), dtype=bool)
+        if start is not None:
+            mask &= ts >= start.value
+        if end is not None:
+            mask &= ts <= end.value
+        bars = bars[mask]
+        return pd.DataFrame({
+            'Open': bars['open'],
+            'High': bars['high'],
+            'Low': bars['low'],
+            'Close': bars['close'],
+            'Volume': bars['volume'],
+        }, index=pd.DatetimeIndex(pd.to_datetime(bars['timestamp'], unit="ns", utc=True), name="Datetime"))
+
+    def load_period(self, symbol, interval, period):
+        """The last ``period`` of stored bars, measured back from the newest stored bar (see ``period_start``)."""
+        last = self.last_timestamp(symbol, interval)
+        if last is None:
+            return self.load(symbol, interval)
+        return self.load(symbol, interval, start=period_start(period, last), end=last)
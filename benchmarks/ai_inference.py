@@ -0,0 +1,60 @@
+"""Single-row vs batched AIModel inference throughput.
+
+Run from the repository root:  python -m benchmarks.ai_inference
+"""
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+from ai_model import AIModel
+
+
+def synthetic_model(path, n_features=6, seed=0):
+    """Fit a small 3-class (SELL/HOLD/BUY) logistic regression on random features."""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(5000, n_features))
+    y = np.digitize(X @ rng.normal(size=n_features), [-0.5, 0.5]) - 1
+    joblib.dump(LogisticRegression(max_iter=1000).fit(X, y), path)
+
+
+def rate(fn, rows, repeat=3):
+    best = min(_timed(fn) for _ in range(repeat))
+    return rows / best
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(n_rows=20000, model_path=None):
+    if model_path is None:
+        model_path = os.path.join(tempfile.mkdtemp(), "ai_model.pkl")
+        synthetic_model(model_path)
+    model = AIModel(model_path)
+    model.load()
+    X = np.random.default_rng(1).normal(size=(n_rows, model.model.n_features_in_))
+    rows = X.tolist()
+    single_rows = rows[:2000]
+
+    results = {
+        "single (sklearn)": rate(lambda: [model.predict_batch([r], fast=False) for r in single_rows], len(single_rows)),
+        "single (numpy)": rate(lambda: [model.predict(r) for r in single_rows], len(single_rows)),
+        "batch (sklearn)": rate(lambda: model.predict_batch(X, fast=False), n_rows),
+        "batch (numpy)": rate(lambda: model.predict_batch(X, fast=True), n_rows),
+    }
+    assert np.array_equal(model.predict_batch(X, fast=True), model.predict_batch(X, fast=False))
+
+    print(f"📊 AIModel inference throughput ({n_rows} rows)")
+    for name, rows_per_sec in results.items():
+        print(f"  {name:<18} {rows_per_sec:>14,.0f} rows/s")
+    return results
+
+
+if __name__ == "__main__":
+    main()
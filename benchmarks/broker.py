@@ -0,0 +1,51 @@
+"""Broker request throughput against the local OANDA stand-in server.
+
+Compares a fresh connection per request (the old get_account_info style),
+the pooled OandaClient session, one batched pricing call for all
+instruments, and non-blocking order submission.
+
+Run from the repository root:  python -m benchmarks.broker
+"""
+import time
+
+import requests
+
+from oanda_client import OandaClient
+from oanda_stub import StubOandaServer
+
+
+INSTRUMENTS = [f"I{i:02d}_USD" for i in range(50)]
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(n_requests=200, latency=0.002):
+    with StubOandaServer(latency=latency, seed=1) as server:
+        url = f"{server.base_url}/v3/accounts/TEST/pricing"
+        with OandaClient("token", "TEST", base_url=server.base_url, rate_limit=10000) as client:
+            results = {
+                "fresh connection / quote": n_requests / _timed(
+                    lambda: [requests.get(url, params={"instruments": "EUR_USD"}, timeout=10)
+                             for _ in range(n_requests)]),
+                "pooled session / quote": n_requests / _timed(
+                    lambda: [client.get_price("EUR_USD") for _ in range(n_requests)]),
+                "batched pricing (50 instr)": n_requests * len(INSTRUMENTS) / _timed(
+                    lambda: [client.get_prices(INSTRUMENTS) for _ in range(n_requests)]),
+                "blocking orders": n_requests / _timed(
+                    lambda: [client.place_order("EUR_USD", 100) for _ in range(n_requests)]),
+                "non-blocking orders": n_requests / _timed(
+                    lambda: [f.result() for f in client.submit_orders([("EUR_USD", 100)] * n_requests)]),
+            }
+
+    print(f"📊 Broker throughput vs local stub ({latency * 1000:.1f} ms server latency)")
+    for name, per_sec in results.items():
+        print(f"  {name:<28} {per_sec:>12,.0f} quotes-or-orders/s")
+    return results
+
+
+if __name__ == "__main__":
+    main()
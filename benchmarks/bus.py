@@ -0,0 +1,117 @@
+"""Shared-memory market data bus: publish/read cost and strategy workers across cores.
+
+* publish: one bar written by the feeder (seqlock + mirrored ring write);
+* poll: one new bar read by a worker through ``BusReader.fetch_latest``;
+* workers: one feeder publishes synthetic bars for every symbol while 1, 2,
+  4, ... worker processes, each attached read-only and owning a share of
+  the symbols, run the streaming strategy on every bar. Reported as bars
+  evaluated per second across all workers.
+
+Run from the repository root:  python -m benchmarks.bus
+"""
+import argparse
+import multiprocessing as mp
+import os
+import time
+
+from benchmarks.synthetic import synthetic_universe
+from market_bus import BusReader, MarketDataBus
+
+
+def _worker(name, symbols, expected, ready, results):
+    from bot import MomentumBot
+    bus = MarketDataBus.attach(name)
+    reader = BusReader(bus)
+    bots = {symbol: MomentumBot() for symbol in symbols}
+    for symbol, history in reader.fetch_history(symbols).items():
+        bots[symbol].prime_indicators(history['prices'], history['highs'], history['lows'])
+    ready.put(os.getpid())
+    evaluated = 0
+    start = None
+    while evaluated < expected:
+        for symbol, bars in reader.poll(symbols).items():
+            start = start or time.perf_counter()
+            bot = bots[symbol]
+            for bar in bars:
+                bot.momentum_signal_incremental(bar['price'], bar['high'], bar['low'])
+            evaluated += len(bars)
+    results.put((evaluated, time.perf_counter() - start))
+    bus.close()
+
+
+def run_workers(n_workers, n_symbols=64, n_bars=2000, warmup=200, name="momentum_bench_bus"):
+    """Bars evaluated per second with ``n_workers`` processes sharing one feeder."""
+    universe = synthetic_universe(n_symbols, warmup + n_bars)
+    columns = {symbol: [df[c].tolist() for c in ("Open", "High", "Low", "Close")] for symbol, df in universe.items()}
+    bus = MarketDataBus.create(list(universe), capacity=max(warmup, n_bars), name=name)
+    try:
+        for symbol, (o, h, l, c) in columns.items():
+            bus.publish_history(symbol, {'prices': c[:warmup], 'highs': h[:warmup], 'lows': l[:warmup],
+                                         'opens': o[:warmup]})
+        ctx = mp.get_context("spawn")
+        ready, results = ctx.Queue(), ctx.Queue()
+        shares = [bus.symbols[i::n_workers] for i in range(n_workers)]
+        workers = [ctx.Process(target=_worker, args=(name, share, len(share) * n_bars, ready, results))
+                   for share in shares]
+        for worker in workers:
+            worker.start()
+        for _ in workers:
+            ready.get()
+        start = time.perf_counter()
+        for i in range(warmup, warmup + n_bars):
+            for symbol, (o, h, l, c) in columns.items():
+                bus.publish(symbol, o[i], h[i], l[i], c[i])
+        publish_s = time.perf_counter() - start
+        done = [results.get() for _ in workers]
+        elapsed = max(time.perf_counter() - start, max(seconds for _, seconds in done))
+        for worker in workers:
+            worker.join()
+    finally:
+        bus.close()
+        bus.unlink()
+    evaluated = sum(count for count, _ in done)
+    return {'bars_per_s': evaluated / elapsed, 'publish_us': publish_s / (n_symbols * n_bars) * 1e6}
+
+
+def micro(n=100_000):
+    bus = MarketDataBus.create(["SYM000"], capacity=200)
+    try:
+        start = time.perf_counter()
+        for i in range(n):
+            bus.publish("SYM000", 1.0, 1.0, 1.0, 1.0, 0.0, float(i))
+        publish = (time.perf_counter() - start) / n
+        reader = BusReader(bus)
+        reader.seen["SYM000"] = 0
+        total = 0.0
+        for i in range(n // 10):
+            bus.publish("SYM000", 1.0, 1.0, 1.0, 1.0, 0.0, float(i))
+            start = time.perf_counter()
+            reader.fetch_latest(["SYM000"])
+            total += time.perf_counter() - start
+        poll = total / (n // 10)
+    finally:
+        bus.close()
+        bus.unlink()
+    return {'publish_us': publish * 1e6, 'poll_us': poll * 1e6}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="*", default=(1, 2, 4))
+    parser.add_argument("--symbols", type=int, default=64)
+    parser.add_argument("--bars", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    results = {'micro': micro()}
+    print("🚌 Shared-memory market data bus")
+    print(f"  publish one bar        {results['micro']['publish_us']:>8.2f} µs")
+    print(f"  fetch_latest one bar   {results['micro']['poll_us']:>8.2f} µs")
+    for n_workers in args.workers:
+        stats = run_workers(n_workers, args.symbols, args.bars)
+        results[f"{n_workers} workers"] = stats
+        print(f"  {n_workers} worker(s), {args.symbols} symbols  {stats['bars_per_s']:>12,.0f} bars/s evaluated")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Per-bar indicator memo: several consumers of one bar, with and without the cache.
+
+For each bar of a synthetic history, runs what a bar typically feeds: the
+plain ``momentum_strategy``, ``MomentumBotWithAI.momentum_strategy_with_ai``,
+the signal-only ``momentum_signal`` and the AI feature row
+(``features.latest_feature_row``). Without a cache each of them computes its
+own indicators; with one they share an ``IndicatorCache.bar`` handle.
+Results must be identical; reports the time per bar and the cache's
+hit/miss counters.
+
+Run from the repository root:  python -m benchmarks.indicator_cache
+"""
+import argparse
+import time
+
+from benchmarks.synthetic import synthetic_ohlcv
+from bot import MomentumBot
+from features import latest_feature_row
+from indicator_cache import IndicatorCache
+from momentum_bot_with_ai import MomentumBotWithAI
+
+
+def consumers(bot, ai_bot, close, high, low, bar):
+    return (bot.momentum_strategy(close, high, low, close, bar=bar),
+            ai_bot.momentum_strategy_with_ai(close, high, low, close, bar=bar),
+            bot.momentum_signal(close, high, low, close, bar=bar),
+            latest_feature_row(close, high, low, bot=bot, bar=bar))
+
+
+def run(n_bars=500, depth=200, maxsize=256, log=print):
+    df = synthetic_ohlcv(depth + n_bars)
+    close, high, low = (df[c].to_numpy() for c in ("Close", "High", "Low"))
+    bot = MomentumBot()
+    ai_bot = MomentumBotWithAI(ai_model_path="")
+    cache = IndicatorCache(maxsize)
+    seconds = {}
+    outputs = {}
+    for mode in ("uncached", "cached"):
+        start = time.perf_counter()
+        outputs[mode] = [consumers(bot, ai_bot, close[i - depth:i], high[i - depth:i], low[i - depth:i],
+                                   cache.bar("SYN", i) if mode == "cached" else None)
+                         for i in range(depth, depth + n_bars)]
+        seconds[mode] = (time.perf_counter() - start) / n_bars
+    # Signal objects compare by identity; everything else must match value for value
+    strip = lambda rows: [(a, b, None if c is None else c.to_result(), d) for a, b, c, d in rows]
+    if strip(outputs["cached"]) != strip(outputs["uncached"]):
+        raise AssertionError("cached indicator values differ from recomputed ones")
+    stats = cache.stats()
+    for mode in ("uncached", "cached"):
+        log(f"  {mode:<9} {seconds[mode] * 1e6:>10,.0f} µs per bar (4 consumers)")
+    log(f"  {stats['hits']:,} hits / {stats['misses']:,} misses ({stats['hit_rate']:.0%}), "
+        f"{stats['evictions']:,} bars evicted, speedup {seconds['uncached'] / seconds['cached']:.2f}x")
+    return {"uncached_us": seconds["uncached"] * 1e6, "cached_us": seconds["cached"] * 1e6, **stats}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", type=int, default=500)
+    parser.add_argument("--depth", type=int, default=200)
+    parser.add_argument("--maxsize", type=int, default=256)
+    args = parser.parse_args(argv)
+    print(f"🗃️ Per-bar indicator cache ({args.bars} bars of {args.depth}-bar history)")
+    return run(args.bars, args.depth, args.maxsize)
+
+
+if __name__ == "__main__":
+    main()
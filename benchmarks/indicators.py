@@ -0,0 +1,243 @@
+"""Indicator, strategy and backtest micro-benchmarks with JSON baselines.
+
+Times every ``MomentumBot.calculate_*`` indicator, ``momentum_strategy``
+and its signal-only ``momentum_signal`` (full recompute and streaming), the vectorized indicator frame and
+``run_backtest`` over synthetic histories from 50 to 1M bars, plus one
+live tick and a whole-universe screen (per symbol vs cross-sectional)
+across many symbols. Data is generated offline by
+``benchmarks.synthetic``, so runs are reproducible and need no network.
+
+Run from the repository root:
+
+    python -m benchmarks.indicators --save benchmarks/baseline.json
+    python -m benchmarks.indicators --compare benchmarks/baseline.json --threshold 0.25
+
+``--compare`` exits with status 1 when any case is slower than the
+baseline by more than ``threshold`` (a fraction: 0.25 = 25%).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from backtest_engine import bot_indicator_frame, run_backtest
+from benchmarks.synthetic import synthetic_ohlcv, synthetic_universe
+from bot import MomentumBot
+from cross_section import screen
+from runner import MultiSymbolRunner
+
+
+SIZES = (50, 1_000, 10_000, 100_000, 1_000_000)
+QUICK_SIZES = (50, 1_000, 10_000)
+SYMBOL_COUNTS = (1, 10, 50)
+# Streaming bar by bar through Python is O(n) per case; stop before it dominates the run
+MAX_STREAM_BARS = 100_000
+DEFAULT_THRESHOLD = 0.25
+
+
+def measure(fn, min_time=0.1, repeat=3):
+    """Best seconds per call of ``fn`` over ``repeat`` rounds of at least ``min_time`` each."""
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    loops = max(1, int(min_time / first)) if first > 0 else 1000
+    best = first
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best, loops
+
+
+def indicator_cases(df):
+    """``{name: callable}`` timing each indicator and the strategy on the whole history in ``df``."""
+    bot = MomentumBot()
+    close = df["Close"].to_numpy()
+    high = df["High"].to_numpy()
+    low = df["Low"].to_numpy()
+    cases = {
+        "calculate_ema": lambda: bot.calculate_ema(close, 13),
+        "calculate_stochastic": lambda: bot.calculate_stochastic(high, low, close, 14, 3),
+        "calculate_awesome_oscillator": lambda: bot.calculate_awesome_oscillator(high, low, 1, 34),
+        "calculate_atr": lambda: bot.calculate_atr(high, low, close),
+        "calculate_rsi": lambda: bot.calculate_rsi(close),
+        "calculate_macd": lambda: bot.calculate_macd(close),
+        "calculate_bollinger_bands": lambda: bot.calculate_bollinger_bands(close),
+        "momentum_strategy": lambda: bot.momentum_strategy(close, high, low, close),
+        "momentum_signal": lambda: bot.momentum_signal(close, high, low, close),
+        "indicator_frame": lambda: bot_indicator_frame(bot, df),
+        "backtest": lambda: run_backtest(MomentumBot(), df),
+    }
+    if len(df) <= MAX_STREAM_BARS:
+        cases["momentum_strategy_incremental"] = lambda: _stream(close, high, low)
+        cases["momentum_signal_incremental"] = lambda: _stream(close, high, low, lazy=True)
+    return cases
+
+
+def _stream(close, high, low, lazy=False):
+    bot = MomentumBot()
+    step = bot.momentum_signal_incremental if lazy else bot.momentum_strategy_incremental
+    for c, h, l in zip(close.tolist(), high.tolist(), low.tolist()):
+        step(c, h, l)
+
+
+def symbol_cases(n_symbols, depth=200):
+    """One live tick across ``n_symbols`` primed symbols, a full per-symbol recompute and a cross-sectional screen."""
+    universe = synthetic_universe(n_symbols, depth + 1000)
+    runner = MultiSymbolRunner(list(universe), fetch_latest=dict, fetch_history=dict, depth=depth)
+    ticks = {}
+    for symbol, df in universe.items():
+        state = runner.states[symbol]
+        o, h, l, c, v = (df[col].to_numpy() for col in ("Open", "High", "Low", "Close", "Volume"))
+        state.bot.prime_indicators(c[:depth], h[:depth], l[:depth])
+        state.history.extend(o[:depth], h[:depth], l[:depth], c[:depth], v[:depth])
+        state.prev_price = c[depth - 1]
+        ticks[symbol] = [{'price': bar[3], 'high': bar[1], 'low': bar[2], 'open': bar[0], 'volume': bar[4]}
+                         for bar in zip(*(x[depth:].tolist() for x in (o, h, l, c, v)))]
+    cursor = [0]
+
+    def tick():
+        i = cursor[0] % 1000
+        cursor[0] += 1
+        for symbol, state in runner.states.items():
+            runner.evaluate(state, ticks[symbol][i])
+
+    def full_recompute():
+        for state in runner.states.values():
+            state.bot.momentum_strategy(state.history)
+
+    bot = MomentumBot()
+    close, high, low = (np.stack([df[col].to_numpy()[:depth] for df in universe.values()])
+                        for col in ("Close", "High", "Low"))
+
+    def cross_sectional():
+        screen(bot, close, high, low)
+
+    return {"tick_all_symbols": tick, "momentum_strategy_all_symbols": full_recompute,
+            "screen_all_symbols": cross_sectional}
+
+
+def run(sizes=SIZES, symbol_counts=SYMBOL_COUNTS, only=None, min_time=0.1, repeat=3, log=print):
+    """Run every case and return ``{case: {'seconds', 'loops', 'bars' or 'symbols'}}``."""
+    results = {}
+
+    def record(name, fn, **info):
+        if only and only not in name:
+            return
+        seconds, loops = measure(fn, min_time, repeat)
+        results[name] = dict(seconds=seconds, loops=loops, **info)
+        log(f"  {name:<50} {_format_seconds(seconds):>12}")
+
+    for n in sizes:
+        df = synthetic_ohlcv(n, seed=n)
+        for case, fn in indicator_cases(df).items():
+            record(f"{case}[bars={n}]", fn, bars=n)
+    for n_symbols in symbol_counts:
+        for case, fn in symbol_cases(n_symbols).items():
+            record(f"{case}[symbols={n_symbols}]", fn, symbols=n_symbols)
+    return results
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def save_baseline(results, path):
+    data = {'created_at': time.time(), 'environment': environment(), 'results': results}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Rows of ``(case, baseline_s, current_s, ratio, status)`` for cases present in both runs.
+
+    ``status`` is ``"SLOWER"`` when the current time exceeds the baseline by
+    more than ``threshold``, ``"faster"`` when it beats it by as much, else ``"ok"``.
+    """
+    rows = []
+    for case, current in results.items():
+        old = baseline['results'].get(case)
+        if old is None:
+            continue
+        ratio = current['seconds'] / old['seconds'] if old['seconds'] else float("inf")
+        if ratio > 1 + threshold:
+            status = "SLOWER"
+        elif ratio < 1 - threshold:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((case, old['seconds'], current['seconds'], ratio, status))
+    return rows
+
+
+def _format_seconds(seconds):
+    if seconds >= 1:
+        return f"{seconds:.3f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f} ms"
+    return f"{seconds * 1e6:.2f} µs"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown fraction that counts as a regression (default %(default)s)")
+    parser.add_argument("--sizes", help="comma-separated history lengths (default 50..1M)")
+    parser.add_argument("--symbols", help="comma-separated symbol counts (default 1,10,50)")
+    parser.add_argument("--quick", action="store_true", help="only histories up to 10k bars")
+    parser.add_argument("--only", help="run only cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.1, help="seconds per timing round")
+    parser.add_argument("--repeat", type=int, default=3, help="timing rounds per case (best is kept)")
+    args = parser.parse_args(argv)
+
+    sizes = QUICK_SIZES if args.quick else SIZES
+    if args.sizes:
+        sizes = tuple(int(s) for s in args.sizes.split(","))
+    symbol_counts = tuple(int(s) for s in args.symbols.split(",")) if args.symbols else SYMBOL_COUNTS
+
+    print("📊 Indicator / strategy / backtest benchmarks (best time per call)")
+    results = run(sizes, symbol_counts, args.only, args.min_time, args.repeat)
+    if args.save:
+        save_baseline(results, args.save)
+        print(f"💾 Baseline saved to {args.save}")
+    if args.compare:
+        rows = compare(results, load_baseline(args.compare), args.threshold)
+        print(f"\n🔍 Compared with {args.compare} (threshold {args.threshold:.0%})")
+        for case, old, new, ratio, status in rows:
+            marker = "🔴" if status == "SLOWER" else "🟢" if status == "faster" else "⚪"
+            print(f"  {marker} {case:<50} {_format_seconds(old):>12} → {_format_seconds(new):>12}"
+                  f"  x{ratio:.2f} {status}")
+        regressions = [row for row in rows if row[4] == "SLOWER"]
+        if regressions:
+            print(f"❌ {len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+            return 1
+        print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
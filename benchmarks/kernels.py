@@ -0,0 +1,110 @@
+"""Rolling-window indicator kernels: pandas formulas against each kernel backend.
+
+For the stochastic, the Awesome Oscillator and the ATR over synthetic
+histories of several lengths, times the original pandas formulas (the
+Series pipelines ``MomentumBot`` used to build) and every available
+``kernels`` backend, and cross-checks all of them: each backend must agree
+with pandas, and with the other backends, to ``--tolerance``. Without Numba
+the uncompiled loop kernels are checked in its place (and not timed).
+
+Run from the repository root:
+
+    python -m benchmarks.kernels
+    BOT_KERNELS=numpy python -m benchmarks.kernels --sizes 200 100000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import kernels
+from benchmarks.indicators import measure
+from benchmarks.synthetic import synthetic_ohlcv
+
+
+SIZES = (200, 10_000, 1_000_000)
+
+
+def pandas_stochastic(high, low, close, k_period=14, d_period=3):
+    lowest_low = pd.Series(low).rolling(window=k_period).min()
+    highest_high = pd.Series(high).rolling(window=k_period).max()
+    raw_k = ((pd.Series(close) - lowest_low) / (highest_high - lowest_low)) * 100
+    k_percent = raw_k.ewm(span=d_period, adjust=False).mean()
+    return k_percent.to_numpy(), k_percent.ewm(span=d_period, adjust=False).mean().to_numpy()
+
+
+def pandas_awesome_oscillator(high, low, fast_period=1, slow_period=34):
+    median = pd.Series([(h + l) / 2 for h, l in zip(high, low)])
+    return (median.rolling(window=fast_period).mean() - median.rolling(window=slow_period).mean()).to_numpy()
+
+
+def pandas_atr(high, low, close, window=14):
+    high, low, close = pd.Series(high), pd.Series(low), pd.Series(close)
+    tr = pd.concat([high - low, abs(high - close.shift()), abs(low - close.shift())], axis=1).max(axis=1)
+    return tr.rolling(window=window).mean().to_numpy()
+
+
+def cases(high, low, close, backend=None):
+    if backend == "pandas":
+        return {'stochastic': lambda: pandas_stochastic(high, low, close),
+                'awesome_oscillator': lambda: pandas_awesome_oscillator(high, low),
+                'atr': lambda: pandas_atr(high, low, close)}
+    return {'stochastic': lambda: kernels.stochastic(high, low, close, backend=backend),
+            'awesome_oscillator': lambda: kernels.awesome_oscillator(high, low, backend=backend),
+            'atr': lambda: kernels.atr(high, low, close, backend=backend)}
+
+
+def max_difference(a, b):
+    a, b = np.atleast_2d(a), np.atleast_2d(b)
+    if not np.array_equal(np.isnan(a), np.isnan(b)):
+        return np.inf
+    valid = ~np.isnan(a)
+    return float(np.max(np.abs(a[valid] - b[valid]), initial=0.0))
+
+
+def run(sizes=SIZES, tolerance=1e-9, log=print):
+    backends = kernels.available_backends()
+    checked = backends if "numba" in backends else backends + ("loops",)
+    results = {}
+    for n in sizes:
+        df = synthetic_ohlcv(n)
+        high, low, close = (df[c].to_numpy() for c in ("High", "Low", "Close"))
+        reference = {name: fn() for name, fn in cases(high, low, close, "pandas").items()}
+        for backend in checked:
+            # Loops run uncompiled are only checked on the smaller histories
+            if backend == "loops" and n > 10_000:
+                continue
+            for name, fn in cases(high, low, close, backend).items():
+                diff = max_difference(np.stack(reference[name]) if name == "stochastic" else reference[name],
+                                      np.stack(fn()) if name == "stochastic" else fn())
+                if diff > tolerance:
+                    raise AssertionError(f"{backend} {name} differs from pandas by {diff:g} at {n} bars")
+        compared = tuple(b for b in checked if b != "loops" or n <= 10_000)
+        if len(compared) > 1:
+            diffs = kernels.cross_check(high, low, close, backends=compared)
+            if max(diffs.values()) > tolerance:
+                raise AssertionError(f"kernel backends disagree at {n} bars: {diffs}")
+        for backend in ("pandas",) + backends:
+            for name, fn in cases(high, low, close, backend).items():
+                seconds, _ = measure(fn)
+                results[f"{name}/{backend}/{n}"] = seconds
+        line = "  ".join(f"{name} " + " / ".join(f"{results[f'{name}/{b}/{n}'] * 1e6:,.0f}"
+                                                   for b in ("pandas",) + backends)
+                         for name in ("stochastic", "awesome_oscillator", "atr"))
+        log(f"  {n:>9,} bars  {line} µs")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=SIZES)
+    parser.add_argument("--tolerance", type=float, default=1e-9)
+    args = parser.parse_args(argv)
+    backends = ("pandas",) + kernels.available_backends()
+    print(f"🧮 Indicator kernels ({' / '.join(backends)}; default backend {kernels.get_backend()}), "
+          f"all cross-checked to {args.tolerance:g}")
+    return run(args.sizes, args.tolerance)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Snapshot and recovery time of the runner's state, against a cold start.
+
+For each symbol count a ``MultiSymbolRunner`` is primed from synthetic
+history and run for a while, then timed for:
+
+* snapshot: serializing every bot, indicator engine and bar history, and
+  the synced atomic write (``StateStore.save``);
+* restore: reading, verifying and unpickling the snapshot into a fresh
+  runner, plus replaying the trade journal (``restore_state``);
+* cold prime: rebuilding the same state from in-memory history, i.e. a
+  restart without a snapshot minus the download;
+* journal append: one synced trade record.
+
+Run from the repository root:  python -m benchmarks.snapshot
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.synthetic import synthetic_universe
+from replay import ReplayFeed
+from runner import MultiSymbolRunner
+from state_store import StateStore
+
+
+SYMBOL_COUNTS = (1, 10, 50, 200)
+
+
+def build(frames, store=None, warmup=200):
+    feed = ReplayFeed(frames, warmup)
+    runner = MultiSymbolRunner(list(frames), fetch_latest=feed.fetch_latest, fetch_history=feed.fetch_history,
+                               state_store=store, depth=warmup)
+    return runner, feed
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(symbol_counts=SYMBOL_COUNTS, bars=400, repeat=5, fsync=True, log=print):
+    results = {}
+    for n_symbols in symbol_counts:
+        frames = synthetic_universe(n_symbols, bars)
+        directory = tempfile.mkdtemp(prefix="snapshot-bench-")
+        try:
+            store = StateStore(directory, fsync=fsync)
+            runner, feed = build(frames, store)
+            asyncio.run(runner.prime())
+            for _ in range(bars - 200):
+                for symbol, bar in feed.fetch_latest(runner.symbols).items():
+                    runner.evaluate(runner.states[symbol], bar)
+
+            snapshot_s = best_of(runner.save_state, repeat)
+            size = os.path.getsize(store.snapshot_path)
+
+            def restore():
+                build(frames, StateStore(directory, fsync=fsync))[0].restore_state()
+
+            restore_s = best_of(restore, repeat)
+
+            def cold():
+                asyncio.run(build(frames)[0].prime())
+
+            cold_s = best_of(cold, repeat)
+            append_s = best_of(lambda: store.journal.append("open", "SYM000", side="BUY", price=1.1, size=1.0,
+                                                            stop_loss=1.09, take_profit=1.12), repeat * 10)
+            store.close()
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        results[f"{n_symbols} symbols"] = {'snapshot_s': snapshot_s, 'restore_s': restore_s, 'cold_s': cold_s,
+                                           'journal_append_s': append_s, 'bytes': size}
+        log(f"  {n_symbols:>4} symbols  snapshot {snapshot_s * 1000:>8.2f} ms  restore {restore_s * 1000:>8.2f} ms"
+            f"  cold prime {cold_s * 1000:>8.2f} ms  journal append {append_s * 1e6:>7.1f} µs"
+            f"  ({size / 1024:,.0f} KiB)")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, nargs="*", default=SYMBOL_COUNTS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-fsync", action="store_true", help="skip fsync (measures serialization only)")
+    args = parser.parse_args(argv)
+    print(f"💾 State snapshot / recovery (best of {args.repeat}{', no fsync' if args.no_fsync else ''})")
+    return run(args.symbols, repeat=args.repeat, fsync=not args.no_fsync)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Cold-start import cost of the entry points and core modules.
+
+Each target is imported in a fresh interpreter (``python -X importtime``)
+several times; the best wall time above a bare ``python -c pass`` is
+reported together with the heavy third-party packages the import pulled
+in. For the scripts (main.py, backtest.py) the module-level imports are
+replayed without running the script itself, so no network is touched.
+
+Run from the repository root:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --save benchmarks/startup.json
+    python -m benchmarks.startup --compare benchmarks/startup.json
+"""
+import argparse
+import ast
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.indicators import DEFAULT_THRESHOLD, compare, load_baseline, save_baseline
+
+
+SCRIPTS = ("main.py", "backtest.py", "replay.py")
+MODULES = ("indicators", "bot", "runner", "broker", "ai_model", "momentum_bot_with_ai", "backtest_engine")
+HEAVY = ("numpy", "pandas", "yfinance", "sklearn", "joblib", "oandapyV20", "dotenv", "requests", "numba")
+
+
+def script_imports(path):
+    """The module-level import statements of a script, as source code."""
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    lines = [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(lines) or "pass"
+
+
+def _probe(code):
+    # Print which heavy packages ended up loaded
+    return code + f"\nimport sys\nprint(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+
+
+def time_import(code, repeat=5, cwd=None):
+    """Best wall time of running ``code`` in a fresh interpreter, plus the heavy modules it loaded."""
+    best = float("inf")
+    loaded = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", _probe(code)], cwd=cwd, capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if out.returncode != 0:
+            error = out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "failed"
+            return None, error
+        best = min(best, elapsed)
+        loaded = out.stdout.strip().splitlines()[-1] if out.stdout.strip() else ""
+    return best, loaded
+
+
+def slowest_imports(code, limit=10, cwd=None):
+    """Top ``limit`` modules by cumulative import time (µs) from ``-X importtime``."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=cwd,
+                         capture_output=True, text=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def run(repeat=5, cwd=None, log=print):
+    cwd = cwd or os.getcwd()
+    baseline, _ = time_import("pass", repeat, cwd)
+    targets = {f"{script} imports": script_imports(os.path.join(cwd, script))
+               for script in SCRIPTS if os.path.exists(os.path.join(cwd, script))}
+    targets.update({f"import {module}": f"import {module}" for module in MODULES})
+    results = {}
+    for name, code in targets.items():
+        seconds, loaded = time_import(code, repeat, cwd)
+        if seconds is None:
+            log(f"  {name:<36} failed: {loaded}")
+            continue
+        seconds = max(0.0, seconds - baseline)
+        results[name] = {'seconds': seconds, 'loaded': loaded.split(",") if loaded else []}
+        log(f"  {name:<36} {seconds * 1000:>9.1f} ms   loads: {loaded or '-'}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--profile", metavar="TARGET", help="show the slowest imports of one module")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        for cumulative_us, name in slowest_imports(f"import {args.profile}"):
+            print(f"  {cumulative_us / 1000:>9.1f} ms  {name}")
+        return 0
+
+    print("🚀 Cold-start import time (best of fresh interpreters, minus bare Python start-up)")
+    results = run(args.repeat)
+    if args.save:
+        save_baseline(results, args.save)
+        print(f"💾 Baseline saved to {args.save}")
+    if args.compare:
+        rows = compare(results, load_baseline(args.compare), args.threshold)
+        for case, old, new, ratio, status in rows:
+            print(f"  {case:<36} {old * 1000:>9.1f} ms → {new * 1000:>9.1f} ms  x{ratio:.2f} {status}")
+        if any(row[4] == "SLOWER" for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""Offline synthetic OHLCV data for benchmarks and replays (no yfinance, no network)."""
+import numpy as np
+import pandas as pd
+
+
+def synthetic_ohlcv(n_bars, seed=0, start_price=1.1, volatility=0.0005, freq="1min",
+                    start="2024-01-01"):
+    """Random-walk OHLCV bars as a DataFrame with Open/High/Low/Close/Volume columns.
+
+    Closes follow a geometric random walk; each bar's open is the previous
+    close and its high/low extend past both by a random fraction of the
+    bar's volatility, so the bars are internally consistent.
+    """
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0, volatility, n_bars)
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate(([start_price], close[:-1]))
+    wick = np.abs(rng.normal(0.0, volatility, (2, n_bars))) * close
+    high = np.maximum(open_, close) + wick[0]
+    low = np.minimum(open_, close) - wick[1]
+    volume = rng.integers(100, 10000, n_bars).astype("float64")
+    index = pd.date_range(start, periods=n_bars, freq=freq, name="Date")
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume},
+                        index=index)
+
+
+def synthetic_universe(n_symbols, n_bars, seed=0):
+    """``{symbol: DataFrame}`` of independent synthetic histories."""
+    return {f"SYM{i:03d}": synthetic_ohlcv(n_bars, seed=seed + i, start_price=1.0 + 0.01 * i)
+            for i in range(n_symbols)}
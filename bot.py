@@ -1,7 +1,71 @@
-import pandas as pd
-import numpy as np
-import yfinance as yf
-from datetime import datetime
+from functools import cache
+
+from indicators import MIN_HISTORY, IndicatorEngine
+from ring_buffer import OHLCVRingBuffer
+from timeframes import MultiTimeframeConsensus
+from instrumentation import metrics, profiled
+
+
+class Signal:
+    """Compact result of ``MomentumBot.momentum_signal``: a consensus that will be traded.
+
+    Holds what ``execute_trade`` needs plus the indicator values behind the
+    vote; the explanatory ``signals`` strings and the full result dict are
+    only built on request. ``to_result()`` equals what ``momentum_strategy``
+    returns for the same bar.
+    """
+
+    __slots__ = ("side", "price", "position_size", "stop_loss", "take_profit", "trend", "emas",
+                 "stoch_k", "stoch_d", "ao_current", "ao_signal", "ema_vote", "stoch_signal", "timeframes")
+
+    def __init__(self, side, price, position_size, stop_loss, take_profit, trend, emas, stoch_k, stoch_d,
+                 ao_current, ao_signal, ema_vote, stoch_signal, timeframes=None):
+        self.side = side
+        self.price = price
+        self.position_size = position_size
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.trend = trend
+        self.emas = emas
+        self.stoch_k = stoch_k
+        self.stoch_d = stoch_d
+        self.ao_current = ao_current
+        self.ao_signal = ao_signal
+        self.ema_vote = ema_vote
+        self.stoch_signal = stoch_signal
+        self.timeframes = timeframes
+
+    @property
+    def signals(self):
+        return MomentumBot._describe_votes(self.side, self.ema_vote, self.stoch_signal, self.ao_signal)
+
+    def to_result(self):
+        """The ``momentum_strategy`` result dict for this signal."""
+        ema_13, ema_20, ema_50 = self.emas
+        result = {
+            'buy_signal': self.side == "BUY",
+            'sell_signal': self.side == "SELL",
+            'stoch_k': self.stoch_k,
+            'stoch_d': self.stoch_d,
+            'trend': self.trend,
+            'position_size': self.position_size,
+            'stop_loss': self.stop_loss,
+            'take_profit': self.take_profit,
+            'ao_current': self.ao_current,
+            'ao_signal': self.ao_signal,
+            'signals': self.signals,
+            'ema_13': ema_13,
+            'ema_20': ema_20,
+            'ema_50': ema_50
+        }
+        if self.timeframes is not None:
+            result.update(self.timeframes)
+        return result
+
+    def __repr__(self):
+        return (f"Signal({self.side} at {self.price}, size={self.position_size}, "
+                f"SL={self.stop_loss}, TP={self.take_profit})")
+
 
 class MomentumBot:
 
@@ -31,36 +95,36 @@ class MomentumBot:
 
     def calculate_atr(self, high_prices, low_prices, close_prices, window=14):
         """Calculate Average True Range (ATR)"""
-        import pandas as pd
+        from kernels import atr
         if len(high_prices) < window + 1:
             return None
-        high = pd.Series(high_prices)
-        low = pd.Series(low_prices)
-        close = pd.Series(close_prices)
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.rolling(window=window).mean()
-        return atr.iloc[-1] if not atr.empty else None
+        # True range and its rolling mean in single passes over the arrays (see kernels.py)
+        return atr(high_prices, low_prices, close_prices, window)[-1]
     # Example method: Use API key for a broker request
     def get_account_info(self):
         """Example: Use the API key to make a broker API request (pseudo-code)."""
-        import requests
         if not self.api_key:
             raise ValueError("API key is not set. Please set BROKER_API_KEY env variable or pass api_key to the bot.")
         # Example endpoint (replace with your broker's real endpoint)
         url = "https://api.broker.com/v1/account"
         headers = {"Authorization": f"Bearer {self.api_key}"}
         # This is a placeholder request. Replace with your broker's actual API usage.
-        response = requests.get(url, headers=headers)
+        response = self._http_session().get(url, headers=headers, timeout=10)
         if response.status_code == 200:
             return response.json()
         else:
             raise Exception(f"Broker API error: {response.status_code} {response.text}")
+    def _http_session(self):
+        """Keep-alive HTTP session reused across broker requests."""
+        if getattr(self, "_session", None) is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
     # --- Additional Technical Indicators ---
     def calculate_rsi(self, prices, window=14):
         """Calculate Relative Strength Index (RSI)"""
+        import pandas as pd
         if len(prices) < window + 1:
             return None
         series = pd.Series(prices)
@@ -75,6 +139,7 @@ class MomentumBot:
 
     def calculate_macd(self, prices, fast=12, slow=26, signal=9):
         """Calculate MACD and Signal Line"""
+        import pandas as pd
         if len(prices) < slow + signal:
             return None, None
         series = pd.Series(prices)
@@ -86,6 +151,7 @@ class MomentumBot:
 
     def calculate_bollinger_bands(self, prices, window=20, num_std=2):
         """Calculate Bollinger Bands"""
+        import pandas as pd
         if len(prices) < window:
             return None, None, None
         series = pd.Series(prices)
@@ -94,17 +160,47 @@ class MomentumBot:
         upper_band = sma + (num_std * std)
         lower_band = sma - (num_std * std)
         return upper_band.iloc[-1], sma.iloc[-1], lower_band.iloc[-1]
-    def __init__(self, initial_balance=10000, api_key=None):
+    def __init__(self, initial_balance=10000, api_key=None, ema_windows=(13, 20, 50),
+                 k_period=14, d_period=3, overbought=80, oversold=20,
+                 ao_fast=1, ao_slow=34, risk_reward_ratio=2, risk_per_trade=0.02, timeframes=None):
         import os
         self.account_balance = initial_balance
+        # Strategy parameters (defaults are the original hard-coded values)
+        self.ema_windows = tuple(ema_windows)
+        self.k_period = k_period
+        self.d_period = d_period
+        self.overbought = overbought
+        self.oversold = oversold
+        self.ao_fast = ao_fast
+        self.ao_slow = ao_slow
+        self.risk_reward_ratio = risk_reward_ratio
+        self.risk_per_trade = risk_per_trade
         self.position_size = 0
+        # +1 long, -1 short, 0 flat
+        self.position_side = 0
         self.stop_loss = 0
         self.take_profit = 0
         self.in_position = False
         self.entry_price = 0
+        # Streaming indicator state for momentum_strategy_incremental
+        self.indicators = self._new_indicator_engine()
+        # Optional higher-timeframe votes (e.g. ("1m", "5m", "15m", "1h")), fed by update_timeframes
+        self.timeframes = MultiTimeframeConsensus(self, timeframes) if timeframes else None
         # API key management
         self.api_key = api_key or os.environ.get('BROKER_API_KEY')
 
+    def __getstate__(self):
+        # Snapshots (state_store.py) must not carry the API key or a live HTTP session
+        state = self.__dict__.copy()
+        state.pop('_session', None)
+        state['api_key'] = None
+        return state
+
+    def __setstate__(self, state):
+        import os
+        self.__dict__.update(state)
+        self.api_key = os.environ.get('BROKER_API_KEY')
+
     def set_api_key(self, api_key):
         """Set or update the broker API key."""
         self.api_key = api_key
@@ -119,6 +215,7 @@ class MomentumBot:
     # EMA Calculation
     def calculate_ema(self, prices, window):
         """Calculate Exponential Moving Average"""
+        import pandas as pd
         if len(prices) < window:
             return None
         return pd.Series(prices).ewm(span=window, adjust=False).mean().iloc[-1]
@@ -126,24 +223,13 @@ class MomentumBot:
     # Stochastic Oscillator with EMA smoothing
     def calculate_stochastic(self, high_prices, low_prices, close_prices, k_period=14, d_period=3):
         """Calculate Stochastic Oscillator with EMA smoothing"""
+        from kernels import stochastic
         if len(close_prices) < k_period + d_period:
             return None, None
-        
-        highs = pd.Series(high_prices)
-        lows = pd.Series(low_prices)
-        closes = pd.Series(close_prices)
-        
-        # Calculate %K
-        lowest_low = lows.rolling(window=k_period).min()
-        highest_high = highs.rolling(window=k_period).max()
-        
-        raw_k = ((closes - lowest_low) / (highest_high - lowest_low)) * 100
-        
-        # Apply EMA smoothing to %K and %D
-        k_percent = raw_k.ewm(span=d_period, adjust=False).mean()
-        d_percent = k_percent.ewm(span=d_period, adjust=False).mean()
-        
-        return k_percent.iloc[-1] if not k_percent.empty else None, d_percent.iloc[-1] if not d_percent.empty else None
+
+        # %K from the rolling low/high, then EMA smoothing of %K and %D (see kernels.py)
+        k_percent, d_percent = stochastic(high_prices, low_prices, close_prices, k_period, d_period)
+        return k_percent[-1], d_percent[-1]
 
     def get_stochastic_signal(self, k, d, overbought=80, oversold=20):
         """Generate signals from Stochastic Oscillator"""
@@ -164,23 +250,13 @@ class MomentumBot:
     # Awesome Oscillator with periods 1 and 34
     def calculate_awesome_oscillator(self, high_prices, low_prices, fast_period=1, slow_period=34):
         """Calculate Awesome Oscillator (AO)"""
+        from kernels import awesome_oscillator
         if len(high_prices) < slow_period:
             return None, None
-        
-        # Calculate median price (High + Low) / 2
-        median_prices = [(high + low) / 2 for high, low in zip(high_prices, low_prices)]
-        
-        # Calculate SMAs
-        sma_fast = pd.Series(median_prices).rolling(window=fast_period).mean()
-        sma_slow = pd.Series(median_prices).rolling(window=slow_period).mean()
-        
-        # Calculate AO
-        ao = sma_fast - sma_slow
-        
-        current_ao = ao.iloc[-1] if not ao.empty else None
-        prev_ao = ao.iloc[-2] if len(ao) > 1 else None
-        
-        return current_ao, prev_ao
+
+        # SMA of the median price (High + Low) / 2 over the fast and slow periods (see kernels.py)
+        ao = awesome_oscillator(high_prices, low_prices, fast_period, slow_period)
+        return ao[-1], ao[-2] if len(ao) > 1 else None
 
     def get_ao_signal(self, current_ao, prev_ao):
         """Generate signals based on Awesome Oscillator"""
@@ -211,37 +287,136 @@ class MomentumBot:
         else:
             return "NEUTRAL", 0
 
+    def indicator(self, bar, name, *series, **params):
+        """``calculate_<name>(*series, **params)``, memoized per bar when ``bar`` is given.
+
+        ``bar`` is an ``IndicatorCache.bar(symbol, timestamp)`` handle (see
+        indicator_cache.py) or None to just compute. The value is keyed by
+        ``name`` and ``params``, so pass parameters by keyword, the same ones
+        in the same order, wherever the value should be shared.
+        """
+        compute = getattr(self, f"calculate_{name}")
+        if bar is None:
+            return compute(*series, **params)
+        return bar.get(name, tuple(params.items()), lambda: compute(*series, **params))
+
+    def remember(self, bar, name, value, **params):
+        """Store a value computed elsewhere (the streaming engine) under ``indicator``'s key for the bar."""
+        return bar.get(name, tuple(params.items()), lambda: value)
+
+    def recall(self, bar, name, **params):
+        """The bar's memoized ``name`` value, or None if nothing computed it; never computes."""
+        return bar.peek(name, tuple(params.items()))
+
     # Momentum strategy
-    def momentum_strategy(self, price_history, high_prices, low_prices, close_prices, volume_data=None):
-        """Momentum strategy using EMA, Stochastic, and Awesome Oscillator"""
-        
-        if len(price_history) < 50:
-            return {
-                'buy_signal': False,
-                'sell_signal': False,
-                'stoch_k': None,
-                'stoch_d': None,
-                'trend': "NEUTRAL",
-                'position_size': 0,
-                'stop_loss': 0,
-                'take_profit': 0,
-                'ao_current': None,
-                'ao_signal': None,
-                'signals': ["No consensus"],
-                'ema_13': None,
-                'ema_20': None,
-                'ema_50': None
-            }
+    @profiled
+    def momentum_strategy(self, price_history, high_prices=None, low_prices=None, close_prices=None, volume_data=None,
+                          bar=None):
+        """Momentum strategy using EMA, Stochastic, and Awesome Oscillator
+
+        ``price_history`` may also be an ``OHLCVRingBuffer``, in which case the
+        high/low/close series are taken from it as zero-copy views. With an
+        ``IndicatorCache`` handle as ``bar`` the indicators are read from (or
+        computed into) that bar's memo.
+        """
+        if isinstance(price_history, OHLCVRingBuffer):
+            history = price_history
+            price_history = close_prices = history.closes()
+            high_prices = history.highs()
+            low_prices = history.lows()
+            volume_data = history.volumes()
+
+        if len(price_history) < MIN_HISTORY:
+            return self._empty_result()
 
         # --- 2 out of 3 consensus logic ---
-        ema_13 = self.calculate_ema(price_history, 13)
-        ema_20 = self.calculate_ema(price_history, 20)
-        ema_50 = self.calculate_ema(price_history, 50)
-        stoch_k, stoch_d = self.calculate_stochastic(high_prices, low_prices, close_prices)
-        stoch_signal, stoch_reason = self.get_stochastic_signal(stoch_k, stoch_d)
-        ao_current, ao_prev = self.calculate_awesome_oscillator(high_prices, low_prices, 1, 34)
+        t0 = metrics.start()
+        # ema_13/ema_20/ema_50 name the fast/mid/slow slots of self.ema_windows
+        ema_13, ema_20, ema_50 = (self.indicator(bar, "ema", price_history, window=w) for w in self.ema_windows)
+        stoch_k, stoch_d = self.indicator(bar, "stochastic", high_prices, low_prices, close_prices,
+                                          k_period=self.k_period, d_period=self.d_period)
+        ao_current, ao_prev = self.indicator(bar, "awesome_oscillator", high_prices, low_prices,
+                                             fast_period=self.ao_fast, slow_period=self.ao_slow)
+        atr = self.indicator(bar, "atr", high_prices, low_prices, close_prices, window=14)
+        metrics.stop("indicators", t0)
+        return self._consensus_result(price_history[-1], ema_13, ema_20, ema_50,
+                                      stoch_k, stoch_d, ao_current, ao_prev, atr)
+
+    @profiled
+    def momentum_strategy_incremental(self, price, high=None, low=None, bar=None):
+        """Momentum strategy fed one bar at a time through the streaming indicator engine.
+
+        Produces the same result dict as ``momentum_strategy`` over the full
+        history, but each call costs O(1) regardless of how many bars were seen.
+        With an ``IndicatorCache`` handle as ``bar`` the engine's values are
+        recorded there under ``momentum_strategy``'s keys, for the other
+        consumers of the bar (AI features, logging) to read.
+        """
+        t0 = metrics.start()
+        self.indicators.update(price, high, low)
+        if self.indicators.count < MIN_HISTORY:
+            metrics.stop("indicators", t0)
+            return self._empty_result()
+        values = self.indicators.snapshot()
+        ema_13, ema_20, ema_50 = (self.indicators.ema(w) for w in self.ema_windows)
+        if bar is not None:
+            for window, value in zip(self.ema_windows, (ema_13, ema_20, ema_50)):
+                self.remember(bar, "ema", value, window=window)
+            self.remember(bar, "stochastic", (values['stoch_k'], values['stoch_d']),
+                          k_period=self.k_period, d_period=self.d_period)
+            self.remember(bar, "awesome_oscillator", (values['ao_current'], values['ao_prev']),
+                          fast_period=self.ao_fast, slow_period=self.ao_slow)
+            self.remember(bar, "atr", values['atr'], window=14)
+        metrics.stop("indicators", t0)
+        return self._consensus_result(price, ema_13, ema_20, ema_50,
+                                      values['stoch_k'], values['stoch_d'],
+                                      values['ao_current'], values['ao_prev'], values['atr'])
+
+    def prime_indicators(self, price_history, high_prices=None, low_prices=None):
+        """Warm the streaming indicator engine from existing history (lists, arrays or an ``OHLCVRingBuffer``)."""
+        if isinstance(price_history, OHLCVRingBuffer):
+            history = price_history
+            price_history, high_prices, low_prices = history.closes(), history.highs(), history.lows()
+        self.indicators = self._new_indicator_engine()
+        self.indicators.update_many(price_history, high_prices, low_prices)
+
+    def update_timeframes(self, timestamp, price, high=None, low=None, volume=0.0):
+        """Feed one timestamped tick or bar to the multi-timeframe aggregator (if enabled)."""
+        if self.timeframes is not None:
+            self.timeframes.update(timestamp, price, high, low, volume)
+
+    def _with_timeframes(self, result):
+        if self.timeframes is not None:
+            result.update(self.timeframes.result())
+        return result
+
+    def _new_indicator_engine(self):
+        return IndicatorEngine(ema_windows=self.ema_windows, k_period=self.k_period, d_period=self.d_period,
+                               ao_fast=self.ao_fast, ao_slow=self.ao_slow)
+
+    def _empty_result(self):
+        return self._with_timeframes({
+            'buy_signal': False,
+            'sell_signal': False,
+            'stoch_k': None,
+            'stoch_d': None,
+            'trend': "NEUTRAL",
+            'position_size': 0,
+            'stop_loss': 0,
+            'take_profit': 0,
+            'ao_current': None,
+            'ao_signal': None,
+            'signals': ["No consensus"],
+            'ema_13': None,
+            'ema_20': None,
+            'ema_50': None
+        })
+
+    def _consensus_result(self, current_price, ema_13, ema_20, ema_50, stoch_k, stoch_d, ao_current, ao_prev, atr):
+        """Apply the 2 out of 3 vote and risk sizing to precomputed indicator values."""
+        t0 = metrics.start()
+        stoch_signal, stoch_reason = self.get_stochastic_signal(stoch_k, stoch_d, self.overbought, self.oversold)
         ao_signal, ao_reason = self.get_ao_signal(ao_current, ao_prev)
-        current_price = price_history[-1]
         trend, strength = self.detect_trend_ema(ema_13, ema_20, ema_50, current_price)
 
         ema_buy = ema_13 is not None and ema_20 is not None and ema_50 is not None and (ema_13 > ema_20 > ema_50 and current_price > ema_13)
@@ -257,31 +432,23 @@ class MomentumBot:
         final_buy_signal = buy_votes >= 2
         final_sell_signal = sell_votes >= 2
 
-        if final_buy_signal:
-            agreed = []
-            if ema_buy: agreed.append("EMA bullish alignment")
-            if stoch_buy: agreed.append("Stochastic BUY")
-            if ao_buy: agreed.append("AO BUY")
-            signals = ["BUY: " + ", ".join(agreed)]
-        elif final_sell_signal:
-            agreed = []
-            if ema_sell: agreed.append("EMA bearish alignment")
-            if stoch_sell: agreed.append("Stochastic SELL")
-            if ao_sell: agreed.append("AO SELL")
-            signals = ["SELL: " + ", ".join(agreed)]
-        else:
-            signals = ["No consensus"]
+        side = "BUY" if final_buy_signal else "SELL" if final_sell_signal else None
+        signals = self._describe_votes(side, "BUY" if ema_buy else "SELL" if ema_sell else None,
+                                       stoch_signal, ao_signal)
+
+        t0 = metrics.lap("consensus", t0)
 
         # Calculate position size and risk levels
         position_size = 0
         stop_loss = 0
         take_profit = 0
-        atr = self.calculate_atr(high_prices, low_prices, close_prices)
         if final_buy_signal or final_sell_signal:
-            position_size = self.calculate_position_size(current_price, atr)
-            stop_loss, take_profit = self.calculate_stop_loss_take_profit(current_price, trend, atr)
+            position_size = self.calculate_position_size(current_price, atr, self.risk_per_trade)
+            stop_loss, take_profit = self.calculate_stop_loss_take_profit(current_price, trend, atr,
+                                                                          self.risk_reward_ratio)
+            metrics.stop("risk", t0)
 
-        return {
+        return self._with_timeframes({
             'buy_signal': final_buy_signal,
             'sell_signal': final_sell_signal,
             'stoch_k': stoch_k,
@@ -296,36 +463,131 @@ class MomentumBot:
             'ema_13': ema_13,
             'ema_20': ema_20,
             'ema_50': ema_50
-        }
+        })
+
+    @staticmethod
+    def _describe_votes(side, ema_vote, stoch_signal, ao_signal):
+        """The ``signals`` strings of a result: which indicators agreed on ``side``."""
+        if side is None:
+            return ["No consensus"]
+        agreed = []
+        if ema_vote == side:
+            agreed.append("EMA bullish alignment" if side == "BUY" else "EMA bearish alignment")
+        if stoch_signal == side:
+            agreed.append(f"Stochastic {side}")
+        if ao_signal == side:
+            agreed.append(f"AO {side}")
+        return [f"{side}: " + ", ".join(agreed)]
+
+    # --- Signal-only fast path ---
+    def momentum_signal(self, price_history, high_prices=None, low_prices=None, close_prices=None, bar=None):
+        """Lazy ``momentum_strategy`` that only answers "trade now?": a ``Signal`` or None.
+
+        Returns None at once while in a position (no trade would be placed).
+        Otherwise the votes are evaluated cheapest first (EMA alignment, then
+        AO, then stochastic), each indicator computed only when its vote is
+        needed, and evaluation stops as soon as 2 out of 3 is decided either
+        way. ATR, sizing and the remaining indicator values are computed only
+        when a signal fires; ``Signal.to_result()`` then equals the
+        ``momentum_strategy`` result. ``bar`` shares indicator values as in
+        ``momentum_strategy``.
+        """
+        if self.in_position:
+            return None
+        if isinstance(price_history, OHLCVRingBuffer):
+            history = price_history
+            price_history = close_prices = history.closes()
+            high_prices = history.highs()
+            low_prices = history.lows()
+        if len(price_history) < MIN_HISTORY:
+            return None
+        t0 = metrics.start()
+        ema = cache(lambda window: self.indicator(bar, "ema", price_history, window=window))
+        stochastic = cache(lambda: self.indicator(bar, "stochastic", high_prices, low_prices, close_prices,
+                                                  k_period=self.k_period, d_period=self.d_period))
+        ao = cache(lambda: self.indicator(bar, "awesome_oscillator", high_prices, low_prices,
+                                          fast_period=self.ao_fast, slow_period=self.ao_slow))
+        atr = lambda: self.indicator(bar, "atr", high_prices, low_prices, close_prices, window=14)
+        signal = self._lazy_signal(price_history[-1], ema, stochastic, ao, atr)
+        metrics.stop("signal", t0)
+        return signal
+
+    def momentum_signal_incremental(self, price, high=None, low=None):
+        """``momentum_signal`` on the streaming engine: feeds the bar, then votes without building a result dict."""
+        engine = self.indicators
+        engine.update(price, high, low)
+        if self.in_position or engine.count < MIN_HISTORY:
+            return None
+        return self._lazy_signal(price, engine.ema, lambda: engine.stochastic.value, lambda: engine.ao.value,
+                                 lambda: engine.atr.value)
+
+    def _lazy_signal(self, price, ema, stochastic, ao, atr):
+        fast_w, mid_w, slow_w = self.ema_windows
+        # 1. EMA alignment, stopping at the first EMA that rules it out
+        ema_vote = None
+        fast = ema(fast_w)
+        if fast is not None and price != fast:
+            direction = "BUY" if price > fast else "SELL"
+            mid = ema(mid_w)
+            if mid is not None and (fast > mid if direction == "BUY" else fast < mid):
+                slow = ema(slow_w)
+                if slow is not None and (mid > slow if direction == "BUY" else mid < slow):
+                    ema_vote = direction
+        # 2. AO zero cross
+        ao_current, ao_prev = ao()
+        ao_signal, _ = self.get_ao_signal(ao_current, ao_prev)
+        if ema_vote is None and ao_signal is None:
+            return None  # the stochastic alone cannot make 2 out of 3
+        # 3. Stochastic: breaks a tie or confirms a single vote (and is part of the result either way)
+        stoch_k, stoch_d = stochastic()
+        stoch_signal, _ = self.get_stochastic_signal(stoch_k, stoch_d, self.overbought, self.oversold)
+        if ema_vote is not None and ema_vote == ao_signal:
+            side = ema_vote
+        elif stoch_signal is not None and stoch_signal in (ema_vote, ao_signal):
+            side = stoch_signal
+        else:
+            return None
+        # A trade will be placed: now pay for everything the result needs
+        emas = (ema(fast_w), ema(mid_w), ema(slow_w))
+        trend, _ = self.detect_trend_ema(*emas, price)
+        bar_atr = atr()
+        position_size = self.calculate_position_size(price, bar_atr, self.risk_per_trade)
+        stop_loss, take_profit = self.calculate_stop_loss_take_profit(price, trend, bar_atr, self.risk_reward_ratio)
+        return Signal(side, price, position_size, stop_loss, take_profit, trend, emas, stoch_k, stoch_d,
+                      ao_current, ao_signal, ema_vote, stoch_signal,
+                      self.timeframes.result() if self.timeframes is not None else None)
 
     def check_exit_conditions(self, current_price):
         """Check if we need to exit position due to stop-loss or take-profit"""
         if not self.in_position:
             return None
+        if isinstance(current_price, OHLCVRingBuffer):
+            current_price = current_price.last_close
             
-        pnl = (current_price - self.entry_price) * self.position_size
+        pnl = self.position_side * (current_price - self.entry_price) * self.position_size
         
         if (self.entry_price > self.stop_loss and current_price <= self.stop_loss) or \
            (self.entry_price < self.stop_loss and current_price >= self.stop_loss):
-            self.account_balance += self.position_size * current_price
-            self.in_position = False
-            result = f"🛑 STOP-LOSS | P&L: ${pnl:.2f}"
-            self._reset_position()
-            return result
+            self.close_position(current_price)
+            return f"🛑 STOP-LOSS | P&L: ${pnl:.2f}"
             
         elif (self.entry_price < self.take_profit and current_price >= self.take_profit) or \
              (self.entry_price > self.take_profit and current_price <= self.take_profit):
-            self.account_balance += self.position_size * current_price
-            self.in_position = False
-            result = f"🎯 TAKE-PROFIT | P&L: ${pnl:.2f}"
-            self._reset_position()
-            return result
+            self.close_position(current_price)
+            return f"🎯 TAKE-PROFIT | P&L: ${pnl:.2f}"
             
         return None
 
+    def close_position(self, price):
+        """Close the open position at ``price``: sell a long's units back, or buy a short's back."""
+        self.account_balance += self.position_side * self.position_size * price
+        self.in_position = False
+        self._reset_position()
+
     def _reset_position(self):
         """Reset position parameters after exit"""
         self.position_size = 0
+        self.position_side = 0
         self.stop_loss = 0
         self.take_profit = 0
         self.entry_price = 0
@@ -336,9 +598,15 @@ class MomentumBot:
         """
         if signal_type not in ["BUY", "SELL"]:
             return "Invalid trade signal."
+        t0 = metrics.start()
 
         # Mark as in position and store trade details
         self.in_position = True
+        self.entry_price = price
+        self.position_size = position_size
+        self.position_side = 1 if signal_type == "BUY" else -1
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
         self.last_trade = {
             "type": signal_type,
             "price": price,
@@ -346,6 +614,30 @@ class MomentumBot:
             "stop_loss": stop_loss,
             "take_profit": take_profit
         }
-        # Example: Deduct position value from balance (for demo purposes)
-        self.account_balance -= position_size * price
-        return f"{signal_type} trade executed at {price:.4f} (size: {position_size}, SL: {stop_loss}, TP: {take_profit})"
\ No newline at end of file
+        # Pay for a long's units; a short's sale credits its proceeds
+        self.account_balance -= self.position_side * position_size * price
+        metrics.stop("order", t0)
+        return f"{signal_type} trade executed at {price:.4f} (size: {position_size}, SL: {stop_loss}, TP: {take_profit})"
+
+    def backtest_from_csv(self, csv_path, performance=None):
+        """
+        Backtest the momentum strategy over a historical OHLCV CSV.
+
+        Indicators and the 2 out of 3 consensus are computed for the whole file
+        in one vectorized pass, then positions are simulated with the same
+        exit and sizing rules as live trading. Returns ``(trades, equity_curve)``
+        DataFrames; a ``performance.PerformanceTracker`` also receives both.
+        """
+        from backtest_engine import run_backtest
+        from columnar import open_csv
+        # Converted once to memory-mapped columns, so large files load without copies
+        df = open_csv(csv_path)
+        return run_backtest(self, df, performance=performance)
+
+    def backtest_from_store(self, symbol, interval="1m", start=None, end=None, cache_dir="data_cache",
+                            performance=None):
+        """Backtest over bars from the local OHLCV cache that data.py maintains."""
+        from bar_store import BarStore
+        from backtest_engine import run_backtest
+        df = BarStore(cache_dir).load(symbol, interval, start=start, end=end)
+        return run_backtest(self, df, performance=performance)
@@ -1,25 +1,65 @@
 import os
-from dotenv import load_dotenv
-import oandapyV20
-import oandapyV20.endpoints.pricing as pricing
-import oandapyV20.endpoints.orders as orders
 
-# Load API credentials
-load_dotenv()
-API_KEY = os.getenv("OANDA_API_KEY")
-ACCOUNT_ID = os.getenv("OANDA_ACCOUNT_ID")
-OANDA_ENV = os.getenv("OANDA_ENV", "practice")
+# Nothing is loaded, read or connected at import: .env, credentials and the
+# oandapyV20 client are set up on first use (see credentials() / create_client()).
+_client = None
+
+
+def credentials():
+    """``(api_key, account_id, environment)`` from the environment, after loading ``.env``."""
+    from dotenv import load_dotenv
+    load_dotenv()
+    return os.getenv("OANDA_API_KEY"), os.getenv("OANDA_ACCOUNT_ID"), os.getenv("OANDA_ENV", "practice")
+
+
+def create_client(api_key=None, environment=None):
+    """Build an ``oandapyV20.API`` client (imports oandapyV20 only now)."""
+    import oandapyV20
+    if api_key is None or environment is None:
+        env_key, _, env_name = credentials()
+        api_key = api_key or env_key
+        environment = environment or env_name
+    return oandapyV20.API(access_token=api_key, environment=environment)
+
+
+def __getattr__(name):
+    # Backwards compatible module attributes (broker.client, broker.API_KEY, ...), resolved lazily
+    global _client
+    if name == "client":
+        if _client is None:
+            _client = create_client()
+        return _client
+    if name in ("API_KEY", "ACCOUNT_ID", "OANDA_ENV"):
+        return dict(zip(("API_KEY", "ACCOUNT_ID", "OANDA_ENV"), credentials()))[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# OANDA API client
-client = oandapyV20.API(access_token=API_KEY)
 
 class OandaBroker:
     def __init__(self, client, account_id):
         self.client = client
         self.account_id = account_id
 
+    @classmethod
+    def from_env(cls):
+        """Broker for the account configured in the environment / ``.env``."""
+        api_key, account_id, environment = credentials()
+        return cls(create_client(api_key, environment), account_id)
+
+    def get_prices(self, instruments):
+        """Fetch bid/ask for many instruments in a single pricing request"""
+        import oandapyV20.endpoints.pricing as pricing
+        params = {"instruments": ",".join(instruments)}
+        r = pricing.PricingInfo(accountID=self.account_id, params=params)
+        self.client.request(r)
+        return {
+            price_data["instrument"]: (float(price_data["bids"][0]["price"]),
+                                       float(price_data["asks"][0]["price"]))
+            for price_data in r.response["prices"]
+        }
+
     def get_price(self, instrument="EUR_USD"):
         """Fetch the latest bid/ask price"""
+        import oandapyV20.endpoints.pricing as pricing
         params = {"instruments": instrument}
         r = pricing.PricingInfo(accountID=self.account_id, params=params)
         self.client.request(r)
@@ -30,6 +70,7 @@ class OandaBroker:
 
     def place_order(self, instrument="EUR_USD", units=100):
         """Place a market order (units > 0 = buy, < 0 = sell)"""
+        import oandapyV20.endpoints.orders as orders
         order_data = {
             "order": {
                 "instrument": instrument,
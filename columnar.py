@@ -0,0 +1,168 @@
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+
+OHLCV = ("Open", "High", "Low", "Close", "Adj Close", "Volume")
+DATE_COLUMNS = ("Date", "Datetime", "date", "datetime", "timestamp")
+META_FILE = "meta.json"
+# Bumped whenever the converted layout or column mapping changes, so older copies are rebuilt
+FORMAT_VERSION = 2
+
+
+# Other spellings of the OHLCV names seen in price files
+_ALIASES = {alias: name for name in OHLCV
+            for alias in (name, name.lower(), name.upper(), name.replace(" ", "_"), name.lower().replace(" ", "_"),
+                          name.replace(" ", ""), name.lower().replace(" ", ""))}
+# yfinance's flattened multi-ticker columns: the name, "_" and the ticker (AAPL, EURUSD=X, ^GSPC, BRK-B)
+_TICKER_SUFFIXED = re.compile(r"(%s)_[A-Z0-9^=.\-]+" % "|".join(OHLCV))
+
+
+def canonical_name(column):
+    """Map known spellings of the OHLCV names (``close``, ``adj_close``, ``High_AAPL``) to ``Close`` etc.
+
+    Only those are mapped; any other name, e.g. ``open_interest``, is kept.
+    """
+    name = _ALIASES.get(column)
+    if name is not None:
+        return name
+    match = _TICKER_SUFFIXED.fullmatch(column)
+    return match.group(1) if match else column
+
+
+def _column_dtype(series):
+    if pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return "int64"
+    if pd.api.types.is_numeric_dtype(series):
+        return "float64"
+    return None
+
+
+def convert_csv(csv_path, out_dir=None, chunksize=1_000_000):
+    """Convert a price CSV once into a directory of raw typed columns.
+
+    Each numeric column becomes ``<name>.bin`` (float64, or int64 for
+    integer columns) and the date column becomes ``index.bin`` holding int64
+    nanoseconds; a numeric date column is read as epoch seconds. The CSV is streamed in chunks, so files larger than memory
+    convert fine. Returns the output directory.
+    """
+    out_dir = out_dir or csv_path + ".cols"
+    os.makedirs(out_dir, exist_ok=True)
+    files = {}
+    meta = {'version': FORMAT_VERSION, 'source': os.path.abspath(csv_path), 'columns': {}, 'index': None,
+            'index_unit': None, 'length': 0}
+    try:
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            if not files:
+                date_col = next((c for c in chunk.columns if c in DATE_COLUMNS), None)
+                if date_col is not None:
+                    meta['index'] = date_col
+                    if pd.api.types.is_numeric_dtype(chunk[date_col]):
+                        meta['index_unit'] = "s"
+                    files['__index__'] = open(os.path.join(out_dir, "index.bin"), "wb")
+                seen = set()
+                for col in chunk.columns:
+                    if col == date_col:
+                        continue
+                    dtype = _column_dtype(chunk[col])
+                    name = canonical_name(col)
+                    if dtype is None or name in seen:
+                        continue
+                    seen.add(name)
+                    meta['columns'][name] = {'source': col, 'dtype': dtype}
+                    files[name] = open(os.path.join(out_dir, name + ".bin"), "wb")
+            if meta['index'] is not None:
+                stamps = pd.to_datetime(chunk[meta['index']], utc=True, unit=meta['index_unit'])
+                files['__index__'].write(stamps.dt.tz_localize(None).to_numpy(dtype="datetime64[ns]")
+                                         .view("int64").tobytes())
+            for name, info in meta['columns'].items():
+                values = chunk[info['source']]
+                if info['dtype'] == "int64" and values.isna().any():
+                    raise ValueError(f"Column {info['source']} has missing values after "
+                                     f"{meta['length']} rows; cannot store it as int64")
+                files[name].write(values.to_numpy(dtype=info['dtype']).tobytes())
+            meta['length'] += len(chunk)
+    finally:
+        for f in files.values():
+            f.close()
+    meta['source_mtime'] = os.path.getmtime(csv_path)
+    with open(os.path.join(out_dir, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+    return out_dir
+
+
+class ColumnarFrame:
+    """Read-only, memory-mapped view of a converted CSV.
+
+    ``frame["Close"]`` returns a NumPy memmap (no copy, no Python lists), so
+    it can go straight into the indicator and backtest code. ``High``,
+    ``Low`` and ``Open`` fall back to ``Close`` when the source had no such
+    column.
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        self.path = path
+        length = self.meta['length']
+        self._columns = {}
+        for name, info in self.meta['columns'].items():
+            self._columns[name] = self._map(name + ".bin", info['dtype'], length)
+        if self.meta['index'] is not None:
+            stamps = self._map("index.bin", "int64", length)
+            self.index = pd.DatetimeIndex(stamps.view("datetime64[ns]"), name=self.meta['index'])
+        else:
+            self.index = pd.RangeIndex(length)
+
+    def _map(self, filename, dtype, length):
+        if length == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.path, filename), dtype=dtype, mode="r", shape=(length,))
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def __len__(self):
+        return self.meta['length']
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def __getitem__(self, name):
+        if name in self._columns:
+            return self._columns[name]
+        if name in ("High", "Low", "Open") and "Close" in self._columns:
+            return self._columns["Close"]
+        raise KeyError(name)
+
+    def to_frame(self, columns=None):
+        """Materialise selected columns as a pandas DataFrame (copies)."""
+        columns = columns or self.columns
+        return pd.DataFrame({name: np.array(self[name]) for name in columns}, index=self.index)
+
+
+def load_columnar(path):
+    return ColumnarFrame(path)
+
+
+def open_csv(csv_path, out_dir=None):
+    """Memory-map ``csv_path``, converting it first if there is no up-to-date columnar copy.
+
+    A copy is up to date if it was converted from the CSV's current
+    modification time by this ``FORMAT_VERSION``.
+    """
+    out_dir = out_dir or csv_path + ".cols"
+    meta_path = os.path.join(out_dir, META_FILE)
+    stale = True
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        stale = (meta.get('version') != FORMAT_VERSION
+                 or meta.get('source_mtime') != os.path.getmtime(csv_path))
+    if stale:
+        convert_csv(csv_path, out_dir)
+    return ColumnarFrame(out_dir)
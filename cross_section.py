@@ -0,0 +1,240 @@
+"""Indicators and the momentum vote for a whole symbol universe at once.
+
+Every function takes ``(symbols x bars)`` arrays, one row per symbol, and
+returns arrays of the same shape holding, at each bar, the value the
+matching ``MomentumBot.calculate_*`` method would return with that symbol's
+history truncated there (NaN where it returns None). Rolling windows take
+one whole-matrix pass per window offset and EWMs step every symbol together
+bar by bar, so a universe costs a few array passes instead of one
+pandas pipeline per symbol.
+
+Rows may be left-padded with NaN for symbols with a shorter history;
+readiness is counted per symbol from its first valid bar.
+"""
+import numpy as np
+
+from indicators import MIN_HISTORY
+
+
+def _matrix(values):
+    values = np.asarray(values, dtype="float64")
+    if values.ndim != 2:
+        raise ValueError(f"expected a (symbols x bars) array, got shape {values.shape}")
+    return values
+
+
+def bar_counts(close):
+    """Valid bars seen so far per symbol and bar (NaN padding does not count)."""
+    return np.cumsum(~np.isnan(_matrix(close)), axis=1)
+
+
+def _ewm(values, span):
+    """``pandas.Series.ewm(span, adjust=False).mean()`` along each row, stepping all rows per bar."""
+    alpha = 2.0 / (span + 1)
+    decay = 1.0 - alpha
+    missing = np.isnan(values)
+    starts = np.argmax(~missing, axis=1)
+    if (missing.sum(axis=1) != starts).any():
+        return _ewm_with_gaps(values, alpha)
+    # Only leading NaN: the plain recurrence, in pandas' operation order
+    norm = decay + alpha
+    last_start = int(starts.max()) if len(starts) else 0
+    out = np.empty_like(values)
+    if not values.shape[1]:
+        return out
+    weighted = values[:, 0].copy()
+    out[:, 0] = weighted
+    for t in range(1, values.shape[1]):
+        cur = values[:, t]
+        weighted *= decay
+        weighted += alpha * cur
+        weighted /= norm
+        if t <= last_start:
+            weighted = np.where(starts == t, cur, weighted)
+        out[:, t] = weighted
+    return out
+
+
+def _ewm_with_gaps(values, alpha):
+    # pandas' recurrence with ignore_na=False: a NaN keeps the value and only decays its weight
+    decay = 1.0 - alpha
+    out = np.empty_like(values)
+    weighted = np.full(len(values), np.nan)
+    old_wt = np.ones(len(values))
+    for t in range(values.shape[1]):
+        cur = values[:, t]
+        observed = cur == cur
+        started = weighted == weighted
+        old_wt = np.where(started, old_wt * decay, old_wt)
+        step = started & observed
+        weighted = np.where(step, (old_wt * weighted + alpha * cur) / (old_wt + alpha), weighted)
+        weighted = np.where(~started & observed, cur, weighted)
+        old_wt = np.where(step, 1.0, old_wt)
+        out[:, t] = weighted
+    return out
+
+
+def _rolling(values, window, combine):
+    """Fold ``combine`` (np.add, np.minimum, ...) over the last ``window`` bars of each row.
+
+    One whole-array pass per window offset; NaN until the window is full.
+    """
+    out = np.full(values.shape, np.nan)
+    n = values.shape[1]
+    if n >= window:
+        acc = values[:, window - 1:].copy()
+        for k in range(1, window):
+            combine(acc, values[:, window - 1 - k:n - k], out=acc)
+        out[:, window - 1:] = acc
+    return out
+
+
+def _rolling_mean(values, window):
+    return _rolling(values, window, np.add) / window
+
+
+def _rolling_std(values, window):
+    """Sample standard deviation (ddof=1) over the last ``window`` bars, two-pass."""
+    mean = _rolling_mean(values, window)
+    out = np.full(values.shape, np.nan)
+    n = values.shape[1]
+    if n >= window:
+        centre = mean[:, window - 1:]
+        acc = np.zeros_like(centre)
+        for k in range(window):
+            deviation = values[:, window - 1 - k:n - k] - centre
+            acc += deviation * deviation
+        out[:, window - 1:] = np.sqrt(acc / (window - 1))
+    return out
+
+
+def _shift(values):
+    return np.concatenate((np.full((len(values), 1), np.nan), values[:, :-1]), axis=1)
+
+
+def ema(close, window, counts=None):
+    """EMA per symbol and bar, as in ``calculate_ema``."""
+    close = _matrix(close)
+    counts = bar_counts(close) if counts is None else counts
+    return np.where(counts >= window, _ewm(close, window), np.nan)
+
+
+def stochastic(high, low, close, k_period=14, d_period=3, counts=None):
+    """EMA-smoothed stochastic ``(%K, %D)``, as in ``calculate_stochastic``."""
+    close = _matrix(close)
+    counts = bar_counts(close) if counts is None else counts
+    lowest_low = _rolling(_matrix(low), k_period, np.minimum)
+    highest_high = _rolling(_matrix(high), k_period, np.maximum)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        raw_k = ((close - lowest_low) / (highest_high - lowest_low)) * 100
+    k_percent = _ewm(raw_k, d_period)
+    d_percent = _ewm(k_percent, d_period)
+    ready = counts >= k_period + d_period
+    return np.where(ready, k_percent, np.nan), np.where(ready, d_percent, np.nan)
+
+
+def awesome_oscillator(high, low, fast_period=1, slow_period=34, counts=None):
+    """Awesome Oscillator ``(current, previous)``, as in ``calculate_awesome_oscillator``."""
+    high = _matrix(high)
+    counts = bar_counts(high) if counts is None else counts
+    median = (high + _matrix(low)) / 2
+    ao = _rolling_mean(median, fast_period) - _rolling_mean(median, slow_period)
+    ready = counts >= slow_period
+    return np.where(ready, ao, np.nan), np.where(ready, _shift(ao), np.nan)
+
+
+def atr(high, low, close, window=14, counts=None):
+    """Average True Range, as in ``calculate_atr``."""
+    high, low, close = _matrix(high), _matrix(low), _matrix(close)
+    counts = bar_counts(close) if counts is None else counts
+    prev_close = _shift(close)
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return np.where(counts >= window + 1, _rolling_mean(tr, window), np.nan)
+
+
+def rsi(close, window=14, counts=None):
+    """RSI from simple rolling averages of gains and losses, as in ``calculate_rsi``."""
+    close = _matrix(close)
+    counts = bar_counts(close) if counts is None else counts
+    delta = close - _shift(close)
+    with np.errstate(invalid="ignore"):
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+    avg_gain = _rolling_mean(gain, window)
+    avg_loss = _rolling_mean(loss, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = 100 - (100 / (1 + avg_gain / avg_loss))
+    return np.where(counts >= window + 1, value, np.nan)
+
+
+def macd(close, fast=12, slow=26, signal=9, counts=None):
+    """MACD line and signal line, as in ``calculate_macd``."""
+    close = _matrix(close)
+    counts = bar_counts(close) if counts is None else counts
+    line = _ewm(close, fast) - _ewm(close, slow)
+    signal_line = _ewm(line, signal)
+    ready = counts >= slow + signal
+    return np.where(ready, line, np.nan), np.where(ready, signal_line, np.nan)
+
+
+def bollinger_bands(close, window=20, num_std=2, counts=None):
+    """Bollinger Bands ``(upper, middle, lower)``, as in ``calculate_bollinger_bands``."""
+    close = _matrix(close)
+    counts = bar_counts(close) if counts is None else counts
+    sma = _rolling_mean(close, window)
+    std = _rolling_std(close, window)
+    ready = counts >= window
+    return (np.where(ready, sma + num_std * std, np.nan), np.where(ready, sma, np.nan),
+            np.where(ready, sma - num_std * std, np.nan))
+
+
+def compute_universe(close, high=None, low=None, ema_windows=(13, 20, 50), k_period=14, d_period=3,
+                     ao_fast=1, ao_slow=34, atr_window=14, rsi_window=14, macd_fast=12, macd_slow=26,
+                     macd_signal=9, bb_window=20, bb_std=2, extended=True):
+    """Every indicator for every symbol and bar: ``{name: (symbols x bars) array}``.
+
+    Names follow ``backtest_engine.compute_indicator_frame`` (``ema_<w>``,
+    ``stoch_k``, ``stoch_d``, ``ao_current``, ``ao_prev``, ``atr``); with
+    ``extended`` also ``rsi``, ``macd``, ``macd_signal``, ``bb_upper``,
+    ``bb_middle`` and ``bb_lower``.
+    """
+    close = _matrix(close)
+    high = close if high is None else _matrix(high)
+    low = close if low is None else _matrix(low)
+    counts = bar_counts(close)
+    out = {f"ema_{w}": ema(close, w, counts) for w in ema_windows}
+    out["stoch_k"], out["stoch_d"] = stochastic(high, low, close, k_period, d_period, counts)
+    out["ao_current"], out["ao_prev"] = awesome_oscillator(high, low, ao_fast, ao_slow, counts)
+    out["atr"] = atr(high, low, close, atr_window, counts)
+    if extended:
+        out["rsi"] = rsi(close, rsi_window, counts)
+        out["macd"], out["macd_signal"] = macd(close, macd_fast, macd_slow, macd_signal, counts)
+        out["bb_upper"], out["bb_middle"], out["bb_lower"] = bollinger_bands(close, bb_window, bb_std, counts)
+    return out
+
+
+def consensus_matrix(close, indicators, ema_windows=(13, 20, 50), overbought=80, oversold=20,
+                     min_history=MIN_HISTORY):
+    """The 2 out of 3 vote of ``momentum_strategy`` for every symbol and bar.
+
+    Returns boolean ``(buy, sell)`` and int8 ``trend`` (+1 UPTREND,
+    -1 DOWNTREND, 0 NEUTRAL) matrices shaped like ``close``.
+    """
+    from backtest_engine import consensus_votes
+    close = _matrix(close)
+    buy, sell, trend = consensus_votes(close, indicators, ema_windows, overbought, oversold, min_history=0)
+    ready = bar_counts(close) >= min_history
+    return buy & ready, sell & ready, trend
+
+
+def screen(bot, close, high=None, low=None):
+    """Latest vote of every symbol with ``bot``'s parameters.
+
+    Returns ``(buy, sell, trend, indicators)``: one entry per symbol for the
+    last bar, with ``indicators`` holding each indicator's last column.
+    """
+    indicators = compute_universe(close, high, low, ema_windows=bot.ema_windows, k_period=bot.k_period,
+                                  d_period=bot.d_period, ao_fast=bot.ao_fast, ao_slow=bot.ao_slow,
+                                  extended=False)
+    buy, sell, trend = consensus_matrix(close, indicators, bot.ema_windows, bot.overbought, bot.oversold)
+    return buy[:, -1], sell[:, -1], trend[:, -1], {name: values[:, -1] for name, values in indicators.items()}
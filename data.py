@@ -1,69 +1,165 @@
-import yfinance as yf
+import os
 import time
 import pandas as pd
+from bar_store import BarStore, period_start
+from ring_buffer import OHLCVRingBuffer
+from instrumentation import metrics
 
-def get_latest_data(symbol="EURUSD=X"):
-    """Fetch the latest OHLCV data of a symbol from Yahoo Finance."""
+# Local bar cache shared by live runs and backtests. With PRICE_CACHE_OFFLINE=1
+# nothing is downloaded and everything is served from the cache.
+CACHE_DIR = os.environ.get("PRICE_CACHE_DIR", "data_cache")
+OFFLINE = os.environ.get("PRICE_CACHE_OFFLINE") == "1"
+store = BarStore(CACHE_DIR)
+
+
+def _tail_start(last, period):
+    """Where an incremental fetch should start, or None when a full ``period`` download is needed."""
+    if last is None:
+        return None
+    start = period_start(period, pd.Timestamp.now(tz="UTC"))
+    if start is not None and last < start:
+        return None
+    # Re-fetch the last stored bar too; it may still have been forming
+    return last.to_pydatetime()
+
+
+def refresh_cache(symbol="EURUSD=X", period="1d", interval="1m"):
+    """Download only the bars newer than the cache (or ``period`` if the cache is empty/stale)."""
+    if OFFLINE:
+        return
     try:
+        import yfinance as yf  # imported on first download, so offline runs never load it
         ticker = yf.Ticker(symbol)
-        df = ticker.history(period="1d", interval="1m")
-        if not df.empty:
-            return {
-                'price': df["Close"].iloc[-1],
-                'high': df["High"].iloc[-1],
-                'low': df["Low"].iloc[-1],
-                'open': df["Open"].iloc[-1],
-                'volume': df["Volume"].iloc[-1]
-            }
+        start = _tail_start(store.last_timestamp(symbol, interval), period)
+        if start is not None:
+            df = ticker.history(start=start, interval=interval)
+        else:
+            df = ticker.history(period=period, interval=interval)
+        store.write(symbol, interval, df)
     except:
         pass
-    return None
 
-def get_historical_data(symbol="EURUSD=X", period="1d", interval="1m"):
-    """Fetch historical OHLCV data for indicator calculations."""
+
+def refresh_cache_batch(symbols, period="1d", interval="1m"):
+    """Incrementally refresh many symbols with a single Yahoo Finance request."""
+    if OFFLINE:
+        return
     try:
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(period=period, interval=interval)
-        if not df.empty:
-            return {
-                'prices': df["Close"].tolist(),
-                'highs': df["High"].tolist(),
-                'lows': df["Low"].tolist(),
-                'opens': df["Open"].tolist(),
-                'volumes': df["Volume"].tolist()
-            }
+        import yfinance as yf
+        starts = [_tail_start(store.last_timestamp(s, interval), period) for s in symbols]
+        if all(start is not None for start in starts):
+            df = yf.download(list(symbols), start=min(starts), interval=interval,
+                             group_by="ticker", progress=False, threads=True)
+        else:
+            df = yf.download(list(symbols), period=period, interval=interval,
+                             group_by="ticker", progress=False, threads=True)
+        for symbol, sub in _split_batch(df, symbols).items():
+            store.write(symbol, interval, sub)
     except:
         pass
-    return {'prices': [], 'highs': [], 'lows': [], 'opens': [], 'volumes': []}
 
-def stream_prices(symbol="EURUSD=X", interval=5):
-    """Stream live prices with full OHLCV data every `interval` seconds (generator)."""
+
+def _latest_from_store(symbol, interval):
+    last = store.last_timestamp(symbol, interval)
+    if last is None:
+        return None
+    df = store.load(symbol, interval, start=last)
+    return {
+        'price': df["Close"].iloc[-1],
+        'high': df["High"].iloc[-1],
+        'low': df["Low"].iloc[-1],
+        'open': df["Open"].iloc[-1],
+        'volume': df["Volume"].iloc[-1],
+        'timestamp': df.index[-1].timestamp()
+    }
+
+
+def _history_from_store(symbol, period, interval):
+    df = store.load_period(symbol, interval, period)
+    return {
+        'prices': df["Close"].tolist(),
+        'highs': df["High"].tolist(),
+        'lows': df["Low"].tolist(),
+        'opens': df["Open"].tolist(),
+        'volumes': df["Volume"].tolist(),
+        'timestamps': (df.index.as_unit("ns").asi8 / 1e9).tolist()
+    }
+
+
+def get_latest_data(symbol="EURUSD=X", interval="1m"):
+    """Fetch the latest OHLCV data of a symbol (new bars only, then read from the local cache)."""
+    t0 = metrics.start()
+    refresh_cache(symbol, period="1d", interval=interval)
+    latest = _latest_from_store(symbol, interval)
+    metrics.stop("fetch", t0)
+    return latest
+
+def get_historical_data(symbol="EURUSD=X", period="1d", interval="1m"):
+    """Fetch historical OHLCV data for indicator calculations.
+
+    Only bars missing from the local cache are downloaded; a warm start (or
+    an offline run) is served entirely from disk.
+    """
+    refresh_cache(symbol, period=period, interval=interval)
+    return _history_from_store(symbol, period, interval)
+
+def stream_prices(symbol="EURUSD=X", interval=5, depth=200):
+    """Stream live prices with full OHLCV data every `interval` seconds (generator).
+
+    Yields ``(prev_price, current_price, history)`` where ``history`` is an
+    ``OHLCVRingBuffer`` holding the last ``depth`` bars; it is updated in place
+    and can be passed straight to ``MomentumBot.momentum_strategy``.
+    """
     prev_price = None
     historical_data = get_historical_data(symbol, period="1d", interval="1m")
-    
-    price_history = historical_data['prices']
-    high_history = historical_data['highs']
-    low_history = historical_data['lows']
-    volume_history = historical_data['volumes']
-    
+
+    history = OHLCVRingBuffer(depth)
+    history.extend(historical_data['opens'], historical_data['highs'], historical_data['lows'],
+                   historical_data['prices'], historical_data['volumes'])
+
     while True:
         latest_data = get_latest_data(symbol)
         if latest_data and latest_data['price']:
             current_price = latest_data['price']
-            
-            # Update history arrays
-            price_history.append(current_price)
-            high_history.append(latest_data['high'])
-            low_history.append(latest_data['low'])
-            volume_history.append(latest_data['volume'])
-            
-            # Keep last 200 data points
-            if len(price_history) > 200:
-                price_history = price_history[-200:]
-                high_history = high_history[-200:]
-                low_history = low_history[-200:]
-                volume_history = volume_history[-200:]
-            
-            yield prev_price, current_price, price_history, high_history, low_history, volume_history
+
+            # Append in place; the buffer drops the oldest bar once full
+            history.append(latest_data['open'], latest_data['high'], latest_data['low'],
+                           current_price, latest_data['volume'])
+
+            yield prev_price, current_price, history
             prev_price = current_price
-        time.sleep(interval)
\ No newline at end of file
+        time.sleep(interval)
+
+
+def _split_batch(df, symbols):
+    """Split a multi-ticker yf.download frame into one OHLCV frame per symbol."""
+    frames = {}
+    for symbol in symbols:
+        try:
+            if isinstance(df.columns, pd.MultiIndex):
+                sub = df[symbol]
+            else:
+                sub = df
+            sub = sub.dropna(how="all")
+            if not sub.empty:
+                frames[symbol] = sub
+        except KeyError:
+            continue
+    return frames
+
+
+def get_latest_data_batch(symbols, period="1d", interval="1m"):
+    """Fetch the latest OHLCV bar for many symbols with a single Yahoo Finance request."""
+    refresh_cache_batch(symbols, period=period, interval=interval)
+    latest = {}
+    for symbol in symbols:
+        bar = _latest_from_store(symbol, interval)
+        if bar is not None:
+            latest[symbol] = bar
+    return latest
+
+
+def get_historical_data_batch(symbols, period="1d", interval="1m"):
+    """Fetch historical OHLCV data for many symbols with a single Yahoo Finance request."""
+    refresh_cache_batch(symbols, period=period, interval=interval)
+    return {symbol: _history_from_store(symbol, period, interval) for symbol in symbols}
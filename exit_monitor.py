@@ -0,0 +1,158 @@
+"""Tick-level stop-loss / take-profit monitoring, decoupled from the strategy cadence.
+
+``ExitMonitor`` holds the stop and target of every open position as
+trigger levels in price-sorted lists, one set per symbol and quote side
+(long positions exit at the bid, shorts at the ask). A level that fires
+when the price falls to it goes in ``below``, one that fires when the price
+rises to it in ``above``; a tick then only has to look at the ends of the
+two lists. A quiet tick costs two comparisons and a tick that crosses
+``k`` levels costs ``O(log n + k)``. The trigger rules are those of
+``MomentumBot.check_exit_conditions``: the side of the entry a level sits
+on decides the direction, and a stop wins over a target hit on the same
+tick.
+
+``MultiSymbolRunner`` feeds it from a fast quote source (``quote_source``)
+between its strategy polls; see ``broker_quotes`` for OANDA bid/ask.
+"""
+import bisect
+import math
+
+
+STOP_LOSS, TAKE_PROFIT = "STOP-LOSS", "TAKE-PROFIT"
+
+
+def oanda_instrument(symbol):
+    """OANDA instrument name for a Yahoo Finance FX symbol (``EURUSD=X`` -> ``EUR_USD``); others unchanged."""
+    if symbol.endswith("=X") and len(symbol) == 8:
+        return f"{symbol[:3]}_{symbol[3:6]}"
+    return symbol
+
+
+def broker_quotes(broker, instrument=oanda_instrument):
+    """A ``quote_source`` over ``broker.get_prices`` (``OandaBroker``, ``OandaClient``, ``MockOandaBroker``).
+
+    Returns ``quotes(symbols) -> {symbol: (bid, ask)}`` with one pricing
+    request per call, translating symbols with ``instrument``.
+    """
+    def quotes(symbols):
+        names = {instrument(symbol): symbol for symbol in symbols}
+        return {names[name]: quote for name, quote in broker.get_prices(list(names)).items() if name in names}
+    return quotes
+
+
+class _Order:
+    __slots__ = ("key", "symbol", "side", "size", "entry", "stop_loss", "take_profit", "levels")
+
+    def __init__(self, key, symbol, side, size, entry, stop_loss, take_profit):
+        self.key = key
+        self.symbol = symbol
+        self.side = side
+        self.size = size
+        self.entry = entry
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.levels = []
+
+    def stop_hit(self, price):
+        entry, stop = self.entry, self.stop_loss
+        return (entry > stop and price <= stop) or (entry < stop and price >= stop)
+
+
+class _Levels:
+    """Trigger levels of one symbol and quote side, as sorted ``(level, seq, key)`` entries."""
+
+    def __init__(self):
+        self.below = []  # fire when the price falls to the level: the highest ones go first
+        self.above = []  # fire when the price rises to the level: the lowest ones go first
+
+    def crossed(self, price):
+        below, above = self.below, self.above
+        fired = []
+        if below and below[-1][0] >= price:
+            fired.extend(below[bisect.bisect_left(below, (price,)):])
+        if above and above[0][0] <= price:
+            fired.extend(above[:bisect.bisect_right(above, (price, math.inf))])
+        return fired
+
+    def __len__(self):
+        return len(self.below) + len(self.above)
+
+
+class ExitMonitor:
+    """Open stops and targets, checked against every quote tick.
+
+    ``add`` registers a position under ``key`` (the runner uses the symbol
+    for single-position bots and the position id with a portfolio);
+    ``on_tick`` returns the positions whose stop or target the quote
+    crossed, removing them, as ``(key, symbol, side, size, entry, price,
+    reason, pnl)`` tuples in the order they were added. ``discard`` forgets
+    a position closed elsewhere.
+    """
+
+    def __init__(self):
+        self.orders = {}
+        self.books = {}
+        self._seq = 0
+
+    def add(self, symbol, side, size, entry, stop_loss, take_profit, key=None):
+        """Watch a ``side`` ("BUY"/"SELL") position; replaces any position already under ``key``."""
+        key = symbol if key is None else key
+        self.discard(key)
+        order = _Order(key, symbol, side, size, entry, stop_loss, take_profit)
+        books = self.books.get(symbol)
+        if books is None:
+            books = self.books[symbol] = (_Levels(), _Levels())
+        levels = books[0] if side == "BUY" else books[1]
+        self._seq += 1
+        for level in (stop_loss, take_profit):
+            # A level at the entry price never triggers in check_exit_conditions
+            if level is None or level != level or level == entry:
+                continue
+            target = levels.below if level < entry else levels.above
+            item = (level, self._seq, key)
+            bisect.insort(target, item)
+            order.levels.append((target, item))
+        self.orders[key] = order
+        return key
+
+    def discard(self, key):
+        """Stop watching ``key``; returns False if it was not watched."""
+        order = self.orders.pop(key, None)
+        if order is None:
+            return False
+        for target, item in order.levels:
+            i = bisect.bisect_left(target, item)
+            if i < len(target) and target[i] == item:
+                del target[i]
+        return True
+
+    def on_tick(self, symbol, bid, ask=None):
+        """Fire the positions of ``symbol`` crossed by a ``bid``/``ask`` quote (``ask`` defaults to ``bid``)."""
+        books = self.books.get(symbol)
+        if books is None:
+            return []
+        ask = bid if ask is None else ask
+        fired = [(item, bid) for item in books[0].crossed(bid)] + [(item, ask) for item in books[1].crossed(ask)]
+        if not fired:
+            return []
+        exits = []
+        for (_, _, key), price in sorted(fired, key=lambda entry: entry[0][1]):
+            order = self.orders.get(key)
+            if order is None:
+                continue  # both of its levels were crossed
+            self.discard(key)
+            reason = STOP_LOSS if order.stop_hit(price) else TAKE_PROFIT
+            sign = 1 if order.side == "BUY" else -1
+            exits.append((key, symbol, order.side, order.size, order.entry, price, reason,
+                          sign * order.size * (price - order.entry)))
+        return exits
+
+    def symbols(self):
+        """Symbols with at least one level to watch."""
+        return [symbol for symbol, books in self.books.items() if len(books[0]) or len(books[1])]
+
+    def __len__(self):
+        return len(self.orders)
+
+    def __contains__(self, key):
+        return key in self.orders
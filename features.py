@@ -0,0 +1,182 @@
+from collections import deque
+from functools import cache
+
+import numpy as np
+
+from indicators import MIN_HISTORY, IndicatorEngine
+
+
+# AI model inputs, in order: the EMA fast/mid/slow slots, stochastic %K/%D and AO,
+# exactly as MomentumBot.momentum_strategy reports them
+FEATURES = ["ema_13", "ema_20", "ema_50", "stoch_k", "stoch_d", "ao_current"]
+
+
+def _params(bot):
+    if bot is None:
+        return (13, 20, 50), 14, 3, 1, 34
+    return bot.ema_windows, bot.k_period, bot.d_period, bot.ao_fast, bot.ao_slow
+
+
+def build_feature_matrix(close, high=None, low=None, bot=None):
+    """Feature rows for every bar of an OHLCV history, computed vectorized.
+
+    Row ``i`` equals ``MomentumBotWithAI.feature_row`` of ``momentum_strategy``
+    run on bars ``0..i``: indicator definitions and parameters come from
+    ``bot`` (MomentumBot defaults if omitted), missing values are 0, and bars
+    before the strategy's 50-bar warm-up are all zeros.
+    """
+    import pandas as pd
+    from backtest_engine import awesome_oscillator_columns, ema_column, stochastic_columns
+    close = np.asarray(close, dtype="float64")
+    high = close if high is None else np.asarray(high, dtype="float64")
+    low = close if low is None else np.asarray(low, dtype="float64")
+    ema_windows, k_period, d_period, ao_fast, ao_slow = _params(bot)
+    cols = [ema_column(close, w) for w in ema_windows]
+    cols.extend(stochastic_columns(high, low, close, k_period, d_period))
+    cols.append(awesome_oscillator_columns(high, low, ao_fast, ao_slow)[0])
+    X = np.nan_to_num(np.column_stack(cols), nan=0.0)
+    X[:MIN_HISTORY - 1] = 0.0
+    return pd.DataFrame(X, columns=FEATURES)
+
+
+def latest_feature_row(close, high=None, low=None, bot=None, bar=None):
+    """The feature row of the last bar of a history, computed for that bar only.
+
+    Equals ``MomentumBotWithAI.feature_row`` of ``momentum_strategy`` on the
+    same history. The indicators go through ``bot.indicator``, so with the
+    ``IndicatorCache`` handle the strategy used as ``bar`` the row costs
+    lookups only.
+    """
+    if len(close) < MIN_HISTORY:
+        return [0] * len(FEATURES)
+    if bot is None:
+        bot = _default_bot()
+    high = close if high is None else high
+    low = close if low is None else low
+    emas = [bot.indicator(bar, "ema", close, window=w) for w in bot.ema_windows]
+    stoch_k, stoch_d = bot.indicator(bar, "stochastic", high, low, close, k_period=bot.k_period, d_period=bot.d_period)
+    ao_current, _ = bot.indicator(bar, "awesome_oscillator", high, low,
+                                  fast_period=bot.ao_fast, slow_period=bot.ao_slow)
+    return [value or 0 for value in emas + [stoch_k, stoch_d, ao_current]]
+
+
+def bar_feature_row(bar, bot=None):
+    """The feature row from a bar's ``IndicatorCache`` memo alone (zeros for what nothing computed).
+
+    After ``momentum_strategy`` or ``momentum_strategy_incremental`` ran with
+    the same ``bar`` this equals ``latest_feature_row`` without touching the
+    history.
+    """
+    if bot is None:
+        bot = _default_bot()
+    emas = [bot.recall(bar, "ema", window=w) for w in bot.ema_windows]
+    stoch_k, stoch_d = bot.recall(bar, "stochastic", k_period=bot.k_period, d_period=bot.d_period) or (None, None)
+    ao_current, _ = bot.recall(bar, "awesome_oscillator", fast_period=bot.ao_fast,
+                               slow_period=bot.ao_slow) or (None, None)
+    return [value or 0 for value in emas + [stoch_k, stoch_d, ao_current]]
+
+
+@cache
+def _default_bot():
+    from bot import MomentumBot
+    return MomentumBot()
+
+
+def make_labels(close, horizon=5, threshold=0.0):
+    """Label each bar 1 (BUY), -1 (SELL) or 0 (HOLD) from its forward return over ``horizon`` bars.
+
+    The last ``horizon`` bars have no label yet and are returned as 0 with
+    ``valid`` set to False.
+    """
+    close = np.asarray(close, dtype="float64")
+    forward = np.full(len(close), np.nan)
+    if len(close) > horizon:
+        forward[:-horizon] = close[horizon:] / close[:-horizon] - 1
+    labels = np.where(forward > threshold, 1, np.where(forward < -threshold, -1, 0))
+    valid = ~np.isnan(forward)
+    labels[~valid] = 0
+    return labels, valid
+
+
+def training_set(df, bot=None, horizon=5, threshold=0.0):
+    """``(X, y)`` from an OHLCV frame, skipping the warm-up and the unlabeled tail."""
+    close = np.asarray(df["Close"], dtype="float64")
+    X = build_feature_matrix(close, df["High"], df["Low"], bot).to_numpy()
+    y, valid = make_labels(close, horizon, threshold)
+    valid[:MIN_HISTORY - 1] = False
+    return X[valid], y[valid]
+
+
+class OnlineFeatureBuilder:
+    """Builds the same feature row as ``build_feature_matrix`` one bar at a time."""
+
+    def __init__(self, bot=None):
+        ema_windows, k_period, d_period, ao_fast, ao_slow = _params(bot)
+        self.ema_windows = ema_windows
+        self.engine = IndicatorEngine(ema_windows=ema_windows, k_period=k_period,
+                                      d_period=d_period, ao_fast=ao_fast, ao_slow=ao_slow)
+
+    def update(self, close, high=None, low=None):
+        self.engine.update(close, high, low)
+        if self.engine.count < MIN_HISTORY:
+            return [0.0] * len(FEATURES)
+        stoch_k, stoch_d = self.engine.stochastic.value
+        ao_current, _ = self.engine.ao.value
+        values = [self.engine.ema(w) for w in self.ema_windows] + [stoch_k, stoch_d, ao_current]
+        return [0.0 if v is None or v != v else v for v in values]
+
+
+class OnlineTrainer:
+    """Intraday model refresh from a bar stream with ``AIModel.partial_fit``.
+
+    Each bar's features wait ``horizon`` bars for their label; labeled rows
+    are fitted in mini-batches of ``batch_size``. Memory stays bounded by
+    ``horizon + batch_size`` rows no matter how long the stream runs.
+    """
+
+    def __init__(self, model, bot=None, horizon=5, threshold=0.0, batch_size=256, save_every=0):
+        self.model = model
+        self.features = OnlineFeatureBuilder(bot)
+        self.horizon = horizon
+        self.threshold = threshold
+        self.batch_size = batch_size
+        self.save_every = save_every
+        self._pending = deque()
+        self._batch_X = []
+        self._batch_y = []
+        self.bars = 0
+        self.batches = 0
+
+    def update(self, close, high=None, low=None):
+        """Feed one bar; returns True when it completed a training batch."""
+        row = self.features.update(close, high, low)
+        self.bars += 1
+        if self.bars >= MIN_HISTORY:
+            self._pending.append((row, close))
+        if len(self._pending) > self.horizon:
+            past_row, past_close = self._pending.popleft()
+            change = close / past_close - 1
+            label = 1 if change > self.threshold else -1 if change < -self.threshold else 0
+            self._batch_X.append(past_row)
+            self._batch_y.append(label)
+        if len(self._batch_X) >= self.batch_size:
+            self.flush()
+            return True
+        return False
+
+    def update_many(self, closes, highs=None, lows=None):
+        highs = closes if highs is None else highs
+        lows = closes if lows is None else lows
+        for close, high, low in zip(closes, highs, lows):
+            self.update(close, high, low)
+
+    def flush(self):
+        """Fit whatever labeled rows are buffered."""
+        if not self._batch_X:
+            return
+        self.model.partial_fit(self._batch_X, self._batch_y)
+        self._batch_X = []
+        self._batch_y = []
+        self.batches += 1
+        if self.save_every and self.batches % self.save_every == 0:
+            self.model.save()
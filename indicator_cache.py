@@ -0,0 +1,115 @@
+"""Per-bar memoization of indicator values, shared by every consumer of a bar.
+
+One strategy pass over a bar's history computes EMAs, the stochastic, the
+Awesome Oscillator and the ATR; every other variant run on the same symbol
+and bar (``MomentumBotWithAI``, ``momentum_signal``, the AI feature row,
+the debug log) needs exactly the same numbers. ``IndicatorCache`` keeps them
+keyed by ``(symbol, bar timestamp, version, indicator, parameters)``:
+``cache.bar(symbol, timestamp, version)`` returns the handle those consumers
+pass around (``bar=``), and the first of them to ask for an indicator
+computes it while the rest read it back.
+
+``version`` tells apart states of a bar that share a timestamp. data.py
+re-fetches the still-forming last bar under its timestamp, so a live caller
+passes something that changes with every evaluation (``MultiSymbolRunner``
+uses the symbol's evaluation count).
+
+The cache is an LRU over bars: once more than ``maxsize`` bars are held the
+least recently used bar is dropped with all of its values. A bar key stands
+for one history ending at that bar, so consumers that look at differently
+windowed histories of a symbol must not share a handle. ``hits``, ``misses``
+and ``evictions`` count what it saved.
+"""
+from collections import OrderedDict
+
+
+class BarIndicators:
+    """The memoized indicator values of one ``(symbol, timestamp, version)`` bar."""
+
+    __slots__ = ("cache", "symbol", "timestamp", "version", "values")
+
+    def __init__(self, cache, symbol, timestamp, version=None):
+        self.cache = cache
+        self.symbol = symbol
+        self.timestamp = timestamp
+        self.version = version
+        self.values = {}
+
+    def get(self, indicator, params, compute):
+        """The value of ``indicator`` with ``params`` (``(name, value)`` pairs), computed only once."""
+        key = (indicator, params)
+        values = self.values
+        if key in values:
+            self.cache.hits += 1
+            return values[key]
+        self.cache.misses += 1
+        value = values[key] = compute()
+        return value
+
+    def peek(self, indicator, params, default=None):
+        """The value if it was computed for this bar, else ``default``; never computes."""
+        value = self.values.get((indicator, params), self)
+        if value is self:
+            return default
+        self.cache.hits += 1
+        return value
+
+    def snapshot(self):
+        """Everything computed for this bar so far, as ``{"ema_13": ..., "stochastic_14_3": ...}``."""
+        return {"_".join([indicator, *(str(value) for _, value in params)]): value
+                for (indicator, params), value in self.values.items()}
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return f"BarIndicators({self.symbol!r}, {self.timestamp!r}, {self.version!r}, {len(self.values)} values)"
+
+
+class IndicatorCache:
+    """Bounded LRU of ``BarIndicators`` with hit/miss counters.
+
+    ``bar(symbol, timestamp, version)`` returns the handle of a bar, creating it (and
+    evicting the least recently used bar beyond ``maxsize``) on first use.
+    ``get`` is the one-shot form for callers that do not hold a handle.
+    """
+
+    def __init__(self, maxsize=1024):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._bars = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def bar(self, symbol, timestamp, version=None):
+        key = (symbol, timestamp, version)
+        bars = self._bars
+        handle = bars.get(key)
+        if handle is not None:
+            bars.move_to_end(key)
+            return handle
+        handle = bars[key] = BarIndicators(self, symbol, timestamp, version)
+        if len(bars) > self.maxsize:
+            bars.popitem(last=False)
+            self.evictions += 1
+        return handle
+
+    def get(self, symbol, timestamp, indicator, params, compute, version=None):
+        return self.bar(symbol, timestamp, version).get(indicator, params, compute)
+
+    def clear(self):
+        """Drop every bar; the counters keep running."""
+        self._bars.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "bars": len(self._bars),
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def __len__(self):
+        return len(self._bars)
+
+    def __contains__(self, key):
+        return key in self._bars
@@ -0,0 +1,397 @@
+import math
+from collections import deque
+
+
+# Bars of history momentum_strategy needs before it votes
+MIN_HISTORY = 50
+
+
+NAN = float("nan")
+
+
+class StreamingEMA:
+    """Exponential moving average updated one value at a time.
+
+    Mirrors ``pd.Series.ewm(span=window, adjust=False).mean()`` including the
+    way pandas decays the previous weight across NaN gaps, so the values match
+    the batch calculation to floating-point tolerance.
+    """
+
+    __slots__ = ("window", "alpha", "value", "count", "_old_wt")
+
+    def __init__(self, window):
+        self.window = window
+        self.alpha = 2.0 / (window + 1.0)
+        self.value = NAN
+        self.count = 0
+        self._old_wt = 1.0
+
+    def update(self, x):
+        self.count += 1
+        if self.value != self.value:
+            # No observation yet: the first valid value seeds the average
+            self.value = x
+            return self.value
+        self._old_wt *= 1.0 - self.alpha
+        if x == x:
+            if self.value != x:
+                self.value = (self._old_wt * self.value + self.alpha * x) / (self._old_wt + self.alpha)
+            self._old_wt = 1.0
+        return self.value
+
+
+class RollingMean:
+    """Rolling mean over a fixed window using a running sum.
+
+    The sum is rebuilt from the window once per ``window`` updates so that
+    rounding error cannot accumulate over long streams (amortised O(1)).
+    """
+
+    __slots__ = ("window", "values", "total", "_since_rebuild")
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self._since_rebuild = 0
+
+    def update(self, x):
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(x)
+        self.total += x
+        self._since_rebuild += 1
+        if self._since_rebuild >= self.window:
+            self.total = math.fsum(self.values)
+            self._since_rebuild = 0
+        return self.mean
+
+    @property
+    def ready(self):
+        return len(self.values) == self.window
+
+    @property
+    def mean(self):
+        if not self.ready:
+            return NAN
+        return self.total / self.window
+
+
+class RollingStd:
+    """Rolling sample standard deviation (ddof=1) using a sliding Welford update."""
+
+    __slots__ = ("window", "values", "_mean", "_m2", "_since_rebuild")
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._since_rebuild = 0
+
+    def update(self, x):
+        n = len(self.values)
+        if n < self.window:
+            self.values.append(x)
+            delta = x - self._mean
+            self._mean += delta / (n + 1)
+            self._m2 += delta * (x - self._mean)
+        else:
+            old = self.values[0]
+            self.values.append(x)
+            old_mean = self._mean
+            self._mean += (x - old) / self.window
+            self._m2 += (x - old) * (x - self._mean + old - old_mean)
+        self._since_rebuild += 1
+        if self._since_rebuild >= self.window:
+            self._rebuild()
+        return self.std
+
+    def _rebuild(self):
+        n = len(self.values)
+        self._mean = math.fsum(self.values) / n
+        self._m2 = math.fsum((v - self._mean) ** 2 for v in self.values)
+        self._since_rebuild = 0
+
+    @property
+    def ready(self):
+        return len(self.values) == self.window
+
+    @property
+    def std(self):
+        if not self.ready or self.window < 2:
+            return NAN
+        return math.sqrt(max(self._m2, 0.0) / (self.window - 1))
+
+
+class RollingExtreme:
+    """Rolling max (or min) over a fixed window backed by a monotonic deque."""
+
+    __slots__ = ("window", "_is_max", "_deque", "_index")
+
+    def __init__(self, window, mode="max"):
+        if mode not in ("max", "min"):
+            raise ValueError("mode must be 'max' or 'min'")
+        self.window = window
+        self._is_max = mode == "max"
+        self._deque = deque()
+        self._index = 0
+
+    def update(self, x):
+        dq = self._deque
+        if self._is_max:
+            while dq and dq[-1][1] <= x:
+                dq.pop()
+        else:
+            while dq and dq[-1][1] >= x:
+                dq.pop()
+        dq.append((self._index, x))
+        if dq[0][0] <= self._index - self.window:
+            dq.popleft()
+        self._index += 1
+        return self.value
+
+    @property
+    def ready(self):
+        return self._index >= self.window
+
+    @property
+    def value(self):
+        if not self.ready:
+            return NAN
+        return self._deque[0][1]
+
+
+def _safe_div(numerator, denominator):
+    """Float division with numpy semantics (inf/NaN instead of ZeroDivisionError)."""
+    if denominator == 0:
+        if numerator == 0 or numerator != numerator:
+            return NAN
+        return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+    return numerator / denominator
+
+
+class StreamingStochastic:
+    """Stochastic %K/%D with EMA smoothing, matching ``MomentumBot.calculate_stochastic``."""
+
+    def __init__(self, k_period=14, d_period=3):
+        self.k_period = k_period
+        self.d_period = d_period
+        self.highest = RollingExtreme(k_period, "max")
+        self.lowest = RollingExtreme(k_period, "min")
+        self.k_ema = StreamingEMA(d_period)
+        self.d_ema = StreamingEMA(d_period)
+        self.count = 0
+
+    def update(self, high, low, close):
+        self.count += 1
+        hh = self.highest.update(high)
+        ll = self.lowest.update(low)
+        raw_k = _safe_div(close - ll, hh - ll) * 100 if self.highest.ready else NAN
+        k = self.k_ema.update(raw_k)
+        d = self.d_ema.update(k)
+        return k, d
+
+    @property
+    def value(self):
+        if self.count < self.k_period + self.d_period:
+            return None, None
+        return self.k_ema.value, self.d_ema.value
+
+
+class StreamingAwesomeOscillator:
+    """Awesome Oscillator (SMA of median price, fast minus slow) with its previous value."""
+
+    def __init__(self, fast_period=1, slow_period=34):
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        self.fast = RollingMean(fast_period)
+        self.slow = RollingMean(slow_period)
+        self.current = NAN
+        self.previous = NAN
+        self.count = 0
+
+    def update(self, high, low):
+        self.count += 1
+        median = (high + low) / 2
+        fast = self.fast.update(median)
+        slow = self.slow.update(median)
+        self.previous = self.current
+        self.current = fast - slow
+        return self.current
+
+    @property
+    def value(self):
+        if self.count < self.slow_period:
+            return None, None
+        return self.current, (self.previous if self.count > 1 else None)
+
+
+class StreamingATR:
+    """Average True Range as a simple rolling mean of the true range."""
+
+    def __init__(self, window=14):
+        self.window = window
+        self.tr_mean = RollingMean(window)
+        self.prev_close = None
+        self.count = 0
+
+    def update(self, high, low, close):
+        self.count += 1
+        tr = high - low
+        if self.prev_close is not None:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        return self.tr_mean.update(tr)
+
+    @property
+    def value(self):
+        if self.count < self.window + 1:
+            return None
+        return self.tr_mean.mean
+
+
+class StreamingRSI:
+    """RSI with simple rolling averages of gains and losses, matching ``calculate_rsi``."""
+
+    def __init__(self, window=14):
+        self.window = window
+        self.gains = RollingMean(window)
+        self.losses = RollingMean(window)
+        self.prev_price = None
+        self.count = 0
+
+    def update(self, price):
+        self.count += 1
+        delta = 0.0 if self.prev_price is None else price - self.prev_price
+        self.prev_price = price
+        self.gains.update(delta if delta > 0 else 0.0)
+        self.losses.update(-delta if delta < 0 else 0.0)
+        return self.value
+
+    @property
+    def value(self):
+        if self.count < self.window + 1:
+            return None
+        rs = _safe_div(self.gains.mean, self.losses.mean)
+        return 100 - _safe_div(100, 1 + rs)
+
+
+class StreamingMACD:
+    """MACD line and signal line built from three chained EMAs."""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.slow_period = slow
+        self.signal_period = signal
+        self.fast = StreamingEMA(fast)
+        self.slow = StreamingEMA(slow)
+        self.signal = StreamingEMA(signal)
+        self.count = 0
+
+    def update(self, price):
+        self.count += 1
+        macd = self.fast.update(price) - self.slow.update(price)
+        self.signal.update(macd)
+        return self.value
+
+    @property
+    def value(self):
+        if self.count < self.slow_period + self.signal_period:
+            return None, None
+        return self.fast.value - self.slow.value, self.signal.value
+
+
+class StreamingBollinger:
+    """Bollinger Bands (rolling SMA +/- ``num_std`` sample standard deviations)."""
+
+    def __init__(self, window=20, num_std=2):
+        self.window = window
+        self.num_std = num_std
+        self.sma = RollingMean(window)
+        self.std = RollingStd(window)
+        self.count = 0
+
+    def update(self, price):
+        self.count += 1
+        self.sma.update(price)
+        self.std.update(price)
+        return self.value
+
+    @property
+    def value(self):
+        if self.count < self.window:
+            return None, None, None
+        sma = self.sma.mean
+        std = self.std.std
+        return sma + self.num_std * std, sma, sma - self.num_std * std
+
+
+class IndicatorEngine:
+    """Stateful indicator set for one symbol, updated in O(1) per new bar.
+
+    Holds running state for every indicator ``MomentumBot`` uses so that a
+    tick only costs a constant amount of work instead of recomputing each
+    indicator over the full price history.
+    """
+
+    def __init__(self, ema_windows=(13, 20, 50), k_period=14, d_period=3,
+                 ao_fast=1, ao_slow=34, atr_window=14, rsi_window=14,
+                 macd_fast=12, macd_slow=26, macd_signal=9,
+                 bb_window=20, bb_std=2):
+        self.emas = {window: StreamingEMA(window) for window in ema_windows}
+        self.stochastic = StreamingStochastic(k_period, d_period)
+        self.ao = StreamingAwesomeOscillator(ao_fast, ao_slow)
+        self.atr = StreamingATR(atr_window)
+        self.rsi = StreamingRSI(rsi_window)
+        self.macd = StreamingMACD(macd_fast, macd_slow, macd_signal)
+        self.bollinger = StreamingBollinger(bb_window, bb_std)
+        self.count = 0
+        self.last_price = None
+
+    def update(self, close, high=None, low=None):
+        """Feed one bar into every indicator."""
+        high = close if high is None else high
+        low = close if low is None else low
+        self.count += 1
+        self.last_price = close
+        for ema in self.emas.values():
+            ema.update(close)
+        self.stochastic.update(high, low, close)
+        self.ao.update(high, low)
+        self.atr.update(high, low, close)
+        self.rsi.update(close)
+        self.macd.update(close)
+        self.bollinger.update(close)
+
+    def update_many(self, closes, highs=None, lows=None):
+        """Feed a block of bars, e.g. to warm the engine from history."""
+        highs = closes if highs is None else highs
+        lows = closes if lows is None else lows
+        for close, high, low in zip(closes, highs, lows):
+            self.update(close, high, low)
+
+    def ema(self, window):
+        ema = self.emas[window]
+        return ema.value if ema.count >= window else None
+
+    def snapshot(self):
+        """Return the current value of every indicator as a dict."""
+        stoch_k, stoch_d = self.stochastic.value
+        ao_current, ao_prev = self.ao.value
+        macd, macd_signal = self.macd.value
+        bb_upper, bb_middle, bb_lower = self.bollinger.value
+        values = {f"ema_{window}": self.ema(window) for window in self.emas}
+        values.update({
+            'stoch_k': stoch_k,
+            'stoch_d': stoch_d,
+            'ao_current': ao_current,
+            'ao_prev': ao_prev,
+            'atr': self.atr.value,
+            'rsi': self.rsi.value,
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'bb_upper': bb_upper,
+            'bb_middle': bb_middle,
+            'bb_lower': bb_lower,
+        })
+        return values
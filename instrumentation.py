@@ -0,0 +1,235 @@
+import functools
+import json
+import os
+import threading
+import time
+from time import perf_counter_ns
+
+
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_BUCKETS = 48 * SUB_BUCKETS   # covers anything up to ~2^47 ns (over a day)
+
+
+class LatencyHistogram:
+    """Log-linear histogram of nanosecond durations (about 6% bucket resolution).
+
+    Recording is a few integer operations and one list increment, so it can
+    stay on in the hot path; percentiles are read from the bucket counts.
+    """
+
+    __slots__ = ("counts", "count", "total", "max", "min")
+
+    def __init__(self):
+        self.counts = [0] * MAX_BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.min = None
+
+    @staticmethod
+    def _index(value):
+        if value < SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - SUB_BUCKET_BITS - 1
+        return min(shift * SUB_BUCKETS + (value >> shift), MAX_BUCKETS - 1)
+
+    @staticmethod
+    def _value(index):
+        if index < SUB_BUCKETS:
+            return index
+        shift = index // SUB_BUCKETS - 1
+        mantissa = index - shift * SUB_BUCKETS
+        # Midpoint of the bucket
+        return ((mantissa << shift) + ((mantissa + 1) << shift)) // 2
+
+    def record(self, value):
+        value = max(0, int(value))
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        if self.min is None or value < self.min:
+            self.min = value
+
+    def percentile(self, q):
+        if not self.count:
+            return 0
+        target = max(1, int(round(q / 100 * self.count)))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(self._value(index), self.max)
+        return self.max
+
+    def summary(self):
+        """Count plus mean/p50/p90/p99/max in microseconds."""
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'mean_us': self.total / self.count / 1000,
+            'p50_us': self.percentile(50) / 1000,
+            'p90_us': self.percentile(90) / 1000,
+            'p99_us': self.percentile(99) / 1000,
+            'max_us': self.max / 1000,
+        }
+
+
+class SamplingProfiler:
+    """Runs every ``every``-th call under cProfile and accumulates the stats."""
+
+    def __init__(self, every=100):
+        import cProfile
+        self.every = every
+        self.calls = 0
+        self.samples = 0
+        self.profile = cProfile.Profile()
+
+    def call(self, fn, *args, **kwargs):
+        self.calls += 1
+        if self.calls % self.every:
+            return fn(*args, **kwargs)
+        self.samples += 1
+        self.profile.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.profile.disable()
+
+    def dump(self, path):
+        """Write accumulated stats in pstats format (open with ``pstats`` or snakeviz)."""
+        self.profile.dump_stats(path)
+
+    def report(self, limit=20, sort="cumulative"):
+        import io
+        import pstats
+        out = io.StringIO()
+        pstats.Stats(self.profile, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+class Metrics:
+    """Per-stage latency histograms for the trading loop.
+
+    Call sites use ``t0 = metrics.start()`` ... ``metrics.stop("stage", t0)``
+    (or ``lap`` to chain stages). When disabled ``start`` returns 0 and
+    ``stop``/``lap`` return immediately, so the instrumented code pays only a
+    couple of attribute lookups.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.stages = {}
+        self.sampler = None
+        self._reporter = None
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.stages = {}
+
+    def start(self):
+        return perf_counter_ns() if self.enabled else 0
+
+    def record(self, stage, duration_ns):
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = LatencyHistogram()
+        histogram.record(duration_ns)
+
+    def stop(self, stage, t0):
+        if t0:
+            self.record(stage, perf_counter_ns() - t0)
+
+    def lap(self, stage, t0):
+        """Record ``stage`` since ``t0`` and return a new start time for the next stage."""
+        if not t0:
+            return 0
+        now = perf_counter_ns()
+        self.record(stage, now - t0)
+        return now
+
+    def timed(self, stage):
+        """Decorator timing every call of a function as ``stage``."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                t0 = self.start()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.stop(stage, t0)
+            return wrapper
+        return decorator
+
+    # --- Sampling profiler ---
+    def enable_profiler(self, every=100):
+        self.sampler = SamplingProfiler(every)
+        return self.sampler
+
+    def disable_profiler(self):
+        sampler, self.sampler = self.sampler, None
+        return sampler
+
+    # --- Export ---
+    def summary(self):
+        return {stage: histogram.summary() for stage, histogram in sorted(self.stages.items())}
+
+    def format_summary(self):
+        lines = ["⏱️ Stage latency (µs):"]
+        for stage, s in self.summary().items():
+            if s['count']:
+                lines.append(f"  {stage:<12} n={s['count']:<8} p50={s['p50_us']:.1f} "
+                             f"p99={s['p99_us']:.1f} max={s['max_us']:.1f}")
+        return "\n".join(lines)
+
+    def export_json(self, path):
+        data = {'generated_at': time.time(), 'stages': self.summary()}
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+
+    def start_reporter(self, interval=60, path=None, log=print):
+        """Every ``interval`` seconds, log the summary and (optionally) write it to ``path`` as JSON."""
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                log(self.format_summary())
+                if path:
+                    self.export_json(path)
+
+        thread = threading.Thread(target=run, name="metrics-reporter", daemon=True)
+        thread.start()
+        self._reporter = stop
+        return stop
+
+    def stop_reporter(self):
+        if self._reporter is not None:
+            self._reporter.set()
+            self._reporter = None
+
+
+# Process-wide instance; BOT_METRICS=1 turns it on, BOT_PROFILE_EVERY=N samples momentum_strategy
+metrics = Metrics(enabled=os.environ.get("BOT_METRICS") == "1")
+if os.environ.get("BOT_PROFILE_EVERY"):
+    metrics.enable_profiler(int(os.environ["BOT_PROFILE_EVERY"]))
+
+
+def profiled(fn):
+    """Route calls through ``metrics.sampler`` when the sampling profiler is on."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        sampler = metrics.sampler
+        if sampler is None:
+            return fn(*args, **kwargs)
+        return sampler.call(fn, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,406 @@
+"""Single-pass kernels for the rolling-window indicators, JIT-compiled when Numba is available.
+
+Each indicator is one loop over contiguous float64 arrays that returns the
+value per bar, with no intermediate Series: the rolling min/max of the
+stochastic use monotonic deques, rolling means a Kahan-compensated running
+sum, and EWMs the ``adjust=False`` recurrence, all in pandas' operation
+order. The results match the pandas formulas in ``MomentumBot`` to the last
+bit or within a few ulps.
+
+Two backends compute the same functions:
+
+* ``numba``: the loops compiled with ``numba.njit`` (compiled on first use
+  and cached on disk);
+* ``numpy``: whole-array NumPy expressions: sliding windows for the
+  rolling statistics and a blocked form of the EWM recurrence (a plain loop
+  only across NaN gaps). It agrees with the loops to rounding.
+
+``BOT_KERNELS=auto|numba|numpy`` (or ``set_backend``) selects one; ``auto``
+uses Numba when it is installed and NumPy otherwise. ``cross_check`` runs
+both and reports the largest difference per indicator.
+"""
+import math
+import os
+
+import numpy as np
+
+
+BACKENDS = ("numba", "numpy")
+
+_requested = os.environ.get("BOT_KERNELS", "auto")
+_active = None
+
+
+# --- Loop kernels (compiled by Numba; also valid, if slow, as plain Python) ---
+def _rolling_extreme_loop(values, window, is_max):
+    n = len(values)
+    out = np.full(n, np.nan)
+    dq = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    nans = 0
+    for i in range(n):
+        x = values[i]
+        if x != x:
+            nans += 1
+        if is_max:
+            while tail > head and values[dq[tail - 1]] <= x:
+                tail -= 1
+        else:
+            while tail > head and values[dq[tail - 1]] >= x:
+                tail -= 1
+        dq[tail] = i
+        tail += 1
+        if dq[head] <= i - window:
+            head += 1
+        if i >= window:
+            old = values[i - window]
+            if old != old:
+                nans -= 1
+        if i >= window - 1 and nans == 0:
+            out[i] = values[dq[head]]
+    return out
+
+
+def _rolling_mean_loop(values, window):
+    # pandas' roll_mean: running sum with separate Kahan compensation for additions and removals
+    n = len(values)
+    out = np.full(n, np.nan)
+    nobs = 0
+    neg_ct = 0
+    sum_x = 0.0
+    comp_add = 0.0
+    comp_remove = 0.0
+    same = 0
+    prev = np.nan
+    for i in range(n):
+        start = max(0, i + 1 - window)
+        if i == 0 or start >= i:
+            # The window no longer overlaps the previous one: start over
+            nobs = 0
+            neg_ct = 0
+            sum_x = 0.0
+            comp_add = 0.0
+            comp_remove = 0.0
+            same = 0
+            prev = values[start]
+            first = start
+        else:
+            first = i
+            if start > 0:
+                old = values[start - 1]
+                if old == old:
+                    nobs -= 1
+                    y = -old - comp_remove
+                    t = sum_x + y
+                    comp_remove = t - sum_x - y
+                    sum_x = t
+                    if old < 0 or (old == 0 and math.copysign(1.0, old) < 0):
+                        neg_ct -= 1
+        for j in range(first, i + 1):
+            x = values[j]
+            if x == x:
+                nobs += 1
+                y = x - comp_add
+                t = sum_x + y
+                comp_add = t - sum_x - y
+                sum_x = t
+                if x < 0 or (x == 0 and math.copysign(1.0, x) < 0):
+                    neg_ct += 1
+                if x == prev:
+                    same += 1
+                else:
+                    same = 1
+                prev = x
+        if nobs >= window:
+            result = sum_x / nobs
+            if same >= nobs:
+                result = prev
+            elif neg_ct == 0 and result < 0:
+                result = 0.0
+            elif neg_ct == nobs and result > 0:
+                result = 0.0
+            out[i] = result
+    return out
+
+
+def _ewm_loop(values, alpha):
+    # pandas' ewm(adjust=False, ignore_na=False): a NaN keeps the value and only decays its weight
+    n = len(values)
+    out = np.empty(n)
+    decay = 1.0 - alpha
+    weighted = values[0] if n else np.nan
+    old_wt = 1.0
+    for i in range(n):
+        cur = values[i]
+        if i and weighted == weighted:
+            old_wt *= decay
+            if cur == cur:
+                if weighted != cur:
+                    weighted = old_wt * weighted + alpha * cur
+                    weighted /= old_wt + alpha
+                old_wt = 1.0
+        elif cur == cur:
+            weighted = cur
+        out[i] = weighted
+    return out
+
+
+def _true_range_loop(high, low, close):
+    n = len(close)
+    out = np.empty(n)
+    for i in range(n):
+        tr = high[i] - low[i]
+        if i:
+            prev = close[i - 1]
+            # NaN-skipping max, as DataFrame.max(axis=1) does
+            for other in (abs(high[i] - prev), abs(low[i] - prev)):
+                if tr != tr or other > tr:
+                    tr = other
+        out[i] = tr
+    return out
+
+
+def _median_loop(high, low):
+    n = len(high)
+    out = np.empty(n)
+    for i in range(n):
+        out[i] = (high[i] + low[i]) / 2
+    return out
+
+
+def _raw_k_loop(close, lowest, highest):
+    n = len(close)
+    out = np.empty(n)
+    for i in range(n):
+        span = highest[i] - lowest[i]
+        num = close[i] - lowest[i]
+        if span != 0:
+            out[i] = num / span * 100
+        elif num == 0 or num != num:
+            out[i] = np.nan
+        else:
+            out[i] = math.copysign(np.inf, num) * math.copysign(1.0, span)
+    return out
+
+
+# --- NumPy backend ---
+def _np_rolling(values, window, combine):
+    """Fold ``combine`` (np.add, np.maximum, ...) over each window: one whole-array pass per offset."""
+    n = len(values)
+    out = np.full(n, np.nan)
+    if n >= window:
+        acc = values[window - 1:].copy()
+        for k in range(1, window):
+            combine(acc, values[window - 1 - k:n - k], out=acc)
+        out[window - 1:] = acc
+    return out
+
+
+def _np_rolling_extreme(values, window, is_max):
+    return _np_rolling(values, window, np.maximum if is_max else np.minimum)
+
+
+def _np_rolling_mean(values, window):
+    out = _np_rolling(values, window, np.add)
+    out /= window
+    n = len(values)
+    if n >= window > 1:
+        # Constant windows are exact, as in pandas (so e.g. the AO of a flat stretch is exactly 0)
+        runs = np.concatenate(([0], np.cumsum(values[1:] == values[:-1])))
+        constant = runs[window - 1:] - runs[:n - window + 1] == window - 1
+        out[window - 1:][constant] = values[window - 1:][constant]
+    return out
+
+
+def _np_ewm(values, alpha):
+    """The ``adjust=False`` recurrence, blocked: ``sqrt(n)`` whole-column steps plus ``sqrt(n)`` carries."""
+    observed = ~np.isnan(values)
+    if not observed.any():
+        return values.copy()
+    first = int(np.argmax(observed))
+    if not observed[first:].all():
+        return _ewm_loop(values.tolist(), alpha)  # NaN gaps: pandas' weight decay needs the loop
+    decay = 1.0 - alpha
+    x = values[first:]
+    width = max(1, math.isqrt(len(x)))
+    rows = -(-len(x) // width)
+    blocks = np.zeros(rows * width)
+    blocks[:len(x)] = x
+    blocks = blocks.reshape(rows, width) * alpha
+    # Each block's recurrence from zero, all blocks stepped together
+    for j in range(1, width):
+        blocks[:, j] += decay * blocks[:, j - 1]
+    # Then carry each block's last value into the next (the first block starts from x[0] itself)
+    carries = np.empty(rows)
+    carry = x[0]
+    block_decay = decay ** width
+    ends = blocks[:, -1].tolist()
+    for r in range(rows):
+        carries[r] = carry
+        carry = ends[r] + block_decay * carry
+    blocks += carries[:, None] * decay ** np.arange(1, width + 1)
+    out = np.full(len(values), np.nan)
+    out[first:] = blocks.ravel()[:len(x)]
+    return out
+
+
+def _np_true_range(high, low, close):
+    prev = np.concatenate(([np.nan], close[:-1]))
+    return np.fmax(high - low, np.fmax(np.abs(high - prev), np.abs(low - prev)))
+
+
+def _np_median(high, low):
+    return (high + low) / 2
+
+
+def _np_raw_k(close, lowest, highest):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return ((close - lowest) / (highest - lowest)) * 100
+
+
+# --- Backend selection ---
+_loaded = {}
+
+
+def _load(name):
+    impl = _loaded.get(name)
+    if impl is None:
+        impl = _loaded[name] = _build(name)
+    return impl
+
+
+def _build(name):
+    if name == "numpy":
+        return {'rolling_extreme': _np_rolling_extreme, 'rolling_mean': _np_rolling_mean, 'ewm': _np_ewm,
+                'true_range': _np_true_range, 'median': _np_median, 'raw_k': _np_raw_k}
+    if name == "loops":
+        return _LOOPS
+    import numba
+    jit = numba.njit(cache=True, nogil=True)
+    return {key: jit(loop) for key, loop in _LOOPS.items()}
+
+
+def _numba_available():
+    import importlib.util
+    return importlib.util.find_spec("numba") is not None
+
+
+def available_backends():
+    return tuple(name for name in BACKENDS if name != "numba" or _numba_available())
+
+
+def set_backend(name="auto"):
+    """Select ``"numba"``, ``"numpy"`` or ``"auto"``; returns the backend now in use.
+
+    Asking for ``"numba"`` without Numba installed raises ``ImportError``.
+    """
+    global _requested, _active
+    if name not in BACKENDS + ("auto",):
+        raise ValueError(f"unknown kernel backend {name!r}; expected one of {BACKENDS + ('auto',)}")
+    if name == "numba" and not _numba_available():
+        raise ImportError("the numba kernel backend needs numba (pip install numba)")
+    _requested = name
+    _active = None
+    return get_backend()
+
+
+def get_backend():
+    """Name of the backend in use (resolving ``auto``)."""
+    global _active
+    if _active is None:
+        name = _requested
+        if name == "auto":
+            name = "numba" if _numba_available() else "numpy"
+        elif name not in BACKENDS:
+            raise ValueError(f"unknown kernel backend {name!r} in BOT_KERNELS")
+        _active = (name, _load(name))
+    return _active[0]
+
+
+_LOOPS = {'rolling_extreme': _rolling_extreme_loop, 'rolling_mean': _rolling_mean_loop, 'ewm': _ewm_loop,
+          'true_range': _true_range_loop, 'median': _median_loop, 'raw_k': _raw_k_loop}
+
+
+def _impl(backend=None):
+    if backend is None:
+        get_backend()
+        return _active[1]
+    return _load(backend)
+
+
+def _array(values):
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+# --- Indicators (one value per bar, NaN where the window is not full yet) ---
+def rolling_min(values, window, backend=None):
+    return _impl(backend)['rolling_extreme'](_array(values), window, False)
+
+
+def rolling_max(values, window, backend=None):
+    return _impl(backend)['rolling_extreme'](_array(values), window, True)
+
+
+def rolling_mean(values, window, backend=None):
+    return _impl(backend)['rolling_mean'](_array(values), window)
+
+
+def ewm(values, span, backend=None):
+    """``pd.Series(values).ewm(span=span, adjust=False).mean()``."""
+    return _impl(backend)['ewm'](_array(values), 2.0 / (span + 1))
+
+
+def stochastic(high, low, close, k_period=14, d_period=3, backend=None):
+    """EMA-smoothed stochastic ``(%K, %D)`` per bar, as in ``calculate_stochastic``."""
+    impl = _impl(backend)
+    close = _array(close)
+    lowest = impl['rolling_extreme'](_array(low), k_period, False)
+    highest = impl['rolling_extreme'](_array(high), k_period, True)
+    alpha = 2.0 / (d_period + 1)
+    k_percent = impl['ewm'](impl['raw_k'](close, lowest, highest), alpha)
+    return k_percent, impl['ewm'](k_percent, alpha)
+
+
+def awesome_oscillator(high, low, fast_period=1, slow_period=34, backend=None):
+    """Awesome Oscillator per bar, as in ``calculate_awesome_oscillator``."""
+    impl = _impl(backend)
+    median = impl['median'](_array(high), _array(low))
+    return impl['rolling_mean'](median, fast_period) - impl['rolling_mean'](median, slow_period)
+
+
+def atr(high, low, close, window=14, backend=None):
+    """Average True Range per bar, as in ``calculate_atr``."""
+    impl = _impl(backend)
+    return impl['rolling_mean'](impl['true_range'](_array(high), _array(low), _array(close)), window)
+
+
+def cross_check(high, low, close, k_period=14, d_period=3, fast_period=1, slow_period=34, atr_window=14,
+                backends=None):
+    """Largest absolute difference per indicator across ``backends`` (NaN positions must agree too).
+
+    Without Numba the uncompiled loop kernels (``"loops"``) stand in for it,
+    so the code Numba would compile is still checked against NumPy.
+    """
+    if backends is None:
+        backends = ("numba" if _numba_available() else "loops", "numpy")
+    results = {}
+    for name in backends:
+        k, d = stochastic(high, low, close, k_period, d_period, backend=name)
+        results[name] = {'stoch_k': k, 'stoch_d': d,
+                         'ao': awesome_oscillator(high, low, fast_period, slow_period, backend=name),
+                         'atr': atr(high, low, close, atr_window, backend=name)}
+    first, *others = backends
+    report = {}
+    for column, reference in results[first].items():
+        worst = 0.0
+        for name in others:
+            other = results[name][column]
+            if not np.array_equal(np.isnan(reference), np.isnan(other)):
+                worst = math.inf
+                break
+            valid = ~np.isnan(reference)
+            if valid.any():
+                worst = max(worst, float(np.max(np.abs(reference[valid] - other[valid]))))
+        report[column] = worst
+    return report
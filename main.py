@@ -1,66 +1,125 @@
+import asyncio
+import os
+import sys
+
+from instrumentation import metrics
 from bot import MomentumBot
-from data import stream_prices
+from performance import PerformanceTracker
+from runner import MultiSymbolRunner
+from state_store import StateStore
+from trade_log import EXIT, log_decision, log_event, setup_logging
+
+# Symbols to trade (pass more on the command line, e.g. `python main.py EURUSD=X GBPUSD=X`)
+SYMBOLS = sys.argv[1:] or ["EURUSD=X"]
+
+# BOT_LOG_LEVEL=DEBUG also writes every tick's full indicator result to the log file
+LOG_LEVEL = os.environ.get("BOT_LOG_LEVEL", "INFO").upper()
+
+# BOT_TIMEFRAMES=1m,5m,15m,1h adds a multi-timeframe vote (mtf_signal) to every result
+TIMEFRAMES = [tf for tf in os.environ.get("BOT_TIMEFRAMES", "").split(",") if tf] or None
+
+# Snapshots + trade journal for a warm restart (BOT_STATE_DIR= disables them)
+STATE_DIR = os.environ.get("BOT_STATE_DIR", "bot_state")
+
+# Per-symbol equity curve and trades, appended in batches (BOT_PERFORMANCE_DIR= disables them)
+PERFORMANCE_DIR = os.environ.get("BOT_PERFORMANCE_DIR", "performance")
+INTERVAL = 10
+
+
+def performance_tracker(symbol):
+    os.makedirs(PERFORMANCE_DIR, exist_ok=True)
+    # Bars are INTERVAL seconds apart, around the clock (FX)
+    return PerformanceTracker(os.path.join(PERFORMANCE_DIR, f"{symbol}_equity.csv"),
+                              os.path.join(PERFORMANCE_DIR, f"{symbol}_trades.csv"),
+                              periods_per_year=365 * 24 * 3600 / INTERVAL, append=True)
+
 
-# Initialize bot
-bot = MomentumBot(initial_balance=10000)
+# BOT_QUOTES=oanda: watch stops and targets on OANDA bid/ask every BOT_QUOTE_INTERVAL seconds,
+# between the strategy polls
+QUOTES = os.environ.get("BOT_QUOTES")
+QUOTE_INTERVAL = float(os.environ.get("BOT_QUOTE_INTERVAL", "0.5"))
+quote_source = None
+if QUOTES == "oanda":
+    from broker import OandaBroker
+    from exit_monitor import broker_quotes
+    quote_source = broker_quotes(OandaBroker.from_env())
+
+# BOT_BUS=<name>: read bars from a market_bus.py feeder process instead of fetching them here
+BUS = os.environ.get("BOT_BUS")
+fetchers = {}
+if BUS:
+    from market_bus import BusReader, MarketDataBus
+    bus_reader = BusReader(MarketDataBus.attach(BUS))
+    fetchers = dict(fetch_latest=bus_reader.fetch_latest, fetch_history=bus_reader.fetch_history)
+elif TIMEFRAMES:
+    # One day of 1m bars leaves the longest timeframe far short of the bars it needs to vote
+    from functools import partial
+    from data import get_historical_data_batch, get_latest_data_batch
+    from timeframes import history_period
+    # The default bot windows need MIN_HISTORY bars of the longest timeframe
+    HISTORY_PERIOD = history_period(TIMEFRAMES)
+    fetchers = dict(fetch_latest=get_latest_data_batch,
+                    fetch_history=partial(get_historical_data_batch, period=HISTORY_PERIOD))
+
+
+def log_tick(symbol, price, prev_price, result, exit_message, trade_msg):
+    """Hand one decision to the background log writer; never touches disk or the terminal here."""
+    state = runner.states[symbol]
+    log_decision(symbol, price, result, exit_message, trade_msg,
+                 latency_ms=state.latencies[-1] * 1000, balance=state.bot.account_balance, bar=state.bar)
+
+
+def log_exit(symbol, price, exit_message):
+    """A stop or target fired by the tick-level exit monitor."""
+    log_event(EXIT, symbol, f"🔔 {exit_message}", price=price, balance=runner.states[symbol].bot.account_balance)
+
+
+runner = MultiSymbolRunner(SYMBOLS, interval=INTERVAL, on_decision=log_tick,
+                           bot_factory=lambda symbol: MomentumBot(initial_balance=10000, timeframes=TIMEFRAMES),
+                           state_store=StateStore(STATE_DIR) if STATE_DIR else None, snapshot_interval=60,
+                           performance_factory=performance_tracker if PERFORMANCE_DIR else None,
+                           quote_source=quote_source, quote_interval=QUOTE_INTERVAL, on_exit=log_exit,
+                           **fetchers)
 
 print("🔄 Starting MOMENTUM STRATEGY Bot (EMA 13/20/50 + Stochastic + AO)...")
-print(f"💰 Account Balance: ${bot.account_balance:,.2f}")
+print(f"📈 Symbols: {', '.join(SYMBOLS)}")
+if BUS:
+    print(f"🚌 Bars from the shared market data bus {BUS!r}")
+print(f"💰 Account Balance per symbol: ${10000:,.2f}")
 print("⏳ (Ctrl+C to stop)\n")
+print("📝 Signals, trades and exits are logged to trading_bot.jsonl")
+if STATE_DIR:
+    print(f"💾 State is snapshotted to {STATE_DIR}/ every minute (trades journaled as they happen)")
+if quote_source is not None:
+    print(f"⚡ Stops and targets watched on OANDA quotes every {QUOTE_INTERVAL:g}s")
+if PERFORMANCE_DIR:
+    print(f"📊 Equity curves and trades are appended to {PERFORMANCE_DIR}/")
+print()
+
+log_writer = setup_logging(path="trading_bot.jsonl", level=LOG_LEVEL)
+
+# BOT_METRICS=1: per-stage latency summary every minute, also written to metrics.json
+if metrics.enabled:
+    metrics.start_reporter(interval=60, path="metrics.json")
 
-for (prev_price, price, price_history, 
-     high_history, low_history, volume_history) in stream_prices("EURUSD=X", interval=10):
-    
-    if prev_price is None:
-        continue
-
-    # Check exit conditions
-    exit_message = bot.check_exit_conditions(price)
-    if exit_message:
-        print(f"🔔 {exit_message} | Balance: ${bot.account_balance:,.2f}")
-
-    # Run momentum strategy
-    result = bot.momentum_strategy(
-        price_history=price_history,
-        high_prices=high_history,
-        low_prices=low_history,
-        close_prices=price_history,
-        volume_data=volume_history
-    )
-    if not result or not isinstance(result, dict):
-        continue
-
-    if result['ema_13'] is not None and result['stoch_k'] is not None:
-        # Debug: Print indicator values and consensus logic
-        print(f"[DEBUG] EMA13: {result['ema_13']}, EMA20: {result['ema_20']}, EMA50: {result['ema_50']}")
-        print(f"[DEBUG] Stoch K: {result['stoch_k']}, Stoch D: {result['stoch_d']}, AO: {result['ao_current']}, AO Signal: {result['ao_signal']}")
-        print(f"[DEBUG] Buy consensus: {result['buy_signal']}, Sell consensus: {result['sell_signal']}")
-        # Display indicators
-        print(f"📊 EMA13: {result['ema_13']:.4f} | EMA20: {result['ema_20']:.4f} | EMA50: {result['ema_50']:.4f}")
-        print(f"🎯 Stochastic: K={result['stoch_k']:.1f} | D={result['stoch_d']:.1f}")
-        
-        # Awesome Oscillator display
-        ao_arrow = "🟢" if result['ao_current'] and result['ao_current'] > 0 else "🔴" if result['ao_current'] and result['ao_current'] < 0 else "⚪"
-        ao_shape = "⬆️" if result['ao_signal'] == 'BUY' else "⬇️" if result['ao_signal'] == 'SELL' else "➡️"
-        print(f"🚀 Awesome Oscillator: {ao_arrow}{ao_shape} {result['ao_current']:.4f}" if result['ao_current'] else f"🚀 Awesome Oscillator: {ao_arrow}{ao_shape} N/A")
-        
-        print(f"📈 Trend: {result['trend']}")
-        
-        # Show signals
-        if result['signals']:
-            print(f"📢 Signals: {', '.join(result['signals'])}")
-        
-        # Execute trades
-        if result['buy_signal'] and not bot.in_position:
-            trade_msg = bot.execute_trade("BUY", price, result['position_size'], result['stop_loss'], result['take_profit'])
-            if trade_msg:
-                print(f"🎯 {trade_msg}")
-                print(f"💰 Remaining Balance: ${bot.account_balance:,.2f}")
-            
-        elif result['sell_signal'] and not bot.in_position:
-            trade_msg = bot.execute_trade("SELL", price, result['position_size'], result['stop_loss'], result['take_profit'])
-            if trade_msg:
-                print(f"🎯 {trade_msg}")
-                print(f"💰 Remaining Balance: ${bot.account_balance:,.2f}")
-
-    print("-" * 80)
\ No newline at end of file
+try:
+    asyncio.run(runner.run())
+except KeyboardInterrupt:
+    if metrics.enabled:
+        print(metrics.format_summary())
+        metrics.export_json("metrics.json")
+    if metrics.sampler is not None:
+        metrics.sampler.dump("momentum_strategy.prof")
+    for symbol, stats in runner.latency_stats().items():
+        print(f"⏱️ {symbol}: p50 {stats['p50_ms']:.2f} ms | p99 {stats['p99_ms']:.2f} ms | max {stats['max_ms']:.2f} ms")
+    for symbol, state in runner.states.items():
+        if state.performance is not None and state.performance.bars:
+            m = state.performance.metrics()
+            print(f"📊 {symbol}: return {m['total_return']:.2%} | Sharpe {m['sharpe']:.2f} | "
+                  f"max DD {m['max_drawdown']:.2%} | {m['trades']} trades, win rate {m['win_rate']:.0%}")
+    cache = runner.indicator_cache.stats()
+    print(f"🗃️ Indicator cache: {cache['hits']} hits / {cache['misses']} misses ({cache['hit_rate']:.0%})")
+finally:
+    log_writer.stop()
+    if log_writer.suppressed or log_writer.dropped:
+        print(f"📝 {log_writer.suppressed} repeated signals suppressed, {log_writer.dropped} records dropped")
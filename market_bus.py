@@ -0,0 +1,308 @@
+"""Shared-memory market data bus: one feeder process, any number of read-only strategy workers.
+
+The feeder polls the data source once for all symbols and writes each bar
+into a per-symbol OHLCV ring in a ``multiprocessing.shared_memory``
+segment. Workers attach by name and read the bars directly from the
+mapping: no sockets, pipes or pickling, and only the new bars are copied
+out. ``BusReader`` serves them through the ``fetch_latest`` /
+``fetch_history`` interface of ``MultiSymbolRunner``.
+
+Each symbol is guarded by a seqlock: the writer makes the sequence number
+odd, writes the bar, bumps the bar count and makes it even again; a reader
+retries until it saw the same even sequence number before and after
+copying. There is one writer per segment. The protocol relies on the
+stores becoming visible in program order, as they do on x86-64.
+
+Run the feeder from the repository root, then point workers at it:
+
+    python market_bus.py EURUSD=X GBPUSD=X --name momentum_bus --interval 10
+    BOT_BUS=momentum_bus python main.py EURUSD=X GBPUSD=X
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+
+MAGIC = b"MKTBUS01"
+NAME_BYTES = 32
+# Per bar: the OHLCV fields, then the timestamp (epoch seconds, NaN if unknown)
+FIELDS = ("open", "high", "low", "close", "volume", "timestamp")
+
+
+def _layout(n_symbols, capacity):
+    """Byte offsets of the header, names, control words and bar block, and the total size."""
+    header = 32
+    names = header
+    control = names + n_symbols * NAME_BYTES
+    bars = control + n_symbols * 2 * 8
+    size = bars + n_symbols * len(FIELDS) * 2 * capacity * 8
+    return names, control, bars, size
+
+
+def _shared_memory(name=None, create=False, size=0):
+    from multiprocessing import shared_memory
+    if create:
+        return shared_memory.SharedMemory(name=name, create=True, size=size)
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    # Python < 3.13 registers every attachment with the resource tracker, which
+    # would unlink the feeder's segment when this worker exits; skip that
+    tracker = shared_memory.resource_tracker
+    register = tracker.register
+    tracker.register = lambda name, rtype: None if rtype == "shared_memory" else register(name, rtype)
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        tracker.register = register
+
+
+class MarketDataBus:
+    """Per-symbol OHLCV rings in one shared-memory segment.
+
+    Use ``create`` in the feeder and ``attach`` in the workers; attached
+    views are read-only. As in ``OHLCVRingBuffer`` every bar is written
+    twice (at ``pos`` and ``pos + capacity``), so the latest ``n`` bars of a
+    symbol are always one contiguous slice.
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        buf = shm.buf
+        if bytes(buf[:8]) != MAGIC:
+            raise ValueError(f"shared memory segment {shm.name!r} is not a market data bus")
+        n_symbols, capacity = np.frombuffer(buf, dtype="<i8", count=2, offset=8).tolist()
+        names, control, bars, _ = _layout(n_symbols, capacity)
+        self.capacity = capacity
+        raw = np.frombuffer(buf, dtype=f"S{NAME_BYTES}", count=n_symbols, offset=names)
+        self.symbols = [name.decode() for name in raw]
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self._control = np.frombuffer(buf, dtype="<u8", count=n_symbols * 2, offset=control).reshape(n_symbols, 2)
+        self._bars = np.frombuffer(buf, dtype="<f8", count=n_symbols * len(FIELDS) * 2 * capacity,
+                                   offset=bars).reshape(n_symbols, len(FIELDS), 2 * capacity)
+        if not owner:
+            self._control.flags.writeable = False
+            self._bars.flags.writeable = False
+
+    @classmethod
+    def create(cls, symbols, capacity=200, name=None):
+        """New segment for ``symbols`` (the feeder side)."""
+        symbols = list(symbols)
+        encoded = [symbol.encode() for symbol in symbols]
+        if any(len(symbol) > NAME_BYTES for symbol in encoded):
+            raise ValueError(f"symbol names are limited to {NAME_BYTES} bytes")
+        names, _, _, size = _layout(len(symbols), capacity)
+        shm = _shared_memory(name, create=True, size=size)
+        buf = shm.buf
+        buf[:size] = bytes(size)
+        np.frombuffer(buf, dtype="<i8", count=2, offset=8)[:] = (len(symbols), capacity)
+        np.frombuffer(buf, dtype=f"S{NAME_BYTES}", count=len(symbols), offset=names)[:] = encoded
+        # Magic last, so an attaching reader never sees a half-initialised header
+        buf[:8] = MAGIC
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Attach to the feeder's segment read-only (the worker side)."""
+        return cls(_shared_memory(name), owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    # --- Writer ---
+    def publish(self, symbol, open, high, low, close, volume=0.0, timestamp=None):
+        """Append one bar for ``symbol``."""
+        i = self.index[symbol]
+        control = self._control[i]
+        count = int(control[1])
+        pos = count % self.capacity
+        bars = self._bars[i]
+        row = (open, high, low, close, volume, math.nan if timestamp is None else timestamp)
+        control[0] += 1  # odd: write in progress
+        bars[:, pos] = row
+        bars[:, pos + self.capacity] = row
+        control[1] = count + 1
+        control[0] += 1
+
+    def publish_bar(self, symbol, bar):
+        """Append a bar dict in the ``get_latest_data`` format."""
+        price = bar['price']
+        self.publish(symbol, bar.get('open', price), bar.get('high', price), bar.get('low', price), price,
+                     bar.get('volume', 0.0), bar.get('timestamp'))
+
+    def publish_history(self, symbol, history):
+        """Append a history dict in the ``get_historical_data`` format (only the last ``capacity`` bars)."""
+        closes = history['prices']
+        n = len(closes)
+        start = max(0, n - self.capacity)
+        opens = history.get('opens') or closes
+        highs = history.get('highs') or closes
+        lows = history.get('lows') or closes
+        volumes = history.get('volumes') or [0.0] * n
+        timestamps = history.get('timestamps') or [None] * n
+        for j in range(start, n):
+            self.publish(symbol, opens[j], highs[j], lows[j], closes[j], volumes[j], timestamps[j])
+
+    # --- Readers ---
+    def count(self, symbol):
+        """Bars written for ``symbol`` so far."""
+        return int(self._control[self.index[symbol], 1])
+
+    def view(self, symbol, n=None):
+        """``(seq, count, view)``: zero-copy read-only ``(6, n)`` view of the last ``n`` bars.
+
+        The view may be overwritten by the feeder at any time; use the data,
+        then confirm with ``valid(symbol, seq)`` (or use ``read``).
+        """
+        i = self.index[symbol]
+        control = self._control[i]
+        seq = int(control[0])
+        count = int(control[1])
+        size = min(count, self.capacity)
+        n = size if n is None else min(n, size)
+        end = count % self.capacity + self.capacity
+        view = self._bars[i, :, end - n:end]
+        if self.owner:
+            view = view.view()
+            view.flags.writeable = False
+        return seq, count, view
+
+    def valid(self, symbol, seq):
+        """True if ``symbol`` was not written to since ``seq`` was read (and no write was in progress)."""
+        return not seq & 1 and int(self._control[self.index[symbol], 0]) == seq
+
+    def read(self, symbol, since=0, timeout=1.0):
+        """``(count, bars)``: a consistent copy of the bars after bar number ``since``, as a ``(6, k)`` array.
+
+        At most ``capacity`` bars are returned; older ones have been overwritten.
+        Raises ``TimeoutError`` if no consistent copy could be taken within
+        ``timeout`` seconds, e.g. because the feeder died in the middle of a write.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            seq, count, _ = self.view(symbol, 0)
+            if not seq & 1:
+                _, _, window = self.view(symbol, count - since if since < count else 0)
+                bars = window.copy()
+                if self.valid(symbol, seq):
+                    return count, bars
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{symbol} on market data bus {self.name!r} stayed mid-write "
+                                   f"for {timeout} s; is the feeder still running?")
+            time.sleep(0)
+
+    def close(self):
+        # Drop our views first: SharedMemory.close() fails while numpy still exports the buffer
+        self._control = self._bars = None
+        self.shm.close()
+
+    def unlink(self):
+        """Remove the segment (feeder, on shutdown)."""
+        self.shm.unlink()
+
+
+def _bar(row):
+    open, high, low, close, volume, timestamp = row
+    return {'price': close, 'high': high, 'low': low, 'open': open, 'volume': volume,
+            'timestamp': None if timestamp != timestamp else timestamp}
+
+
+class BusReader:
+    """Worker-side cursor over a ``MarketDataBus``, shaped like the runner's data fetchers.
+
+    The cursor starts at the bars already published when the reader is
+    created. ``fetch_history(symbols)`` returns each symbol's ring as a
+    history dict and marks it as seen; ``fetch_latest(symbols)`` hands out
+    the oldest bar not seen yet, one per symbol per call, so a worker that falls
+    behind catches up instead of skipping bars. ``poll`` returns every
+    unseen bar at once.
+    """
+
+    def __init__(self, bus):
+        self.bus = bus
+        self.seen = {symbol: bus.count(symbol) for symbol in bus.symbols}
+
+    def fetch_history(self, symbols):
+        history = {}
+        for symbol in symbols:
+            if symbol not in self.bus.index:
+                continue
+            count, bars = self.bus.read(symbol)
+            self.seen[symbol] = count
+            opens, highs, lows, closes, volumes, timestamps = bars.tolist()
+            history[symbol] = {'prices': closes, 'highs': highs, 'lows': lows, 'opens': opens,
+                               'volumes': volumes,
+                               'timestamps': [None if t != t else t for t in timestamps]}
+        return history
+
+    def fetch_latest(self, symbols):
+        latest = {}
+        for symbol in symbols:
+            if symbol not in self.bus.index or self.bus.count(symbol) <= self.seen[symbol]:
+                continue
+            count, bars = self.bus.read(symbol, self.seen[symbol])
+            # Bars lost to a wrapped ring are skipped; take the oldest one still available
+            self.seen[symbol] = count - bars.shape[1] + 1
+            latest[symbol] = _bar(bars[:, 0].tolist())
+        return latest
+
+    def poll(self, symbols=None):
+        """``{symbol: [bar, ...]}`` with every bar not seen yet."""
+        new = {}
+        for symbol in symbols or self.bus.symbols:
+            if self.bus.count(symbol) <= self.seen[symbol]:
+                continue
+            count, bars = self.bus.read(symbol, self.seen[symbol])
+            self.seen[symbol] = count
+            new[symbol] = [_bar(row) for row in bars.T.tolist()]
+        return new
+
+
+def run_feeder(symbols, name=None, interval=10, depth=200, fetch_latest=None, fetch_history=None,
+               iterations=None, log=print):
+    """Create the bus, load history, then publish every symbol's latest bar each ``interval`` seconds."""
+    if fetch_latest is None or fetch_history is None:
+        from data import get_historical_data_batch, get_latest_data_batch
+        fetch_latest = fetch_latest or get_latest_data_batch
+        fetch_history = fetch_history or get_historical_data_batch
+    bus = MarketDataBus.create(symbols, capacity=depth, name=name)
+    log(f"🚌 Market data bus {bus.name!r}: {len(bus.symbols)} symbols x {depth} bars")
+    try:
+        for symbol, history in fetch_history(bus.symbols).items():
+            if history and history['prices']:
+                bus.publish_history(symbol, history)
+        count = 0
+        next_run = time.monotonic()
+        while iterations is None or count < iterations:
+            for symbol, bar in fetch_latest(bus.symbols).items():
+                if bar and bar['price']:
+                    bus.publish_bar(symbol, bar)
+            count += 1
+            next_run += interval
+            time.sleep(max(0.0, next_run - time.monotonic()))
+    finally:
+        bus.close()
+        bus.unlink()
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Feed a shared-memory market data bus for strategy workers.")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--name", default="momentum_bus", help="shared memory segment name")
+    parser.add_argument("--interval", type=float, default=10, help="seconds between polls")
+    parser.add_argument("--depth", type=int, default=200, help="bars kept per symbol")
+    args = parser.parse_args(argv)
+    try:
+        run_feeder(args.symbols, args.name, args.interval, args.depth)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
-import pandas as pd
+import numpy as np
 from bot import MomentumBot
 from ai_model import AIModel
+from features import FEATURES, bar_feature_row
 
 
 class MomentumBotWithAI(MomentumBot):
@@ -13,38 +14,76 @@ class MomentumBotWithAI(MomentumBot):
         except Exception as e:
             print(f"⚠️ Could not load AI model: {e}")
 
-    def momentum_strategy_with_ai(self, price_history, high_prices, low_prices, close_prices, volume_data=None):
+    # Indicator values (from the momentum_strategy result) fed to the AI model, in order
+    FEATURES = FEATURES
+
+    @classmethod
+    def feature_row(cls, base_result):
+        return [base_result[name] or 0 for name in cls.FEATURES]
+
+    def momentum_strategy_with_ai(self, price_history, high_prices, low_prices, close_prices, volume_data=None,
+                                  bar=None):
         """
         Extend momentum strategy by combining technical consensus with AI prediction.
+        ``bar`` (an ``IndicatorCache`` handle) reuses indicators already computed for the bar.
         """
         # Step 1: Run the original momentum strategy
-        base_result = super().momentum_strategy(price_history, high_prices, low_prices, close_prices, volume_data)
+        base_result = super().momentum_strategy(price_history, high_prices, low_prices, close_prices, volume_data,
+                                                bar=bar)
 
         if not base_result or not isinstance(base_result, dict):
             return base_result
 
-        # Step 2: Prepare AI features (example using indicators from result)
-        features = [
-            base_result["ema_13"] or 0,
-            base_result["ema_20"] or 0,
-            base_result["ema_50"] or 0,
-            base_result["stoch_k"] or 0,
-            base_result["stoch_d"] or 0,
-            base_result["ao_current"] or 0
-        ]
-
-        # Step 3: AI prediction (1 = BUY, -1 = SELL, 0 = HOLD)
-        try:
-            ai_signal = self.ai.predict(features)
-        except Exception as e:
-            print(f"⚠️ AI prediction failed: {e}")
-            ai_signal = 0
+        # Steps 2-5: AI prediction on the indicator features, combined with the consensus
+        return self.apply_ai_batch([base_result])[0]
+
+    def momentum_strategy_incremental(self, price, high=None, low=None, bar=None):
+        """
+        The streaming strategy with the AI decision merged in, as ``momentum_strategy_with_ai``.
+        With a ``bar`` handle the features are read from the values the engine recorded there.
+        """
+        base_result = super().momentum_strategy_incremental(price, high, low, bar=bar)
+        features = None if bar is None else [bar_feature_row(bar, self)]
+        return self.apply_ai_batch([base_result], features)[0]
+
+    def apply_ai_batch(self, base_results, features=None):
+        """
+        Score many momentum_strategy results (e.g. one per symbol on a tick) with a
+        single batched model call and merge the AI decision into each of them.
+        ``features`` defaults to each result's ``feature_row``.
+        """
+        if features is None:
+            features = [self.feature_row(result) for result in base_results]
+
+        # AI prediction (1 = BUY, -1 = SELL, 0 = HOLD)
+        ai_signals = [0] * len(base_results)
+        if features and self.ai.loaded:
+            try:
+                ai_signals = self.ai.predict_batch(features).tolist()
+            except Exception as e:
+                print(f"⚠️ AI prediction failed: {e}")
+
+        for base_result, ai_signal in zip(base_results, ai_signals):
+            self._combine_ai(base_result, ai_signal)
+        return base_results
 
-        # Step 4: Combine signals
+    def ai_signals_for_history(self, indicators):
+        """
+        AI prediction for every bar of a backtest in one call, from an indicator
+        frame such as ``backtest_engine.compute_indicator_frame`` returns.
+        """
+        X = np.column_stack([np.nan_to_num(np.asarray(indicators[name], dtype="float64"), nan=0.0)
+                             for name in self.FEATURES])
+        if not self.ai.loaded:
+            return np.zeros(len(X), dtype=int)
+        return self.ai.predict_batch(X)
+
+    def _combine_ai(self, base_result, ai_signal):
+        # Combine signals
         final_buy = base_result["buy_signal"] or (ai_signal == 1)
         final_sell = base_result["sell_signal"] or (ai_signal == -1)
 
-        # Step 5: Add AI decision to the result
+        # Add AI decision to the result
         base_result["ai_signal"] = ai_signal
         base_result["final_buy_signal"] = final_buy
         base_result["final_sell_signal"] = final_sell
@@ -61,13 +100,15 @@ class MomentumBotWithAI(MomentumBot):
 
 # Example usage
 if __name__ == "__main__":
+    from columnar import open_csv
+
     bot = MomentumBotWithAI(initial_balance=10000)
 
-    # Load CSV created by data.py
-    df = pd.read_csv("your_data.csv")
-    prices = df["Close"].tolist()
-    highs = df["High"].tolist() if "High" in df.columns else prices
-    lows = df["Low"].tolist() if "Low" in df.columns else prices
+    # Load CSV created by generate_sample_data.py (memory-mapped columns, no list conversion)
+    df = open_csv("your_data.csv")
+    prices = df["Close"]
+    highs = df["High"]
+    lows = df["Low"]
 
     result = bot.momentum_strategy_with_ai(
         price_history=prices[-60:],  # last 60 candles
@@ -0,0 +1,213 @@
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from instrumentation import metrics
+
+
+ENVIRONMENTS = {
+    "practice": "https://api-fxpractice.oanda.com",
+    "live": "https://api-fxtrade.oanda.com",
+}
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# Rejected before any processing: safe to resend even a non-idempotent request
+NOT_PROCESSED_STATUS = {429}
+
+
+def _not_sent(exc):
+    """True when a ``requests`` error happened before a connection was made, so the request never left."""
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+class RateLimiter:
+    """Thread-safe token bucket: at most ``rate`` requests per second, bursts up to ``burst``."""
+
+    def __init__(self, rate=100, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class OandaAPIError(Exception):
+    def __init__(self, status_code, text):
+        super().__init__(f"OANDA API error: {status_code} {text}")
+        self.status_code = status_code
+        self.text = text
+
+
+class OandaClient:
+    """OANDA v20 REST client over one pooled, keep-alive ``requests.Session``.
+
+    Every request goes through a client-side token-bucket rate limiter. GETs
+    are retried with exponential backoff (plus jitter, honouring
+    ``Retry-After``) on connection errors, timeouts, 429 and 5xx responses;
+    other methods only when the request provably was not processed (no
+    connection could be made, or 429). Orders carry a client id, and an
+    order whose outcome is unknown is looked up by it before it is sent
+    again, so a timeout never turns into a double fill. Orders can be submitted
+    without blocking through a small worker pool that shares the session.
+    ``base_url`` may point at ``oanda_stub.StubOandaServer`` for offline runs.
+    """
+
+    def __init__(self, access_token, account_id, environment="practice", base_url=None,
+                 pool_size=10, rate_limit=100, max_retries=4, backoff=0.1, timeout=10):
+        self.account_id = account_id
+        self.base_url = (base_url or ENVIRONMENTS[environment]).rstrip("/")
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.limiter = RateLimiter(rate_limit)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json",
+            "Accept-Datetime-Format": "UNIX",
+        })
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="oanda")
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def request(self, method, path, idempotent=None, **kwargs):
+        """Rate-limited request with retry/backoff; returns the decoded JSON body.
+
+        ``idempotent`` (default: only for GET) allows retrying failures the
+        server may already have acted on: timeouts, dropped connections and 5xx.
+        """
+        if idempotent is None:
+            idempotent = method == "GET"
+        url = self.base_url + path
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if attempt == self.max_retries or not (idempotent or _not_sent(exc)):
+                    raise
+                self._sleep(attempt)
+                continue
+            retry = RETRY_STATUS if idempotent else NOT_PROCESSED_STATUS
+            if response.status_code in retry and attempt < self.max_retries:
+                self._sleep(attempt, response.headers.get("Retry-After"))
+                continue
+            if response.status_code >= 400:
+                raise OandaAPIError(response.status_code, response.text)
+            return response.json()
+
+    def _sleep(self, attempt, retry_after=None):
+        delay = self.backoff * (2 ** attempt)
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        time.sleep(delay * (1 + random.random() * 0.1))
+
+    # --- Endpoints ---
+    def get_prices(self, instruments):
+        """Bid/ask for many instruments in one pricing request: ``{instrument: (bid, ask)}``."""
+        if isinstance(instruments, str):
+            instruments = [instruments]
+        body = self.request("GET", f"/v3/accounts/{self.account_id}/pricing",
+                            params={"instruments": ",".join(instruments)})
+        prices = {}
+        for price_data in body.get("prices", []):
+            prices[price_data["instrument"]] = (float(price_data["bids"][0]["price"]),
+                                                float(price_data["asks"][0]["price"]))
+        return prices
+
+    def get_price(self, instrument="EUR_USD"):
+        return self.get_prices([instrument])[instrument]
+
+    def place_order(self, instrument="EUR_USD", units=100, client_id=None):
+        """Place a market order (units > 0 = buy, < 0 = sell) and wait for the response.
+
+        The order is tagged with ``client_id`` (a fresh one by default). When
+        its outcome is unknown (a timeout, a dropped connection or a 5xx), the
+        order is looked up by that id and only resubmitted if OANDA never
+        received it; if it did, the lookup body (``{"order": ...}``) is
+        returned instead of the create response.
+        """
+        t0 = metrics.start()
+        client_id = client_id or uuid.uuid4().hex
+        order_data = {
+            "order": {
+                "instrument": instrument,
+                "units": str(units),
+                "type": "MARKET",
+                "positionFill": "DEFAULT",
+                "clientExtensions": {"id": client_id},
+            }
+        }
+        path = f"/v3/accounts/{self.account_id}/orders"
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.request("POST", path, json=order_data)
+                break
+            except (requests.ConnectionError, requests.Timeout, OandaAPIError) as exc:
+                if isinstance(exc, OandaAPIError) and exc.status_code not in RETRY_STATUS:
+                    raise  # rejected: nothing was filled
+                if attempt == self.max_retries:
+                    raise
+                # Raises too if the lookup fails: better no order than a second one
+                existing = self.get_order(client_id)
+                if existing is not None:
+                    response = existing
+                    break
+                self._sleep(attempt)
+        metrics.stop("order_submit", t0)
+        return response
+
+    def get_order(self, client_id):
+        """The order tagged with ``client_id`` (``{"order": ...}``), or None if OANDA has no such order."""
+        try:
+            return self.request("GET", f"/v3/accounts/{self.account_id}/orders/@{client_id}")
+        except OandaAPIError as exc:
+            if exc.status_code == 404:
+                return None
+            raise
+
+    def submit_order(self, instrument="EUR_USD", units=100):
+        """Non-blocking ``place_order``; returns a Future with the OANDA response."""
+        return self._executor.submit(self.place_order, instrument, units)
+
+    def submit_orders(self, orders):
+        """Submit a batch of ``(instrument, units)`` orders concurrently; returns their Futures."""
+        return [self.submit_order(instrument, units) for instrument, units in orders]
+
+    def get_account_summary(self):
+        return self.request("GET", f"/v3/accounts/{self.account_id}/summary")
@@ -0,0 +1,217 @@
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StubMarket:
+    """Random-walk bid/ask quotes and instant market fills for the stub server."""
+
+    def __init__(self, spread=0.0002, volatility=0.0001, seed=None):
+        self.spread = spread
+        self.volatility = volatility
+        self.rng = random.Random(seed)
+        self.mids = {}
+        self.orders = []
+        self.client_orders = {}
+        self.balance = 100000.0
+        self.lock = threading.Lock()
+
+    def quote(self, instrument):
+        with self.lock:
+            mid = self.mids.get(instrument, 1.0 + self.rng.random())
+            mid *= 1 + self.rng.gauss(0, self.volatility)
+            self.mids[instrument] = mid
+        half = self.spread / 2
+        return mid - half, mid + half
+
+    def fill(self, instrument, units, client_id=None):
+        bid, ask = self.quote(instrument)
+        price = ask if units > 0 else bid
+        with self.lock:
+            order_id = str(len(self.orders) + 1)
+            self.orders.append((instrument, units, price))
+            if client_id:
+                self.client_orders[client_id] = order_id
+        return order_id, price
+
+    def find(self, client_id):
+        """``(order_id, instrument, units, price)`` of the order tagged ``client_id``, or None."""
+        with self.lock:
+            order_id = self.client_orders.get(client_id)
+            if order_id is None:
+                return None
+            return (order_id,) + self.orders[int(order_id) - 1]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, so pooled connections are reused
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client timed out and went away
+
+    def _throttled(self):
+        server = self.server
+        server.requests.append((self.command, urlparse(self.path).path))
+        if server.latency:
+            time.sleep(server.latency)
+        if server.fail_every and next(server.counter) % server.fail_every == 0:
+            self._send(429, {"errorMessage": "Rate limit exceeded"}, {"Retry-After": "0"})
+            return True
+        return False
+
+    def _fault(self, fault):
+        """Apply an injected fault after the request was (or was not) processed; True if it answered."""
+        if fault is None:
+            return False
+        if fault["delay"]:
+            time.sleep(fault["delay"])
+        if fault["status"] is None:
+            return False
+        headers = {"Retry-After": "0"} if fault["status"] == 429 else None
+        self._send(fault["status"], {"errorMessage": "Injected fault"}, headers)
+        return True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        if self._throttled() or self._fault(self.server.take_fault("GET")):
+            return
+        if len(parts) == 4 and parts[3] == "pricing":
+            instruments = parse_qs(url.query).get("instruments", [""])[0].split(",")
+            prices = []
+            for instrument in filter(None, instruments):
+                bid, ask = self.server.market.quote(instrument)
+                prices.append({
+                    "instrument": instrument,
+                    "time": f"{time.time():.6f}",
+                    "bids": [{"price": f"{bid:.5f}", "liquidity": 10000000}],
+                    "asks": [{"price": f"{ask:.5f}", "liquidity": 10000000}],
+                })
+            self._send(200, {"prices": prices})
+        elif len(parts) == 4 and parts[3] == "summary":
+            market = self.server.market
+            self._send(200, {"account": {"id": parts[2], "balance": f"{market.balance:.2f}",
+                                         "openTradeCount": len(market.orders)}})
+        elif len(parts) == 5 and parts[3] == "orders" and parts[4].startswith("@"):
+            found = self.server.market.find(parts[4][1:])
+            if found is None:
+                self._send(404, {"errorMessage": "The Order specified does not exist"})
+                return
+            order_id, instrument, units, price = found
+            self._send(200, {"order": {"id": order_id, "type": "MARKET", "state": "FILLED",
+                                       "instrument": instrument, "units": str(units),
+                                       "clientExtensions": {"id": parts[4][1:]},
+                                       "fillingTransactionID": str(int(order_id) + 1),
+                                       "price": f"{price:.5f}"}})
+        else:
+            self._send(404, {"errorMessage": "Not found"})
+
+    def do_POST(self):
+        parts = urlparse(self.path).path.strip("/").split("/")
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self._throttled():
+            return
+        fault = self.server.take_fault("POST")
+        if fault is not None and not fault["processed"] and self._fault(fault):
+            return
+        if len(parts) == 4 and parts[3] == "orders":
+            order = body.get("order", {})
+            units = int(float(order.get("units", 0)))
+            client_id = order.get("clientExtensions", {}).get("id")
+            order_id, price = self.server.market.fill(order.get("instrument"), units, client_id)
+            if fault is not None and self._fault(fault):
+                return
+            self._send(201, {
+                "orderCreateTransaction": {"id": order_id, "type": "MARKET_ORDER",
+                                           "instrument": order.get("instrument"), "units": str(units)},
+                "orderFillTransaction": {"id": str(int(order_id) + 1), "orderID": order_id,
+                                         "type": "ORDER_FILL", "price": f"{price:.5f}",
+                                         "units": str(units)},
+            })
+        else:
+            self._send(404, {"errorMessage": "Not found"})
+
+
+class StubOandaServer:
+    """Local stand-in for the OANDA v20 REST API (pricing, orders, order lookup, account summary).
+
+    Serves random-walk quotes and fills every market order immediately, so
+    the broker layer can be exercised and benchmarked offline. ``latency``
+    adds a per-request delay and ``fail_every`` answers every Nth request
+    with HTTP 429 to exercise retry handling. ``fail_next`` injects one
+    fault into the next request of a method, and ``requests`` lists every
+    ``(method, path)`` received.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, fail_every=0, seed=None):
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.market = StubMarket(seed=seed)
+        self.httpd.latency = latency
+        self.httpd.fail_every = fail_every
+        self.httpd.counter = itertools.count(1)
+        self.httpd.requests = []
+        self.httpd.faults = {"GET": [], "POST": []}
+        self.httpd.take_fault = self._take_fault
+        self.thread = None
+
+    def fail_next(self, method="POST", status=None, delay=0.0, processed=False):
+        """Make the next ``method`` request fail with HTTP ``status`` and/or stall ``delay`` seconds.
+
+        With ``processed`` a POST order is filled first and only its response
+        fails or stalls, as when OANDA acted on an order the client never heard back about.
+        """
+        self.httpd.faults[method].append({"status": status, "delay": delay, "processed": processed})
+        return self
+
+    def _take_fault(self, method):
+        faults = self.httpd.faults[method]
+        return faults.pop(0) if faults else None
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    @property
+    def market(self):
+        return self.httpd.market
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        # A short poll interval keeps stop() quick
+        self.thread = threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,254 @@
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest_engine import (atr_column, awesome_oscillator_columns, ema_column,
+                             performance_metrics, run_backtest, stochastic_columns)
+from bot import MomentumBot
+from columnar import open_csv
+
+
+# Strategy knobs that can be swept, with the MomentumBot defaults
+DEFAULT_PARAMS = {
+    'ema_fast': 13,
+    'ema_mid': 20,
+    'ema_slow': 50,
+    'k_period': 14,
+    'd_period': 3,
+    'overbought': 80,
+    'oversold': 20,
+    'ao_fast': 1,
+    'ao_slow': 34,
+    'risk_reward_ratio': 2,
+    'risk_per_trade': 0.02,
+}
+
+RANK_METRICS = ("sharpe", "max_drawdown", "profit_factor")
+
+
+def is_valid(params):
+    """Reject parameter combinations that make no sense for the strategy."""
+    return (params['ema_fast'] < params['ema_mid'] < params['ema_slow']
+            and params['oversold'] < params['overbought']
+            and params['ao_fast'] < params['ao_slow'])
+
+
+def make_bot(params, initial_balance=10000):
+    """Build a MomentumBot configured with a flat parameter dict."""
+    p = dict(DEFAULT_PARAMS, **params)
+    return MomentumBot(
+        initial_balance=initial_balance,
+        ema_windows=(p['ema_fast'], p['ema_mid'], p['ema_slow']),
+        k_period=p['k_period'], d_period=p['d_period'],
+        overbought=p['overbought'], oversold=p['oversold'],
+        ao_fast=p['ao_fast'], ao_slow=p['ao_slow'],
+        risk_reward_ratio=p['risk_reward_ratio'], risk_per_trade=p['risk_per_trade'])
+
+
+def grid(space):
+    """All valid combinations of a ``{param: [values]}`` search space."""
+    keys = list(space)
+    for values in itertools.product(*(space[k] for k in keys)):
+        params = dict(DEFAULT_PARAMS, **dict(zip(keys, values)))
+        if is_valid(params):
+            yield params
+
+
+def random_search(space, n_iter, seed=None):
+    """``n_iter`` distinct valid combinations sampled from a ``{param: [values]}`` space."""
+    rng = random.Random(seed)
+    seen = set()
+    total = 1
+    for values in space.values():
+        total *= len(values)
+    attempts = 0
+    while len(seen) < n_iter and attempts < total * 4:
+        attempts += 1
+        params = dict(DEFAULT_PARAMS, **{k: rng.choice(v) for k, v in space.items()})
+        key = tuple(sorted(params.items()))
+        if key in seen or not is_valid(params):
+            continue
+        seen.add(key)
+        yield params
+
+
+class SharedOHLC:
+    """Close/high/low arrays placed once in a shared-memory block for pool workers.
+
+    Workers attach by name and wrap the buffer in NumPy arrays, so each task
+    only pickles its parameter dict rather than the price history.
+    """
+
+    def __init__(self, df):
+        self.length = len(df)
+        data = np.stack([np.asarray(df["Close"], dtype="float64"),
+                         np.asarray(df["High"], dtype="float64"),
+                         np.asarray(df["Low"], dtype="float64")])
+        self.shm = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+        np.ndarray(data.shape, dtype="float64", buffer=self.shm.buf)[:] = data
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+# Per-worker state, populated by _init_worker
+_worker = {}
+
+
+def _init_worker(shm_name, length):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    data = np.ndarray((3, length), dtype="float64", buffer=shm.buf)
+    _worker['shm'] = shm
+    _worker['close'], _worker['high'], _worker['low'] = data
+    _worker['df'] = pd.DataFrame({'Close': data[0], 'High': data[1], 'Low': data[2]}, copy=False)
+    _worker['cache'] = {}
+
+
+def _cached(key, compute):
+    cache = _worker['cache']
+    if key not in cache:
+        cache[key] = compute()
+    return cache[key]
+
+
+def _indicators_for(params):
+    """Indicator columns for ``params``; columns shared between parameter sets are computed once per worker."""
+    close, high, low = _worker['close'], _worker['high'], _worker['low']
+    cols = {}
+    for name in ('ema_fast', 'ema_mid', 'ema_slow'):
+        window = params[name]
+        cols[f"ema_{window}"] = _cached(('ema', window), lambda: ema_column(close, window))
+    k_period, d_period = params['k_period'], params['d_period']
+    cols['stoch_k'], cols['stoch_d'] = _cached(
+        ('stoch', k_period, d_period), lambda: stochastic_columns(high, low, close, k_period, d_period))
+    ao_fast, ao_slow = params['ao_fast'], params['ao_slow']
+    cols['ao_current'], cols['ao_prev'] = _cached(
+        ('ao', ao_fast, ao_slow), lambda: awesome_oscillator_columns(high, low, ao_fast, ao_slow))
+    cols['atr'] = _cached(('atr', 14), lambda: atr_column(high, low, close, 14))
+    return cols
+
+
+def _evaluate(task):
+    params, start, stop, periods_per_year = task
+    bot = make_bot(params)
+    trades, equity = run_backtest(bot, _worker['df'], indicators=_indicators_for(params),
+                                  start=start, stop=stop)
+    metrics = performance_metrics(trades, equity, periods_per_year=periods_per_year)
+    return dict(params, start=start, stop=stop, **metrics)
+
+
+def rank_results(results, metrics=RANK_METRICS):
+    """Order results by the mean of their per-metric ranks (drawdown ranked ascending)."""
+    df = pd.DataFrame(results)
+    if df.empty:
+        return df
+    ranks = [df[m].rank(ascending=(m == "max_drawdown"), method="min") for m in metrics]
+    df['rank_score'] = sum(ranks) / len(ranks)
+    return df.sort_values('rank_score', kind='stable').reset_index(drop=True)
+
+
+class Optimizer:
+    """Grid/random parameter search and walk-forward analysis over a process pool.
+
+    Use as a context manager to keep one pool (and one shared-memory copy of
+    the prices) alive across several searches; otherwise each search starts
+    its own.
+    """
+
+    def __init__(self, df, max_workers=None, periods_per_year=252):
+        self.df = df
+        self.max_workers = max_workers or os.cpu_count()
+        self.periods_per_year = periods_per_year
+        self._shared = None
+        self._pool = None
+
+    def __enter__(self):
+        self._shared = SharedOHLC(self.df)
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                         initargs=(self._shared.name, self._shared.length))
+        return self
+
+    def __exit__(self, *exc):
+        self._pool.shutdown()
+        self._shared.close()
+        self._pool = None
+        self._shared = None
+
+    @classmethod
+    def from_csv(cls, csv_path, **kwargs):
+        return cls(open_csv(csv_path), **kwargs)
+
+    def _run(self, param_sets, start=0, stop=None):
+        tasks = [(params, start, stop, self.periods_per_year) for params in param_sets]
+        if not tasks:
+            return []
+        if self._pool is None:
+            with self:
+                return self._run(param_sets, start, stop)
+        chunksize = max(1, len(tasks) // (self.max_workers * 4))
+        return list(self._pool.map(_evaluate, tasks, chunksize=chunksize))
+
+    def grid_search(self, space, start=0, stop=None):
+        """Backtest every valid combination in ``space`` and return a ranked DataFrame."""
+        return rank_results(self._run(list(grid(space)), start, stop))
+
+    def random_search(self, space, n_iter=50, seed=None, start=0, stop=None):
+        """Backtest ``n_iter`` random combinations from ``space`` and return a ranked DataFrame."""
+        return rank_results(self._run(list(random_search(space, n_iter, seed)), start, stop))
+
+    def walk_forward(self, space, train_bars, test_bars, n_iter=None, seed=None):
+        """Rolling walk-forward: optimise on each training window, score the winner on the next test window.
+
+        Indicators always see the full history up to the test window, so the
+        test period has no warm-up gap. Returns one row per fold.
+        """
+        if self._pool is None:
+            with self:
+                return self.walk_forward(space, train_bars, test_bars, n_iter, seed)
+        folds = []
+        start = 0
+        while start + train_bars + test_bars <= len(self.df):
+            train_stop = start + train_bars
+            if n_iter is None:
+                ranked = self.grid_search(space, start=start, stop=train_stop)
+            else:
+                ranked = self.random_search(space, n_iter=n_iter, seed=seed, start=start, stop=train_stop)
+            if ranked.empty:
+                break
+            # Read per column so integer windows keep their dtype
+            best = {k: ranked.at[0, k] for k in DEFAULT_PARAMS}
+            best = {k: v.item() if hasattr(v, 'item') else v for k, v in best.items()}
+            test = self._run([best], start=train_stop, stop=train_stop + test_bars)[0]
+            folds.append(dict(test, fold=len(folds), train_start=start, train_stop=train_stop,
+                              train_sharpe=ranked.iloc[0]['sharpe']))
+            start += test_bars
+        return pd.DataFrame(folds)
+
+
+# Example usage
+if __name__ == "__main__":
+    space = {
+        'ema_fast': [8, 13],
+        'ema_mid': [20, 26],
+        'ema_slow': [50],
+        'k_period': [9, 14],
+        'd_period': [3],
+        'risk_reward_ratio': [1.5, 2, 3],
+    }
+    with Optimizer.from_csv("your_data.csv") as optimizer:
+        results = optimizer.grid_search(space)
+        folds = optimizer.walk_forward(space, train_bars=120, test_bars=30)
+    print("📊 Top parameter sets:")
+    print(results.head(10).to_string())
+    print("🔁 Walk-forward folds:")
+    print(folds.to_string())
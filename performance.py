@@ -0,0 +1,273 @@
+"""Streaming performance analytics for live runs and backtests.
+
+``PerformanceTracker`` folds every bar's equity and every closed trade into
+running totals, so the metrics of ``backtest_engine.performance_metrics``
+(plus Sortino and exposure) are available at any time for O(1) work per
+bar or trade: Welford mean/variance of the bar returns for Sharpe, the
+downside sum of squares for Sortino, the running peak for drawdown, and
+win/loss counts and gross profit/loss for win rate and profit factor.
+
+Equity rows and closed trades are buffered and appended to CSV files in
+batches (every ``flush_every`` rows or ``flush_interval`` seconds), in the
+columns ``backtest.py`` has always written, so memory stays bounded however
+long the run.
+"""
+import csv
+import math
+import os
+import time
+
+import numpy as np
+
+
+EQUITY_COLUMNS = ("date", "price", "cash", "position_size", "equity")
+TRADE_COLUMNS = ("entry_time", "side", "entry_price", "size", "stop_loss", "take_profit",
+                 "exit_time", "exit_price", "exit_reason", "pnl", "balance")
+
+
+def _cell(value):
+    # pandas' to_csv leaves missing values empty
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return value
+
+
+class RunningStats:
+    """Count, mean and sum of squared deviations (Welford), plus the downside sum of squares."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.downside = 0.0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        if x < 0:
+            self.downside += x * x
+
+    def add_many(self, values):
+        """Fold a whole array in (Chan et al.'s pairwise merge of two Welford states)."""
+        values = np.asarray(values, dtype="float64")
+        n_b = len(values)
+        if not n_b:
+            return
+        mean_b = float(values.mean())
+        m2_b = float(((values - mean_b) ** 2).sum())
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * self.n * n_b / n
+        self.n = n
+        negative = values[values < 0]
+        self.downside += float(negative @ negative)
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1)."""
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+    @property
+    def downside_deviation(self):
+        return math.sqrt(self.downside / self.n) if self.n else 0.0
+
+
+class PerformanceTracker:
+    """Running equity curve and trade statistics with append-only CSV output.
+
+    Feed ``update`` once per bar (or ``update_many`` with whole arrays) and
+    ``open_trade`` / ``close_trade`` (or ``record_trade``) per trade; read
+    ``metrics()`` whenever needed. Equity is ``cash + position_size * price``
+    with ``position_size`` negative while short, the accounting of
+    ``MomentumBot.execute_trade`` and ``run_backtest``.
+
+    Without paths nothing is written. With ``append=False`` the files are
+    truncated on the first flush; ``append=True`` continues existing files
+    (a restarted live run). Call ``close()`` at the end to write what is
+    still buffered.
+    """
+
+    def __init__(self, equity_path=None, trades_path=None, periods_per_year=252, flush_every=1000,
+                 flush_interval=60.0, append=False, clock=time.monotonic):
+        self.equity_path = equity_path
+        self.trades_path = trades_path
+        self.periods_per_year = periods_per_year
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.returns = RunningStats()
+        self.first_equity = None
+        self.equity = None
+        self.peak = -math.inf
+        self.max_drawdown = 0.0
+        self.bars = 0
+        self.bars_in_market = 0
+        self.gross_exposure = 0.0
+        self.wins = 0
+        self.losses = 0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.open_trades = {}
+        self._equity_rows = []
+        self._trade_rows = []
+        self._started = {equity_path: append, trades_path: append}
+        self._last_flush = clock()
+
+    # --- Bars ---
+    def update(self, timestamp, price, cash, position_size):
+        """Mark one bar; returns the equity."""
+        equity = cash + position_size * price
+        previous = self.equity
+        if previous is None:
+            self.first_equity = equity
+        elif previous:
+            self.returns.add((equity - previous) / previous)
+        self.equity = equity
+        if equity > self.peak:
+            self.peak = equity
+        elif self.peak > 0:
+            drawdown = (self.peak - equity) / self.peak
+            if drawdown > self.max_drawdown:
+                self.max_drawdown = drawdown
+        self.bars += 1
+        if position_size:
+            self.bars_in_market += 1
+        self.gross_exposure = abs(position_size * price) / equity if equity > 0 else 0.0
+        if self.equity_path is not None:
+            self._equity_rows.append((timestamp, price, cash, position_size, equity))
+            self._maybe_flush()
+        return equity
+
+    def update_many(self, timestamps, prices, cash, position_size):
+        """``update`` for whole arrays of bars at once (a vectorized backtest's equity curve)."""
+        prices = np.asarray(prices, dtype="float64")
+        if not len(prices):
+            return
+        cash = np.broadcast_to(np.asarray(cash, dtype="float64"), prices.shape)
+        position_size = np.broadcast_to(np.asarray(position_size, dtype="float64"), prices.shape)
+        equity = cash + position_size * prices
+        chained = equity if self.equity is None else np.concatenate(([self.equity], equity))
+        if self.first_equity is None:
+            self.first_equity = float(equity[0])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.diff(chained) / chained[:-1]
+        self.returns.add_many(returns[chained[:-1] != 0])
+        peak = np.maximum.accumulate(np.concatenate(([self.peak], equity)))[1:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdown = np.where(peak > 0, (peak - equity) / peak, 0.0)
+        self.max_drawdown = max(self.max_drawdown, float(drawdown.max()))
+        self.peak = float(peak[-1])
+        self.equity = float(equity[-1])
+        self.bars += len(prices)
+        self.bars_in_market += int(np.count_nonzero(position_size))
+        last = float(position_size[-1] * prices[-1])
+        self.gross_exposure = abs(last) / self.equity if self.equity > 0 else 0.0
+        if self.equity_path is not None:
+            self._equity_rows.extend(zip(timestamps, prices.tolist(), cash.tolist(), position_size.tolist(),
+                                         equity.tolist()))
+            self._maybe_flush()
+
+    # --- Trades ---
+    def open_trade(self, timestamp, side, price, size, stop_loss, take_profit, key=None):
+        """Remember an entry until ``close_trade(key=...)``; ``key`` tells concurrent positions apart."""
+        self.open_trades[key] = {"entry_time": timestamp, "side": side, "entry_price": price, "size": size,
+                                 "stop_loss": stop_loss, "take_profit": take_profit}
+
+    def close_trade(self, timestamp, price, reason, balance=None, pnl=None, key=None):
+        """Close the entry opened under ``key``; returns its trade record.
+
+        ``pnl`` defaults to ``(price - entry) * size``, negated for a SELL, as
+        in ``check_exit_conditions``; pass it for positions whose entry is not
+        known here (opened before a restart).
+        """
+        trade = self.open_trades.pop(key, None) or dict.fromkeys(TRADE_COLUMNS[:6])
+        if pnl is None:
+            entry, size = trade["entry_price"], trade["size"]
+            direction = -1 if trade["side"] == "SELL" else 1
+            pnl = direction * (price - entry) * size if entry is not None and size is not None else math.nan
+        trade.update(exit_time=timestamp, exit_price=price, exit_reason=reason, pnl=pnl,
+                     balance=math.nan if balance is None else balance)
+        self.record_trade(trade)
+        return trade
+
+    def record_trade(self, trade):
+        """Fold in a finished trade record (a ``run_backtest`` trades row); open ones are skipped."""
+        pnl = trade.get("pnl")
+        if pnl is None or pnl != pnl:
+            return
+        if pnl > 0:
+            self.wins += 1
+            self.gross_profit += pnl
+        else:
+            self.losses += 1
+            if pnl < 0:
+                self.gross_loss -= pnl
+        if self.trades_path is not None:
+            self._trade_rows.append(tuple(trade.get(column) for column in TRADE_COLUMNS))
+            self._maybe_flush()
+
+    # --- Results ---
+    @property
+    def trades(self):
+        return self.wins + self.losses
+
+    def metrics(self):
+        """``performance_metrics``' keys plus ``sortino``, ``exposure`` (share of bars in a position),
+        ``gross_exposure`` (current position value over equity) and ``equity``."""
+        returns = self.returns
+        std = returns.std
+        sharpe = returns.mean / std * math.sqrt(self.periods_per_year) if std > 0 else 0.0
+        downside = returns.downside_deviation
+        if downside > 0:
+            sortino = returns.mean / downside * math.sqrt(self.periods_per_year)
+        else:
+            sortino = math.inf if returns.mean > 0 else 0.0
+        if self.gross_loss > 0:
+            profit_factor = self.gross_profit / self.gross_loss
+        else:
+            profit_factor = math.inf if self.gross_profit > 0 else 0.0
+        return {
+            "total_return": self.equity / self.first_equity - 1 if self.first_equity else 0.0,
+            "sharpe": sharpe,
+            "sortino": sortino,
+            "max_drawdown": self.max_drawdown,
+            "profit_factor": profit_factor,
+            "win_rate": self.wins / self.trades if self.trades else 0.0,
+            "trades": self.trades,
+            "exposure": self.bars_in_market / self.bars if self.bars else 0.0,
+            "gross_exposure": self.gross_exposure,
+            "equity": self.equity if self.equity is not None else math.nan,
+        }
+
+    # --- Output ---
+    def _maybe_flush(self):
+        if (len(self._equity_rows) + len(self._trade_rows) >= self.flush_every
+                or self.clock() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def _append(self, path, columns, rows):
+        # The first write of a fresh run truncates; after that (or when appending) only add rows
+        started = self._started[path]
+        mode = "a" if started else "w"
+        header = not started or not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, mode, newline="") as f:
+            writer = csv.writer(f)
+            if header:
+                writer.writerow(columns)
+            writer.writerows([_cell(value) for value in row] for row in rows)
+        self._started[path] = True
+        rows.clear()
+
+    def flush(self):
+        """Append the buffered equity rows and trades to their files."""
+        if self._equity_rows or (self.equity_path is not None and not self._started[self.equity_path]):
+            self._append(self.equity_path, EQUITY_COLUMNS, self._equity_rows)
+        if self._trade_rows or (self.trades_path is not None and not self._started[self.trades_path]):
+            self._append(self.trades_path, TRADE_COLUMNS, self._trade_rows)
+        self._last_flush = self.clock()
+
+    def close(self):
+        self.flush()
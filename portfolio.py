@@ -0,0 +1,332 @@
+import math
+
+import numpy as np
+
+
+LONG, SHORT = 1, -1
+STOP_LOSS, TAKE_PROFIT = 1, 2
+EXIT_REASONS = {STOP_LOSS: "STOP-LOSS", TAKE_PROFIT: "TAKE-PROFIT"}
+
+
+class PositionTable:
+    """Open positions as parallel NumPy arrays (one slot per position).
+
+    Slots of closed positions go on a free list and are reused, so a
+    position's id is its slot and never moves. ``active`` marks the slots in
+    use; every bulk operation is a masked array expression over the table.
+    The table doubles its capacity when full.
+    """
+
+    FIELDS = (("symbol", np.int32), ("side", np.int8), ("size", np.float64), ("entry", np.float64),
+              ("stop", np.float64), ("target", np.float64), ("opened_at", np.float64),
+              ("active", np.bool_))
+
+    def __init__(self, capacity=1024):
+        self.capacity = 0
+        self.count = 0
+        self._free = []
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        old = self.capacity
+        for name, dtype in self.FIELDS:
+            array = np.zeros(capacity, dtype=dtype)
+            if old:
+                array[:old] = getattr(self, name)
+            setattr(self, name, array)
+        # Lowest slots first, so the active region stays compact
+        self._free.extend(range(capacity - 1, old - 1, -1))
+        self.capacity = capacity
+
+    def add(self, symbol, side, size, entry, stop, target, opened_at=math.nan):
+        if not self._free:
+            self._grow(self.capacity * 2)
+        slot = self._free.pop()
+        self.symbol[slot] = symbol
+        self.side[slot] = side
+        self.size[slot] = size
+        self.entry[slot] = entry
+        self.stop[slot] = stop
+        self.target[slot] = target
+        self.opened_at[slot] = opened_at
+        self.active[slot] = True
+        self.count += 1
+        return slot
+
+    def remove(self, slots):
+        slots = np.asarray(slots, dtype=np.intp)
+        self.active[slots] = False
+        self._free.extend(slots[::-1].tolist())
+        self.count -= len(slots)
+
+    def slots(self, symbol=None):
+        """Active slots, optionally only those of one symbol id."""
+        mask = self.active if symbol is None else self.active & (self.symbol == symbol)
+        return np.flatnonzero(mask)
+
+
+class Portfolio:
+    """Portfolio-level risk for many concurrent positions across symbols.
+
+    Positions live in a ``PositionTable``. Per tick, ``check_exits`` tests the
+    stop-loss/take-profit of every open position (or every position of one
+    symbol) in a single vectorized pass, with the same trigger rules as
+    ``MomentumBot.check_exit_conditions``, and closes the ones hit.
+
+    Aggregates are kept per symbol and updated in O(1) on every open/close:
+    net units, signed cost basis and entry notional, plus the portfolio's
+    margin in use and realized P&L. Unrealized P&L and exposure then only
+    cost a dot product over symbols, never a loop over positions.
+
+    ``roll`` feeds an exponentially weighted covariance of per-symbol
+    returns; ``size_for`` sizes a new trade the way
+    ``MomentumBot.calculate_position_size`` does (``risk_per_trade`` of equity
+    over the stop distance) and then scales it down by the exposure already
+    held in correlated symbols in the same direction, and by the margin and
+    leverage still available.
+    """
+
+    def __init__(self, initial_balance=10000, risk_per_trade=0.02, margin_rate=0.02, max_leverage=20,
+                 max_positions_per_symbol=10, corr_halflife=100, capacity=1024):
+        self.initial_balance = initial_balance
+        self.risk_per_trade = risk_per_trade
+        self.margin_rate = margin_rate
+        self.max_leverage = max_leverage
+        self.max_positions_per_symbol = max_positions_per_symbol
+        self.decay = 0.5 ** (1 / corr_halflife)
+        self.positions = PositionTable(capacity)
+        self.symbols = {}
+        self.names = []
+        self.realized_pnl = 0.0
+        self.margin_used = 0.0
+        self.gross_notional = 0.0
+        self._alloc_symbols(8)
+        self._n = 0
+
+    # --- Symbols ---
+    def _alloc_symbols(self, size):
+        def grow(array, fill=0.0):
+            out = np.full(size, fill, dtype=array.dtype if array is not None else np.float64)
+            if array is not None:
+                out[:len(array)] = array
+            return out
+
+        previous = getattr(self, "last_price", None)
+        self.last_price = grow(previous, math.nan)
+        self.net_units = grow(getattr(self, "net_units", None))
+        self.basis = grow(getattr(self, "basis", None))
+        self.notional = grow(getattr(self, "notional", None))
+        self.open_count = grow(getattr(self, "open_count", None))
+        self._rolled_price = grow(getattr(self, "_rolled_price", None), math.nan)
+        cov = np.zeros((size, size))
+        if previous is not None:
+            k = len(previous)
+            cov[:k, :k] = self.cov
+        self.cov = cov
+
+    def symbol_id(self, symbol):
+        sid = self.symbols.get(symbol)
+        if sid is None:
+            sid = self.symbols[symbol] = self._n
+            self.names.append(symbol)
+            self._n += 1
+            if self._n > len(self.last_price):
+                self._alloc_symbols(2 * len(self.last_price))
+        return sid
+
+    def mark(self, symbol, price):
+        """Record the latest price of ``symbol``; returns its id."""
+        sid = self.symbol_id(symbol)
+        self.last_price[sid] = price
+        return sid
+
+    # --- Positions ---
+    def open(self, symbol, side, size, price, stop_loss, take_profit, timestamp=math.nan, check_limits=True):
+        """Open a position; returns its id, or None when a limit would be exceeded.
+
+        ``check_limits=False`` skips the position, margin and leverage limits,
+        for re-applying trades that were already accepted (journal replay).
+        """
+        sid = self.mark(symbol, price)
+        notional = size * price
+        if check_limits:
+            if size <= 0 or self.open_count[sid] >= self.max_positions_per_symbol:
+                return None
+            if self.margin_used + notional * self.margin_rate > self.equity:
+                return None
+            if self.gross_notional + notional > self.max_leverage * self.equity:
+                return None
+        slot = self.positions.add(sid, side, size, price, stop_loss, take_profit, timestamp)
+        self.net_units[sid] += side * size
+        self.basis[sid] += side * size * price
+        self.notional[sid] += notional
+        self.open_count[sid] += 1
+        self.gross_notional += notional
+        self.margin_used += notional * self.margin_rate
+        return int(slot)
+
+    def check_exits(self, symbol=None):
+        """Close every open position (of ``symbol``, or all) whose stop or target was hit.
+
+        Returns a list of ``(position_id, symbol, side, size, entry, exit_price, reason, pnl)``.
+        """
+        table = self.positions
+        slots = table.slots(None if symbol is None else self.symbols.get(symbol, -1))
+        if not len(slots):
+            return []
+        sids = table.symbol[slots]
+        price = self.last_price[sids]
+        side = table.side[slots]
+        entry = table.entry[slots]
+        stop = table.stop[slots]
+        target = table.target[slots]
+        # Same rules as check_exit_conditions: the side of entry the level sits on decides the test
+        hit_stop = ((entry > stop) & (price <= stop)) | ((entry < stop) & (price >= stop))
+        hit_target = ((entry < target) & (price >= target)) | ((entry > target) & (price <= target))
+        hit = hit_stop | hit_target
+        if not hit.any():
+            return []
+        reason = np.where(hit_stop, STOP_LOSS, TAKE_PROFIT)[hit]
+        return self._close(slots[hit], price[hit], reason)
+
+    def close_all(self, symbol=None):
+        """Close every open position (of ``symbol``) at its last price."""
+        table = self.positions
+        slots = table.slots(None if symbol is None else self.symbols.get(symbol, -1))
+        if not len(slots):
+            return []
+        price = self.last_price[table.symbol[slots]]
+        return self._close(slots, price, np.zeros(len(slots), dtype=np.int8))
+
+    def close(self, position_ids, price):
+        """Close the given positions at ``price`` (a scalar or one price per position)."""
+        slots = np.asarray(position_ids, dtype=np.intp)
+        if not len(slots):
+            return []
+        price = np.broadcast_to(np.asarray(price, dtype=np.float64), slots.shape)
+        return self._close(slots, price, np.zeros(len(slots), dtype=np.int8))
+
+    def reprice_entry(self, position_id, price):
+        """Move an open position's entry to ``price`` (e.g. its actual fill); False if it is closed."""
+        table = self.positions
+        slot = int(position_id)
+        if not table.active[slot]:
+            return False
+        sid = table.symbol[slot]
+        size = table.size[slot]
+        change = price - table.entry[slot]
+        table.entry[slot] = price
+        self.basis[sid] += table.side[slot] * size * change
+        self.notional[sid] += size * change
+        self.gross_notional += size * change
+        self.margin_used += size * change * self.margin_rate
+        return True
+
+    def reprice_exit(self, side, size, booked, price):
+        """Realize a closed position's exit at ``price`` instead of the ``booked`` one."""
+        self.realized_pnl += (1 if side == "BUY" else -1) * size * (price - booked)
+
+    def _close(self, slots, price, reason):
+        table = self.positions
+        sids = table.symbol[slots]
+        side = table.side[slots].astype(np.float64)
+        size = table.size[slots]
+        entry = table.entry[slots]
+        pnl = side * size * (price - entry)
+        signed = side * size
+        notional = size * entry
+        # Aggregates per symbol in one scatter-add each
+        np.subtract.at(self.net_units, sids, signed)
+        np.subtract.at(self.basis, sids, signed * entry)
+        np.subtract.at(self.notional, sids, notional)
+        np.subtract.at(self.open_count, sids, 1)
+        self.gross_notional -= float(notional.sum())
+        self.margin_used -= float(notional.sum()) * self.margin_rate
+        self.realized_pnl += float(pnl.sum())
+        table.remove(slots)
+        names = self.names
+        return [(slot, names[sid], "BUY" if s > 0 else "SELL", sz, e, p, EXIT_REASONS.get(r, "CLOSE"), pl)
+                for slot, sid, s, sz, e, p, r, pl in zip(slots.tolist(), sids.tolist(), side.tolist(),
+                                                          size.tolist(), entry.tolist(), price.tolist(),
+                                                          reason.tolist(), pnl.tolist())]
+
+    # --- Aggregates ---
+    @property
+    def unrealized_pnl(self):
+        n = self._n
+        held = self.net_units[:n] != 0
+        return float(self.net_units[:n][held] @ self.last_price[:n][held] - self.basis[:n][held].sum())
+
+    @property
+    def equity(self):
+        return self.initial_balance + self.realized_pnl + self.unrealized_pnl
+
+    @property
+    def margin_available(self):
+        return self.equity - self.margin_used
+
+    def exposure(self):
+        """``{symbol: signed mark-to-market notional}`` for symbols with open positions."""
+        n = self._n
+        values = self.net_units[:n] * self.last_price[:n]
+        return {self.names[i]: float(values[i]) for i in np.flatnonzero(self.net_units[:n])}
+
+    # --- Correlation and sizing ---
+    def roll(self):
+        """Close one bar: fold each symbol's return since the last roll into the EW covariance."""
+        n = self._n
+        price = self.last_price[:n]
+        previous = self._rolled_price[:n]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            returns = np.log(price / previous)
+        returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+        self.cov[:n, :n] = self.decay * self.cov[:n, :n] + (1 - self.decay) * np.outer(returns, returns)
+        self._rolled_price[:n] = price
+
+    def correlation(self):
+        n = self._n
+        cov = self.cov[:n, :n]
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = cov / np.outer(std, std)
+        corr = np.nan_to_num(corr, nan=0.0)
+        np.fill_diagonal(corr, 1.0)
+        return corr
+
+    def size_for(self, symbol, side, price, stop_distance):
+        """Units for a new ``side`` (+1/-1) trade in ``symbol``, given its stop distance in price."""
+        if not stop_distance or stop_distance <= 0 or price <= 0:
+            return 0.0
+        equity = self.equity
+        size = equity * self.risk_per_trade / stop_distance
+        sid = self.mark(symbol, price)
+        n = self._n
+        # Exposure already pointing the same way in correlated symbols (the symbol itself counts fully)
+        held = self.net_units[:n] * self.last_price[:n]
+        held = np.nan_to_num(held)
+        std = np.sqrt(self.cov[sid, sid])
+        if std > 0:
+            rho = self.cov[sid, :n] / (std * np.sqrt(np.diag(self.cov[:n, :n])) + 1e-300)
+            rho[sid] = 1.0
+        else:
+            rho = np.zeros(n)
+            rho[sid] = 1.0
+        correlated = side * float(rho @ held)
+        if correlated > 0 and equity > 0:
+            size /= 1 + correlated / equity
+        # Stay inside margin and leverage
+        size = min(size, max(0.0, self.margin_available) / (price * self.margin_rate),
+                   max(0.0, self.max_leverage * equity - self.gross_notional) / price)
+        return max(0.0, size)
+
+    def summary(self):
+        return {
+            'open_positions': self.positions.count,
+            'equity': self.equity,
+            'realized_pnl': self.realized_pnl,
+            'unrealized_pnl': self.unrealized_pnl,
+            'margin_used': self.margin_used,
+            'margin_available': self.margin_available,
+            'gross_notional': self.gross_notional,
+            'exposure': self.exposure(),
+        }
@@ -0,0 +1,329 @@
+"""Event-driven market replay: recorded bars through the live trading loop, offline.
+
+Bars from a CSV, the local bar cache or the synthetic generator are served
+to ``MultiSymbolRunner`` in place of the Yahoo Finance fetchers, so every
+tick takes the same exit-check / strategy / trade / logging path as
+main.py. Orders go to ``MockOandaBroker``, which fills them against the
+replayed quotes with a bid/ask spread, random slippage and an order
+latency measured on the replay clock.
+
+Run from the repository root, e.g.:
+
+    python replay.py your_data.csv                       # as fast as possible
+    python replay.py --synthetic 20000 --symbols 50      # load test
+    python replay.py your_data.csv --speed 60             # one minute of bars per second
+"""
+import argparse
+import asyncio
+import random
+import threading
+import time
+
+import numpy as np
+
+from bot import MomentumBot
+from exit_monitor import oanda_instrument
+from runner import MultiSymbolRunner
+
+
+class MockOandaBroker:
+    """In-process stand-in for ``OandaBroker`` that fills orders from replayed quotes.
+
+    ``update_quote`` is called with each replayed bar's price and timestamp.
+    Quotes are ``mid -/+ spread / 2``. A market order fills at the ask (buy)
+    or bid (sell), moved against the order by ``|N(0, slippage)|``. With
+    ``latency`` > 0 the order is held until the replay clock has advanced
+    that many seconds and then fills at the quote current at that time, the
+    way a real order races the market; ``update_quote`` returns the fills it
+    made. Every fill is kept in ``fills``.
+    """
+
+    def __init__(self, spread=0.0002, slippage=0.00005, latency=0.0, seed=None):
+        self.spread = spread
+        self.slippage = slippage
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.mids = {}
+        self.clock = {}
+        self.pending = []
+        self.fills = []
+        self._ids = 0
+        self.lock = threading.Lock()
+
+    def update_quote(self, instrument, mid, timestamp=None):
+        """Advance ``instrument`` to a new mid price and fill any orders now due; returns those fills."""
+        with self.lock:
+            self.mids[instrument] = mid
+            if timestamp is not None:
+                self.clock[instrument] = timestamp
+            if self.pending:
+                return self._fill_due(instrument)
+            return []
+
+    def get_prices(self, instruments):
+        half = self.spread / 2
+        with self.lock:
+            return {i: (self.mids[i] - half, self.mids[i] + half) for i in instruments if i in self.mids}
+
+    def get_price(self, instrument="EUR_USD"):
+        return self.get_prices([instrument])[instrument]
+
+    def place_order(self, instrument="EUR_USD", units=100):
+        """Market order (units > 0 = buy, < 0 = sell); returns an OANDA-shaped response."""
+        with self.lock:
+            self._ids += 1
+            order_id = str(self._ids)
+            now = self.clock.get(instrument)
+            order = {'id': order_id, 'instrument': instrument, 'units': units,
+                     'submitted_at': now, 'requested': self.mids.get(instrument)}
+            response = {"orderCreateTransaction": {"id": order_id, "type": "MARKET_ORDER",
+                                                   "instrument": instrument, "units": str(units)}}
+            if self.latency and now is not None:
+                order['due'] = now + self.latency
+                self.pending.append(order)
+                return response
+            response["orderFillTransaction"] = self._fill(order)
+            return response
+
+    def _fill_due(self, instrument):
+        now = self.clock.get(instrument)
+        keep = []
+        filled = []
+        for order in self.pending:
+            if order['instrument'] == instrument and now is not None and now >= order['due']:
+                filled.append(self._fill(order))
+            else:
+                keep.append(order)
+        self.pending = keep
+        return filled
+
+    def _fill(self, order):
+        mid = self.mids[order['instrument']]
+        side = 1 if order['units'] > 0 else -1
+        price = mid + side * (self.spread / 2 + abs(self.rng.gauss(0, self.slippage)))
+        fill = dict(order, price=price, filled_at=self.clock.get(order['instrument']),
+                    cost=(price - order['requested']) * order['units'] if order['requested'] else 0.0)
+        self.fills.append(fill)
+        return {"id": order['id'], "orderID": order['id'], "type": "ORDER_FILL",
+                "price": str(float(price)), "units": str(order['units'])}
+
+    def fill_stats(self):
+        """Fill count and the average and total execution cost versus the mid at submission."""
+        with self.lock:
+            costs = [fill['cost'] for fill in self.fills]
+            return {'fills': len(costs), 'pending': len(self.pending),
+                    'total_cost': float(np.sum(costs)) if costs else 0.0,
+                    'mean_cost': float(np.mean(costs)) if costs else 0.0}
+
+
+class ReplayFeed:
+    """Serves recorded bars to ``MultiSymbolRunner`` as if they were polled live.
+
+    ``frames`` maps each symbol to an OHLCV frame (DataFrame or
+    ``columnar.ColumnarFrame``). The first ``warmup`` bars are returned by
+    ``fetch_history``; each ``fetch_latest`` call then hands out the next
+    bar of every requested symbol.
+    """
+
+    def __init__(self, frames, warmup=200):
+        self.warmup = warmup
+        self.columns = {}
+        for symbol, df in frames.items():
+            close = np.asarray(df["Close"], dtype="float64")
+            cols = {name.lower(): np.asarray(df[name], dtype="float64").tolist()
+                    for name in ("Open", "High", "Low", "Close")}
+            cols['volume'] = (np.asarray(df["Volume"], dtype="float64") if "Volume" in df
+                              else np.zeros(len(close))).tolist()
+            cols['timestamp'] = _timestamps(df.index, len(close))
+            self.columns[symbol] = cols
+        self.cursors = {symbol: warmup for symbol in self.columns}
+
+    @property
+    def ticks(self):
+        """Number of bars after the warm-up of the longest symbol."""
+        return max((len(c['close']) - self.warmup for c in self.columns.values()), default=0)
+
+    def fetch_history(self, symbols):
+        history = {}
+        for symbol in symbols:
+            cols = self.columns[symbol]
+            n = self.warmup
+            history[symbol] = {'prices': cols['close'][:n], 'highs': cols['high'][:n],
+                               'lows': cols['low'][:n], 'opens': cols['open'][:n],
+                               'volumes': cols['volume'][:n], 'timestamps': cols['timestamp'][:n]}
+        return history
+
+    def fetch_latest(self, symbols):
+        latest = {}
+        for symbol in symbols:
+            cols = self.columns[symbol]
+            i = self.cursors[symbol]
+            if i >= len(cols['close']):
+                continue
+            self.cursors[symbol] = i + 1
+            latest[symbol] = {'price': cols['close'][i], 'high': cols['high'][i], 'low': cols['low'][i],
+                              'open': cols['open'][i], 'volume': cols['volume'][i],
+                              'timestamp': cols['timestamp'][i]}
+        return latest
+
+
+def _timestamps(index, n):
+    """Epoch seconds per bar; a plain range index is treated as one bar per minute."""
+    if hasattr(index, "asi8") and getattr(index, "dtype", None) is not None and index.dtype.kind == "M":
+        return (index.as_unit("ns").asi8 / 1e9).tolist()
+    return [60.0 * i for i in range(n)]
+
+
+class ReplayRunner(MultiSymbolRunner):
+    """``MultiSymbolRunner`` that moves the mock broker's quote to each bar before deciding on it.
+
+    Fetching runs ahead of decisions, so quotes are advanced here rather than
+    in the feed; an order then fills against the bar it was decided on (or,
+    with broker latency, a later one, and is booked at that bar's fill price
+    through ``on_order_fill``).
+    """
+
+    def evaluate(self, state, bar, received_at=None):
+        # Orders go out under the OANDA instrument name
+        for fill in self.broker.update_quote(oanda_instrument(state.symbol), bar['price'], bar.get('timestamp')):
+            self.on_order_fill(fill['orderID'], fill['price'])
+        return super().evaluate(state, bar, received_at)
+
+
+class ReplaySimulator:
+    """Drives ``MultiSymbolRunner`` (the main.py loop) from a ``ReplayFeed``.
+
+    ``speed`` is the replay rate relative to the bars' own spacing (1 = real
+    time, 60 = a minute of bars per second); ``None`` or 0 replays as fast
+    as possible. ``on_decision`` receives the same callback arguments as in
+    main.py, so the live logging path can be load-tested too.
+    """
+
+    def __init__(self, frames, warmup=200, speed=None, broker=None, bot_factory=None,
+                 on_decision=None, batch_size=25, portfolio=None):
+        self.broker = broker if broker is not None else MockOandaBroker()
+        self.feed = ReplayFeed(frames, warmup)
+        self.speed = speed
+        self.runner = ReplayRunner(list(frames), interval=self._interval(), batch_size=batch_size,
+                                   bot_factory=bot_factory, fetch_latest=self.feed.fetch_latest,
+                                   fetch_history=self.feed.fetch_history, on_decision=on_decision,
+                                   depth=max(warmup, 1), broker=self.broker, portfolio=portfolio)
+
+    def _interval(self):
+        if not self.speed:
+            return 0.0
+        stamps = next(iter(self.feed.columns.values()))['timestamp']
+        spacing = float(np.median(np.diff(stamps))) if len(stamps) > 1 else 60.0
+        return spacing / self.speed
+
+    def run(self, ticks=None):
+        """Replay ``ticks`` polls (default: all bars) and return throughput and fill statistics."""
+        ticks = self.feed.ticks if ticks is None else ticks
+        start = time.perf_counter()
+        asyncio.run(self.runner.run(iterations=ticks))
+        elapsed = time.perf_counter() - start
+        decisions = sum(state.ticks for state in self.runner.states.values())
+        return {
+            'symbols': len(self.runner.states),
+            'decisions': decisions,
+            'elapsed_s': elapsed,
+            'ticks_per_s': decisions / elapsed if elapsed else 0.0,
+            'balance': {symbol: state.bot.account_balance for symbol, state in self.runner.states.items()},
+            'fills': self.broker.fill_stats(),
+            'portfolio': self.runner.portfolio.summary() if self.runner.portfolio is not None else None,
+            'latency': self.runner.latency_stats(),
+        }
+
+
+def load_frames(csv_paths=(), synthetic=0, n_symbols=1, store_symbols=(), interval="1m",
+                cache_dir="data_cache", seed=0):
+    """``{symbol: frame}`` from CSV files, the local bar cache and/or synthetic bars."""
+    frames = {}
+    if csv_paths:
+        from columnar import open_csv
+        for path in csv_paths:
+            frames[path] = open_csv(path)
+    if store_symbols:
+        from bar_store import BarStore
+        store = BarStore(cache_dir)
+        for symbol in store_symbols:
+            frames[symbol] = store.load(symbol, interval)
+    if synthetic:
+        from benchmarks.synthetic import synthetic_universe
+        frames.update(synthetic_universe(n_symbols, synthetic, seed=seed))
+    elif csv_paths and n_symbols > 1:
+        # Load test: fan one recording out to several symbols
+        base = dict(frames)
+        for i in range(1, n_symbols):
+            for name, frame in base.items():
+                frames[f"{name}#{i}"] = frame
+    return frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded bars through the live trading loop.")
+    parser.add_argument("csv", nargs="*", help="OHLCV CSV files to replay (one symbol each)")
+    parser.add_argument("--store", nargs="*", default=(), help="symbols to replay from the local bar cache")
+    parser.add_argument("--interval", default="1m", help="bar interval of --store data")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="BARS", help="replay synthetic bars instead")
+    parser.add_argument("--symbols", type=int, default=1, help="number of symbols (synthetic or fanned-out CSV)")
+    parser.add_argument("--speed", type=float, default=0, help="replay speed, 0 = as fast as possible")
+    parser.add_argument("--warmup", type=int, default=200, help="bars used to prime indicators")
+    parser.add_argument("--spread", type=float, default=0.0002)
+    parser.add_argument("--slippage", type=float, default=0.00005, help="slippage standard deviation")
+    parser.add_argument("--latency", type=float, default=0.0, help="order latency in replay seconds")
+    parser.add_argument("--portfolio", action="store_true",
+                        help="hold positions in one shared portfolio.Portfolio (many per symbol)")
+    parser.add_argument("--log", action="store_true", help="also write the JSON-lines trade log")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    frames = load_frames(args.csv, args.synthetic, args.symbols, args.store, args.interval, seed=args.seed)
+    if not frames:
+        parser.error("nothing to replay: give CSV files, --store symbols or --synthetic BARS")
+    warmup = min(args.warmup, min(len(f) for f in frames.values()) - 1)
+    broker = MockOandaBroker(args.spread, args.slippage, args.latency, seed=args.seed)
+
+    on_decision = writer = None
+    if args.log:
+        from trade_log import log_decision, setup_logging
+        writer = setup_logging(path="replay.jsonl", console=False)
+
+        def on_decision(symbol, price, prev_price, result, exit_message, trade_msg):
+            state = simulator.runner.states[symbol]
+            log_decision(symbol, price, result, exit_message, trade_msg,
+                         latency_ms=state.latencies[-1] * 1000, balance=state.bot.account_balance)
+
+    portfolio = None
+    if args.portfolio:
+        from portfolio import Portfolio
+        portfolio = Portfolio(initial_balance=10000 * len(frames))
+    simulator = ReplaySimulator(frames, warmup=warmup, speed=args.speed, broker=broker,
+                                bot_factory=lambda symbol: MomentumBot(initial_balance=10000),
+                                on_decision=on_decision, portfolio=portfolio)
+    print(f"⏩ Replaying {simulator.feed.ticks} bars x {len(frames)} symbol(s) "
+          f"({'max speed' if not args.speed else f'{args.speed:g}x'})")
+    stats = simulator.run()
+    if writer is not None:
+        writer.stop()
+
+    print(f"📊 {stats['decisions']:,} decisions in {stats['elapsed_s']:.2f} s "
+          f"→ {stats['ticks_per_s']:,.0f} ticks/s")
+    fills = stats['fills']
+    print(f"🧾 Fills: {fills['fills']} (pending {fills['pending']}) | "
+          f"execution cost ${fills['total_cost']:,.2f} (mean ${fills['mean_cost']:.4f})")
+    latencies = sorted(s['p99_ms'] for s in stats['latency'].values())
+    if latencies:
+        print(f"⏱️ tick-to-decision p99 (worst symbol): {latencies[-1]:.3f} ms")
+    if stats['portfolio'] is not None:
+        summary = stats['portfolio']
+        print(f"💼 Portfolio equity ${summary['equity']:,.2f} | {summary['open_positions']} open | "
+              f"margin used ${summary['margin_used']:,.2f}")
+    else:
+        balances = list(stats['balance'].values())
+        print(f"💰 Mean final balance: ${sum(balances) / len(balances):,.2f}")
+    return stats
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import numpy as np
+
+
+FIELDS = ("open", "high", "low", "close", "volume")
+
+
+class Bar:
+    """One OHLCV bar."""
+
+    __slots__ = ("open", "high", "low", "close", "volume", "timestamp")
+
+    def __init__(self, open, high, low, close, volume=0.0, timestamp=None):
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.timestamp = timestamp
+
+    def __repr__(self):
+        return (f"Bar(open={self.open}, high={self.high}, low={self.low}, "
+                f"close={self.close}, volume={self.volume}, timestamp={self.timestamp})")
+
+
+class OHLCVRingBuffer:
+    """Fixed-capacity OHLCV history backed by one preallocated NumPy block.
+
+    Every value is written twice, at ``pos`` and ``pos + capacity``, so the
+    most recent ``n`` bars are always one contiguous slice. ``closes(n)`` and
+    friends therefore return views, not copies, and ``append`` never
+    allocates.
+    """
+
+    def __init__(self, capacity=200):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._data = np.zeros((len(FIELDS), 2 * capacity), dtype="float64")
+        self._timestamps = [None] * capacity
+        self._pos = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, open, high, low, close, volume=0.0, timestamp=None):
+        """Add one bar, overwriting the oldest once the buffer is full."""
+        data = self._data
+        pos = self._pos
+        mirror = pos + self.capacity
+        data[0, pos] = data[0, mirror] = open
+        data[1, pos] = data[1, mirror] = high
+        data[2, pos] = data[2, mirror] = low
+        data[3, pos] = data[3, mirror] = close
+        data[4, pos] = data[4, mirror] = volume
+        self._timestamps[pos] = timestamp
+        self._pos = (pos + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def append_bar(self, bar):
+        self.append(bar.open, bar.high, bar.low, bar.close, bar.volume, bar.timestamp)
+
+    def extend(self, opens, highs, lows, closes, volumes=None):
+        """Bulk-load history, keeping only the newest ``capacity`` bars."""
+        volumes = volumes if volumes is not None else [0.0] * len(closes)
+        start = max(0, len(closes) - self.capacity)
+        for i in range(start, len(closes)):
+            self.append(opens[i], highs[i], lows[i], closes[i], volumes[i])
+
+    def _window(self, n):
+        n = self._size if n is None else min(n, self._size)
+        end = self._pos + self.capacity
+        return end - n, end
+
+    def view(self, n=None):
+        """Zero-copy ``(5, n)`` view of the last ``n`` bars in FIELDS order."""
+        start, end = self._window(n)
+        return self._data[:, start:end]
+
+    def opens(self, n=None):
+        start, end = self._window(n)
+        return self._data[0, start:end]
+
+    def highs(self, n=None):
+        start, end = self._window(n)
+        return self._data[1, start:end]
+
+    def lows(self, n=None):
+        start, end = self._window(n)
+        return self._data[2, start:end]
+
+    def closes(self, n=None):
+        start, end = self._window(n)
+        return self._data[3, start:end]
+
+    def volumes(self, n=None):
+        start, end = self._window(n)
+        return self._data[4, start:end]
+
+    @property
+    def last_close(self):
+        if not self._size:
+            return None
+        return float(self._data[3, self._pos + self.capacity - 1])
+
+    def last(self):
+        """The most recent bar as a ``Bar`` record."""
+        if not self._size:
+            return None
+        i = self._pos + self.capacity - 1
+        d = self._data
+        return Bar(float(d[0, i]), float(d[1, i]), float(d[2, i]), float(d[3, i]), float(d[4, i]),
+                   self._timestamps[(self._pos - 1) % self.capacity])
+
+    def __getstate__(self):
+        # Pickle only the live bars, oldest first; the mirrored copy is rebuilt on load
+        n = self._size
+        order = [(self._pos - n + i) % self.capacity for i in range(n)]
+        return {'capacity': self.capacity, 'bars': self.view().copy(),
+                'timestamps': [self._timestamps[i] for i in order]}
+
+    def __setstate__(self, state):
+        self.__init__(state['capacity'])
+        bars = state['bars']
+        n = bars.shape[1]
+        self._data[:, :n] = self._data[:, self.capacity:self.capacity + n] = bars
+        self._timestamps[:n] = state['timestamps']
+        self._pos = n % self.capacity
+        self._size = n
@@ -0,0 +1,696 @@
+import asyncio
+import time
+from collections import deque
+
+from bot import MomentumBot
+from exit_monitor import ExitMonitor, oanda_instrument
+from indicator_cache import IndicatorCache
+from instrumentation import metrics
+from ring_buffer import OHLCVRingBuffer
+from trade_log import log_error
+
+
+# Queued after each poll's bars when a portfolio is attached: close the bar for its correlation model
+_ROLL = object()
+
+
+class SymbolState:
+    """Per-symbol bot, bar history, last price and tick-to-decision latency samples."""
+
+    def __init__(self, symbol, bot, depth=200, latency_window=1000):
+        self.symbol = symbol
+        self.bot = bot
+        self.history = OHLCVRingBuffer(depth)
+        self.prev_price = None
+        self.ticks = 0
+        self.last_result = None
+        self.latencies = deque(maxlen=latency_window)
+        self.open_units = 0
+        self.performance = None
+        self.bar = None
+
+
+class MultiSymbolRunner:
+    """Trade many symbols from one process with asyncio.
+
+    Each symbol has its own ``MomentumBot`` (and therefore its own streaming
+    indicator engine). Quotes are fetched in batches of ``batch_size`` symbols
+    per request; batches run concurrently in worker threads so the blocking
+    yfinance calls overlap instead of running back to back. Fetched bars go
+    through a queue to a separate decision task, so strategy evaluation never
+    holds up the next fetch, and each decision records its tick-to-decision
+    latency. The queue holds at most ``queue_size`` bars: a decider that falls
+    behind makes the fetcher wait instead of growing memory. A bar whose
+    evaluation raises is logged and skipped; should the decision task itself
+    die, the run stops.
+
+    ``fetch_latest(symbols)`` must return ``{symbol: {'price', 'high', 'low', ...}}``
+    and ``fetch_history(symbols)`` ``{symbol: {'prices', 'highs', 'lows', ...}}``;
+    they default to the batched Yahoo Finance helpers in data.py.
+
+    With a ``broker`` (anything with ``OandaBroker.place_order``'s signature,
+    e.g. ``OandaClient`` or ``replay.MockOandaBroker``) every entry and
+    stop/target exit is also sent as a market order for the symbol's OANDA
+    instrument (``exit_monitor.oanda_instrument``) in whole units;
+    ``submit_order`` is used instead when the broker offers a non-blocking
+    one. Failed or cancelled orders are logged and taken back out of the
+    symbol's ``open_units``. Entries and exits are re-booked at the price
+    their order filled at, so spread and slippage show in the balance (or
+    the portfolio's P&L); fills that come after the order was accepted are
+    reported through ``on_order_fill``.
+
+    With a ``portfolio.Portfolio`` the runner keeps positions there instead
+    of in each bot's single-position state: every signal may add a position
+    (up to the portfolio's per-symbol limit), sized by
+    ``Portfolio.size_for``, and each tick checks all of the symbol's stops
+    and targets in one vectorized pass. A position's stop and target are
+    placed by the signal's side (the bot's own levels follow the EMA trend, which a
+    stochastic + AO vote may contradict), and no position opens before the
+    ATR is available.
+
+    With a ``state_store.StateStore`` every entry and exit is journaled
+    before its broker order goes out, and every ``snapshot_interval``
+    seconds the bots, indicator engines, bar histories and portfolio are
+    snapshotted (serialized on the event loop, written by a worker thread).
+    ``run`` restores the last snapshot and replays the journal after it
+    before priming, so restored symbols skip the history download and
+    resume warm; bars that arrived while the bot was down are not replayed.
+
+    ``performance_factory(symbol)`` may return a
+    ``performance.PerformanceTracker`` per symbol; it is then marked with the
+    symbol's equity on every bar and given every entry and exit (with a
+    portfolio, the equity is the portfolio's), and flushed when ``run`` ends.
+
+    With a ``quote_source`` (``quotes(symbols) -> {symbol: (bid, ask)}``,
+    e.g. ``exit_monitor.broker_quotes(broker)``) the stops and targets of
+    open positions are also watched tick by tick: an ``ExitMonitor`` is
+    polled every ``quote_interval`` seconds for the symbols with open
+    positions, and any exit it fires is closed, journaled, ordered and
+    reported to ``on_exit(symbol, price, exit_message)`` right away,
+    independently of the strategy polls. The per-bar exit check stays as a
+    fallback.
+
+    Each evaluation gets a handle of ``indicator_cache`` (an
+    ``IndicatorCache``; one sized for the symbols by default) as
+    ``state.bar``, keyed by the bar's timestamp and the symbol's evaluation
+    count, so a re-fetched forming bar never reads its earlier values. The
+    strategy records its indicator values there, and everything else
+    looking at the bar (an AI bot's features, ``on_decision`` logging
+    through ``log_decision(bar=...)``) reads them instead of recomputing.
+    """
+
+    def __init__(self, symbols, interval=10, initial_balance=10000, batch_size=25,
+                 bot_factory=None, fetch_latest=None, fetch_history=None, on_decision=None, depth=200,
+                 broker=None, portfolio=None, state_store=None, snapshot_interval=60,
+                 performance_factory=None, quote_source=None, quote_interval=0.5, on_exit=None,
+                 queue_size=1000, indicator_cache=None):
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.on_decision = on_decision
+        self.broker = broker
+        self.portfolio = portfolio
+        self.state_store = state_store
+        self.snapshot_interval = snapshot_interval
+        if fetch_latest is None or fetch_history is None:
+            from data import get_historical_data_batch, get_latest_data_batch
+            fetch_latest = fetch_latest or get_latest_data_batch
+            fetch_history = fetch_history or get_historical_data_batch
+        self.fetch_latest = fetch_latest
+        self.fetch_history = fetch_history
+        bot_factory = bot_factory or (lambda symbol: MomentumBot(initial_balance=initial_balance))
+        self.states = {symbol: SymbolState(symbol, bot_factory(symbol), depth) for symbol in self.symbols}
+        if performance_factory is not None:
+            for symbol, state in self.states.items():
+                state.performance = performance_factory(symbol)
+        self.quote_source = quote_source
+        self.quote_interval = quote_interval
+        self.on_exit = on_exit
+        self.exit_monitor = ExitMonitor() if quote_source is not None else None
+        self.queue_size = queue_size
+        self.indicator_cache = indicator_cache or IndicatorCache(maxsize=max(64, 4 * len(self.symbols)))
+        self._queue = None
+        self._awaiting_fill = {}
+        self._snapshot_task = None
+        self._next_snapshot = None
+
+    def _batches(self, symbols=None):
+        symbols = self.symbols if symbols is None else symbols
+        for i in range(0, len(symbols), self.batch_size):
+            yield symbols[i:i + self.batch_size]
+
+    async def prime(self, symbols=None):
+        """Download history for every symbol (batched, concurrently) and warm each bot's indicators."""
+        results = await asyncio.gather(*(asyncio.to_thread(self.fetch_history, batch)
+                                         for batch in self._batches(symbols)))
+        for history in results:
+            for symbol, data in history.items():
+                state = self.states.get(symbol)
+                if state is None or not data['prices']:
+                    continue
+                state.bot.prime_indicators(data['prices'], data['highs'], data['lows'])
+                state.history.extend(data.get('opens', data['prices']), data['highs'], data['lows'],
+                                     data['prices'], data.get('volumes'))
+                if state.bot.timeframes is not None and data.get('timestamps'):
+                    state.bot.timeframes.prime(data['timestamps'], data['prices'], data['highs'],
+                                               data['lows'], data.get('volumes'))
+                state.prev_price = data['prices'][-1]
+
+    async def _fetch_batch(self, batch):
+        t0 = metrics.start()
+        latest = await asyncio.to_thread(self.fetch_latest, batch)
+        metrics.stop("fetch", t0)
+        received_at = time.perf_counter()
+        for symbol, bar in latest.items():
+            if bar and bar['price']:
+                await self._queue.put((symbol, bar, received_at))
+
+    async def fetch_loop(self, iterations=None):
+        """Poll all symbols every ``interval`` seconds without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        count = 0
+        next_run = loop.time()
+        while iterations is None or count < iterations:
+            await asyncio.gather(*(self._fetch_batch(batch) for batch in self._batches()))
+            if self.portfolio is not None:
+                await self._queue.put(_ROLL)
+            count += 1
+            next_run += self.interval
+            await asyncio.sleep(max(0.0, next_run - loop.time()))
+
+    async def decision_loop(self):
+        """Consume fetched bars and run each symbol's strategy on them."""
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            symbol = None
+            try:
+                if item is _ROLL:
+                    self.portfolio.roll()
+                    continue
+                symbol, bar, received_at = item
+                self.evaluate(self.states[symbol], bar, received_at)
+            except Exception:
+                # One bad bar (or callback) must not stop every symbol's decisions
+                log_error(symbol, f"❌ decision failed for {symbol or 'the portfolio roll'}")
+            if self.state_store is not None and time.monotonic() >= self._next_snapshot:
+                self._start_snapshot()
+
+    def evaluate(self, state, bar, received_at=None):
+        """Exit check, strategy update and trade execution for one symbol, as in main.py.
+
+        The steps are the same with and without a portfolio; only where the
+        positions are held (the bot, or ``self.portfolio``) differs.
+        """
+        received_at = received_at if received_at is not None else time.perf_counter()
+        bot = state.bot
+        price = bar['price']
+        stamp = bar.get('timestamp') or time.time()
+        state.history.append(bar.get('open', price), bar['high'], bar['low'], price, bar.get('volume', 0.0))
+        if self.portfolio is None:
+            exit_message = self._close_bot_exits(state, price, stamp)
+        else:
+            exit_message = self._close_portfolio_exits(state, price, stamp)
+        if bot.timeframes is not None and bar.get('timestamp') is not None:
+            bot.update_timeframes(bar['timestamp'], price, bar['high'], bar['low'], bar.get('volume', 0.0))
+        result = bot.momentum_strategy_incremental(price, bar['high'], bar['low'], bar=self._bar_memo(state, bar))
+        trade_msg = None
+        if result['ema_13'] is not None and result['stoch_k'] is not None and (
+                result['buy_signal'] or result['sell_signal']):
+            side = "BUY" if result['buy_signal'] else "SELL"
+            if self.portfolio is None:
+                trade_msg = self._open_bot(state, side, price, result, stamp)
+            else:
+                trade_msg = self._open_position(state, side, price, bar.get('timestamp', float("nan")), stamp)
+        self._mark_performance(state, price, stamp)
+        return self._finish(state, price, result, exit_message, trade_msg, received_at)
+
+    def _close_bot_exits(self, state, price, stamp):
+        """The bot's stop/target check on the bar; closes, journals and orders the exit it fires."""
+        bot = state.bot
+        exit_message = bot.check_exit_conditions(state.history)
+        if exit_message:
+            self._journal("close", state.symbol, price=price)
+            if self.exit_monitor is not None:
+                self.exit_monitor.discard(state.symbol)
+            if state.open_units:
+                self._send_order(state.symbol, -state.open_units, self._rebook_exit(state, -state.open_units, price))
+            if state.performance is not None:
+                reason = "STOP-LOSS" if "STOP-LOSS" in exit_message else "TAKE-PROFIT"
+                state.performance.close_trade(stamp, price, reason, balance=bot.account_balance)
+        return exit_message
+
+    def _close_portfolio_exits(self, state, price, stamp):
+        """Marks the symbol in the portfolio and closes every position whose stop or target the bar hit."""
+        portfolio = self.portfolio
+        symbol = state.symbol
+        portfolio.mark(symbol, price)
+        exits = portfolio.check_exits(symbol)
+        if exits:
+            self._journal("close", symbol, price=price, positions=[e[0] for e in exits],
+                          units=sum(self._order_units(-size if side == "BUY" else size)
+                                    for _, _, side, size, *_ in exits))
+        exit_messages = []
+        for position, _, side, size, _, _, reason, pnl in exits:
+            self._send_broker_order(symbol, -size if side == "BUY" else size,
+                                    self._rebook_position_exit(side, size, price))
+            if self.exit_monitor is not None:
+                self.exit_monitor.discard(position)
+            if state.performance is not None:
+                state.performance.close_trade(stamp, price, reason, balance=portfolio.equity, pnl=pnl,
+                                              key=position)
+            marker = "🛑" if reason == "STOP-LOSS" else "🎯"
+            exit_messages.append(f"{marker} {reason} | P&L: ${pnl:.2f}")
+        return "; ".join(exit_messages) or None
+
+    def _open_bot(self, state, side, price, result, stamp):
+        """Enter the bot's single position on a ``side`` signal unless it holds one; the trade message."""
+        bot = state.bot
+        if bot.in_position:
+            return None
+        trade_msg = bot.execute_trade(side, price, result['position_size'], result['stop_loss'],
+                                      result['take_profit'])
+        if trade_msg:
+            units = 0
+            if self.broker is not None and bot.position_size:
+                # OANDA takes whole units
+                units = round(bot.position_side * bot.position_size)
+            self._journal("open", state.symbol, side=side, price=price, size=bot.position_size,
+                          stop_loss=bot.stop_loss, take_profit=bot.take_profit, units=units)
+            if state.performance is not None:
+                state.performance.open_trade(stamp, side, price, bot.position_size, bot.stop_loss, bot.take_profit)
+            self._watch_bot(state)
+            if units:
+                self._send_order(state.symbol, units, self._rebook_entry(state, units, price))
+        return trade_msg
+
+    def _open_position(self, state, signal_type, price, timestamp, stamp):
+        """Add a portfolio position on a ``signal_type`` signal, sized and placed by its side; the trade message."""
+        portfolio = self.portfolio
+        symbol = state.symbol
+        side = 1 if signal_type == "BUY" else -1
+        levels = self._levels(state.bot, side, price)
+        if levels is None:
+            return None
+        stop_loss, take_profit = levels
+        size = portfolio.size_for(symbol, side, price, abs(price - stop_loss))
+        position = portfolio.open(symbol, side, size, price, stop_loss, take_profit, timestamp)
+        if position is None:
+            return None
+        self._journal("open", symbol, side=signal_type, price=price, size=size,
+                      stop_loss=stop_loss, take_profit=take_profit, timestamp=timestamp, position=position,
+                      units=self._order_units(side * size))
+        self._send_broker_order(symbol, side * size, self._rebook_position_entry(state, position, price))
+        if self.exit_monitor is not None:
+            self.exit_monitor.add(symbol, signal_type, size, price, stop_loss, take_profit, key=position)
+        if state.performance is not None:
+            state.performance.open_trade(stamp, signal_type, price, size, stop_loss, take_profit, key=position)
+        return (f"{signal_type} trade executed at {price:.4f} (size: {size}, "
+                f"SL: {stop_loss}, TP: {take_profit}) #{position}")
+
+    def _mark_performance(self, state, price, stamp):
+        """Bring the bot's balance up to date (the portfolio's equity) and mark the symbol's tracker."""
+        bot = state.bot
+        if self.portfolio is None:
+            if state.performance is not None:
+                state.performance.update(stamp, price, bot.account_balance, bot.position_side * bot.position_size)
+            return
+        portfolio = self.portfolio
+        bot.account_balance = portfolio.equity
+        if state.performance is not None:
+            # The portfolio's equity, with this symbol's net units as the position
+            units = float(portfolio.net_units[portfolio.symbol_id(state.symbol)])
+            state.performance.update(stamp, price, bot.account_balance - units * price, units)
+
+    @staticmethod
+    def _levels(bot, side, price):
+        """Stop and target of a ``side`` entry: one ATR against it and ``risk_reward_ratio`` ATRs
+        with it, wherever the trend points; None while the ATR is unavailable."""
+        atr = bot.indicators.atr.value
+        if not atr:
+            return None
+        trend = "UPTREND" if side > 0 else "DOWNTREND"
+        return bot.calculate_stop_loss_take_profit(price, trend, atr, bot.risk_reward_ratio)
+
+    def _bar_memo(self, state, bar):
+        state.bar = self.indicator_cache.bar(state.symbol, bar.get('timestamp'), state.ticks)
+        return state.bar
+
+    def _finish(self, state, price, result, exit_message, trade_msg, received_at):
+        latency = time.perf_counter() - received_at
+        state.latencies.append(latency)
+        if metrics.enabled:
+            metrics.record("decision", int(latency * 1e9))
+        state.ticks += 1
+        state.last_result = result
+        if self.on_decision:
+            self.on_decision(state.symbol, price, state.prev_price, result, exit_message, trade_msg)
+        state.prev_price = price
+        return result
+
+    # --- Tick-level exits ---
+    def _watch_bot(self, state):
+        bot = state.bot
+        if self.exit_monitor is not None and bot.in_position:
+            self.exit_monitor.add(state.symbol, bot.last_trade['type'], bot.position_size, bot.entry_price,
+                                  bot.stop_loss, bot.take_profit)
+
+    def _watch_open_positions(self):
+        """Register the positions already open (e.g. after a restore) with the exit monitor."""
+        if self.portfolio is None:
+            for state in self.states.values():
+                self._watch_bot(state)
+            return
+        table = self.portfolio.positions
+        names = self.portfolio.names
+        for slot in table.slots().tolist():
+            self.exit_monitor.add(names[table.symbol[slot]], "BUY" if table.side[slot] > 0 else "SELL",
+                                  float(table.size[slot]), float(table.entry[slot]), float(table.stop[slot]),
+                                  float(table.target[slot]), key=slot)
+
+    def on_quote(self, symbol, bid, ask=None, received_at=None):
+        """Close whatever the quote's stops and targets fire; returns the exit messages."""
+        exits = self.exit_monitor.on_tick(symbol, bid, ask)
+        if not exits:
+            return []
+        received_at = received_at if received_at is not None else time.perf_counter()
+        state = self.states[symbol]
+        bot = state.bot
+        performance = state.performance
+        stamp = time.time()
+        closed = []
+        if self.portfolio is not None:
+            portfolio = self.portfolio
+            for position, _, side, size, _, price, reason, _ in exits:
+                self._journal("close", symbol, price=price, positions=[position],
+                              units=self._order_units(-size if side == "BUY" else size))
+                pnl = portfolio.close([position], price)[0][-1]
+                self._send_broker_order(symbol, -size if side == "BUY" else size,
+                                        self._rebook_position_exit(side, size, price))
+                if performance is not None:
+                    performance.close_trade(stamp, price, reason, balance=portfolio.equity, pnl=pnl,
+                                            key=position)
+                closed.append((price, reason, pnl))
+            bot.account_balance = portfolio.equity
+        elif bot.in_position:
+            _, _, _, _, _, price, reason, _ = exits[0]
+            # P&L as check_exit_conditions reports it
+            pnl = bot.position_side * (price - bot.entry_price) * bot.position_size
+            self._journal("close", symbol, price=price)
+            bot.close_position(price)
+            if state.open_units:
+                self._send_order(symbol, -state.open_units, self._rebook_exit(state, -state.open_units, price))
+            if performance is not None:
+                performance.close_trade(stamp, price, reason, balance=bot.account_balance)
+            closed.append((price, reason, pnl))
+        if metrics.enabled:
+            metrics.record("tick_exit", int((time.perf_counter() - received_at) * 1e9))
+        messages = []
+        for price, reason, pnl in closed:
+            message = f"{'🛑' if reason == 'STOP-LOSS' else '🎯'} {reason} | P&L: ${pnl:.2f}"
+            messages.append(message)
+            if self.on_exit:
+                self.on_exit(symbol, price, message)
+        return messages
+
+    async def exit_loop(self):
+        """Poll ``quote_source`` every ``quote_interval`` seconds for the symbols with open positions.
+
+        A failed poll or exit is logged and the loop carries on with the next poll.
+        """
+        loop = asyncio.get_running_loop()
+        next_run = loop.time()
+        while True:
+            symbols = self.exit_monitor.symbols()
+            if symbols:
+                t0 = metrics.start()
+                try:
+                    quotes = await asyncio.to_thread(self.quote_source, symbols)
+                except Exception:
+                    # e.g. the broker's retries ran out: try again next poll, the bar check still runs
+                    log_error(None, f"❌ quote poll failed for {len(symbols)} symbols")
+                    quotes = {}
+                metrics.stop("quotes", t0)
+                received_at = time.perf_counter()
+                for symbol, (bid, ask) in quotes.items():
+                    try:
+                        self.on_quote(symbol, bid, ask, received_at)
+                    except Exception:
+                        log_error(symbol, f"❌ tick exit failed for {symbol}", bid=bid, ask=ask)
+            # A slow quote request delays the next poll instead of bunching them up
+            next_run = max(next_run + self.quote_interval, loop.time())
+            await asyncio.sleep(next_run - loop.time())
+
+    def _order_units(self, units):
+        """The units ``_send_broker_order`` sends to the broker for ``units`` (0 without one)."""
+        return round(units) if self.broker is not None else 0
+
+    def _send_broker_order(self, symbol, units, on_fill=None):
+        if self.broker is not None:
+            self._send_order(symbol, units, on_fill)
+
+    def _send_order(self, symbol, units, on_fill=None):
+        """Market order for ``units`` of ``symbol``, as an OANDA instrument and in whole units.
+
+        ``open_units`` (what the broker should hold) moves with the order, and
+        moves back, with an ``unfilled`` journal record, if the order fails or
+        OANDA cancels it; the symbol's next exit then closes those units too.
+        ``on_fill(price)`` re-books the trade at the price the order filled at,
+        when the response carries the fill or later through ``on_order_fill``.
+        """
+        units = round(units)
+        if not units:
+            return None
+        self.states[symbol].open_units += units
+        instrument = oanda_instrument(symbol)
+        submit = getattr(self.broker, "submit_order", None)
+        if submit is None:
+            try:
+                response = self.broker.place_order(instrument, units)
+            except Exception as exc:
+                self._order_failed(symbol, units, exc)
+                return None
+            self._check_fill(symbol, units, response, on_fill)
+            return response
+        future = submit(instrument, units)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        def done(future):
+            # Runs on the broker's worker thread: hand the outcome to the event loop
+            if loop is None or loop.is_closed():
+                return self._order_done(symbol, units, future, on_fill)
+            try:
+                loop.call_soon_threadsafe(self._order_done, symbol, units, future, on_fill)
+            except RuntimeError:
+                self._order_done(symbol, units, future, on_fill)
+
+        future.add_done_callback(done)
+        return future
+
+    def _order_done(self, symbol, units, future, on_fill=None):
+        exc = future.exception()
+        if exc is not None:
+            self._order_failed(symbol, units, exc)
+        else:
+            self._check_fill(symbol, units, future.result(), on_fill)
+
+    def _check_fill(self, symbol, units, response, on_fill=None):
+        response = response or {}
+        # A 201 can still carry a cancellation (e.g. insufficient margin) instead of a fill
+        cancelled = response.get("orderCancelTransaction") or response.get("orderRejectTransaction")
+        if cancelled:
+            self._order_failed(symbol, units, None, reason=cancelled.get("reason"))
+            return
+        if on_fill is None:
+            return
+        fill = response.get("orderFillTransaction")
+        if fill is not None and fill.get("price") is not None:
+            on_fill(float(fill["price"]))
+        elif "orderCreateTransaction" in response:
+            # Accepted but not filled yet
+            self._awaiting_fill[response["orderCreateTransaction"]["id"]] = on_fill
+
+    def on_order_fill(self, order_id, price):
+        """Book the fill of an order that was accepted without one; False if it is not awaited."""
+        on_fill = self._awaiting_fill.pop(order_id, None)
+        if on_fill is None:
+            return False
+        on_fill(float(price))
+        return True
+
+    # The bot's cash moves by -units * price per order (a short's sale credits it),
+    # so a fill is charged as what the order cost over its booked price
+    def _rebook_entry(self, state, units, booked):
+        def on_fill(price):
+            bot = state.bot
+            bot.account_balance -= units * (price - booked)
+            # Only while the position this order opened is still open
+            if bot.in_position and bot.entry_price == booked:
+                bot.entry_price = bot.last_trade['price'] = price
+                self._watch_bot(state)
+        return on_fill
+
+    def _rebook_exit(self, state, units, booked):
+        def on_fill(price):
+            state.bot.account_balance -= units * (price - booked)
+        return on_fill
+
+    def _rebook_position_entry(self, state, position, booked):
+        def on_fill(price):
+            table = self.portfolio.positions
+            if not table.active[position] or table.entry[position] != booked:
+                return
+            self.portfolio.reprice_entry(position, price)
+            state.bot.account_balance = self.portfolio.equity
+            if self.exit_monitor is not None:
+                self.exit_monitor.add(state.symbol, "BUY" if table.side[position] > 0 else "SELL",
+                                      float(table.size[position]), price, float(table.stop[position]),
+                                      float(table.target[position]), key=position)
+        return on_fill
+
+    def _rebook_position_exit(self, side, size, booked):
+        def on_fill(price):
+            self.portfolio.reprice_exit(side, size, booked, price)
+        return on_fill
+
+    def _order_failed(self, symbol, units, exc, reason=None):
+        self.states[symbol].open_units -= units
+        self._journal("unfilled", symbol, units=units)
+        log_error(symbol, f"❌ order for {units} units of {symbol} not filled: {reason or exc!r}",
+                  exc_info=exc or False, units=units, reason=reason)
+
+    # --- Snapshots and the trade journal ---
+    def _journal(self, kind, symbol, **fields):
+        if self.state_store is not None:
+            self.state_store.journal.append(kind, symbol, **fields)
+
+    def snapshot_state(self):
+        """Everything needed to resume: each symbol's bot, bar history and open units, and the portfolio."""
+        return {
+            'symbols': {symbol: {'bot': state.bot, 'history': state.history, 'prev_price': state.prev_price,
+                                 'open_units': state.open_units}
+                        for symbol, state in self.states.items() if len(state.history)},
+            'portfolio': self.portfolio,
+        }
+
+    def save_state(self):
+        """Snapshot synchronously (e.g. on shutdown)."""
+        self.state_store.save(self.snapshot_state())
+
+    def _start_snapshot(self):
+        self._next_snapshot = time.monotonic() + self.snapshot_interval
+        if self._snapshot_task is not None and not self._snapshot_task.done():
+            return  # the previous one is still being written
+        t0 = metrics.start()
+        data, seq = self.state_store.capture(self.snapshot_state())
+        metrics.stop("snapshot", t0)
+        self._snapshot_task = asyncio.create_task(asyncio.to_thread(self.state_store.write, data, seq))
+
+    def restore_state(self):
+        """Load the last snapshot and replay the journal after it; returns the symbols restored."""
+        snapshot = self.state_store.load()
+        if snapshot is None:
+            return set()
+        restored = set()
+        for symbol, saved in snapshot['symbols'].items():
+            state = self.states.get(symbol)
+            if state is None:
+                continue
+            state.bot = saved['bot']
+            state.history = saved['history']
+            state.prev_price = saved['prev_price']
+            state.open_units = saved['open_units']
+            restored.add(symbol)
+        if self.portfolio is not None and snapshot['portfolio'] is not None:
+            self.portfolio = snapshot['portfolio']
+        for record in self.state_store.journal.records(after=snapshot['journal_seq']):
+            self._apply_journal(record)
+        for symbol in restored:
+            # Positions still open from before the restart, so their exits are recorded as trades
+            state = self.states[symbol]
+            bot = state.bot
+            if state.performance is not None and self.portfolio is None and bot.in_position:
+                state.performance.open_trade(None, bot.last_trade['type'], bot.entry_price, bot.position_size,
+                                             bot.stop_loss, bot.take_profit)
+        return restored
+
+    def _apply_journal(self, record):
+        state = self.states.get(record['symbol'])
+        if state is None:
+            return
+        if record['kind'] == "unfilled":
+            state.open_units -= record['units']
+            return
+        bot = state.bot
+        price = record['price']
+        if self.portfolio is not None:
+            portfolio = self.portfolio
+            if record['kind'] == "open":
+                side = 1 if record['side'] == "BUY" else -1
+                portfolio.open(record['symbol'], side, record['size'], price, record['stop_loss'],
+                               record['take_profit'], record.get('timestamp', float("nan")), check_limits=False)
+            else:
+                portfolio.mark(record['symbol'], price)
+                portfolio.close(record['positions'], price)
+            bot.account_balance = portfolio.equity
+            state.open_units += record.get('units', 0)
+        elif record['kind'] == "open":
+            bot.execute_trade(record['side'], price, record['size'], record['stop_loss'], record['take_profit'])
+            state.open_units += record.get('units', 0)
+        elif bot.in_position:
+            bot.close_position(price)
+            state.open_units = 0
+
+    async def run(self, iterations=None):
+        """Prime history, then fetch and decide until stopped (or for ``iterations`` polls)."""
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        restored = set()
+        if self.state_store is not None:
+            restored = self.restore_state()
+            self._next_snapshot = time.monotonic() + self.snapshot_interval
+        await self.prime([symbol for symbol in self.symbols if symbol not in restored])
+        decider = asyncio.create_task(self.decision_loop())
+        watcher = None
+        if self.exit_monitor is not None:
+            self._watch_open_positions()
+            watcher = asyncio.create_task(self.exit_loop())
+        fetcher = asyncio.create_task(self.fetch_loop(iterations))
+        # Without a decider the fetcher would wait on a full queue forever; its error surfaces below
+        decider.add_done_callback(lambda _: fetcher.cancel())
+        try:
+            await fetcher
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+            if not decider.done():
+                await self._queue.put(None)
+            await decider
+            if self.state_store is not None:
+                if self._snapshot_task is not None:
+                    await self._snapshot_task
+                self.save_state()
+            for state in self.states.values():
+                if state.performance is not None:
+                    state.performance.close()
+
+    def latency_stats(self):
+        """Per-symbol tick-to-decision latency in milliseconds (last, mean, p50, p99, max)."""
+        stats = {}
+        for symbol, state in self.states.items():
+            samples = sorted(state.latencies)
+            if not samples:
+                continue
+            n = len(samples)
+            stats[symbol] = {
+                'ticks': state.ticks,
+                'last_ms': state.latencies[-1] * 1000,
+                'mean_ms': sum(samples) / n * 1000,
+                'p50_ms': samples[n // 2] * 1000,
+                'p99_ms': samples[min(n - 1, int(n * 0.99))] * 1000,
+                'max_ms': samples[-1] * 1000,
+            }
+        return stats
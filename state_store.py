@@ -0,0 +1,185 @@
+import json
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+
+
+SNAPSHOT_VERSION = 1
+MAGIC = b"MBSNAP\x00\x01"
+# magic, CRC-32 of the payload, payload length, wall-clock save time
+HEADER = struct.Struct("<8sIQd")
+
+
+def _fsync_dir(directory):
+    # Make a rename durable; not every platform lets a directory be opened
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class TradeJournal:
+    """Append-only write-ahead journal of trades, one JSON object per line.
+
+    Every record gets an increasing ``seq``. ``append`` writes, flushes and
+    (with ``fsync``) syncs the record before returning, so a trade is on disk
+    before its order goes out. A torn last line left by a crash is ignored
+    when reading. ``compact(seq)`` drops the records a snapshot already
+    contains.
+    """
+
+    def __init__(self, path, fsync=True):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        records = self.records()
+        self.seq = records[-1]['seq'] if records else 0
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+            if torn:
+                # Drop the partial record so new appends start on a fresh line
+                self._rewrite(records)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def append(self, kind, symbol, **fields):
+        """Journal one trade event; returns its sequence number."""
+        with self._lock:
+            self.seq += 1
+            record = {'seq': self.seq, 'ts': time.time(), 'kind': kind, 'symbol': symbol, **fields}
+            self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            return self.seq
+
+    def records(self, after=0):
+        """Journaled records with ``seq > after``, oldest first."""
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # torn write at the tail
+                if record['seq'] > after:
+                    records.append(record)
+        return records
+
+    def compact(self, through):
+        """Rewrite the journal without the records up to ``through`` (already in a snapshot)."""
+        with self._lock:
+            self._file.close()
+            self._rewrite(self.records(after=through))
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def _rewrite(self, records):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        if self.fsync:
+            _fsync_dir(os.path.dirname(os.path.abspath(self.path)))
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class StateStore:
+    """Crash-safe snapshots of the trading state plus the trade journal, in one directory.
+
+    A snapshot is a pickled state dict (bots with their streaming indicator
+    engines, OHLCV ring buffers, the portfolio's position arrays) behind a
+    small binary header with a CRC-32. It is written to a temporary file,
+    synced and renamed over ``snapshot.bin``, so the file on disk is always
+    either the old or the new complete snapshot. Trades made after the
+    snapshot are recovered from ``trades.wal``.
+
+    Snapshots are unpickled on load: only point this at a directory the bot
+    itself writes.
+    """
+
+    def __init__(self, directory="bot_state", fsync=True):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fsync = fsync
+        self.snapshot_path = os.path.join(directory, "snapshot.bin")
+        self.journal = TradeJournal(os.path.join(directory, "trades.wal"), fsync)
+
+    @staticmethod
+    def dumps(state):
+        payload = pickle.dumps({'version': SNAPSHOT_VERSION, **state}, protocol=pickle.HIGHEST_PROTOCOL)
+        return HEADER.pack(MAGIC, zlib.crc32(payload), len(payload), time.time()) + payload
+
+    @staticmethod
+    def loads(data):
+        if len(data) < HEADER.size:
+            raise ValueError("snapshot is truncated")
+        magic, crc, length, _ = HEADER.unpack_from(data)
+        payload = memoryview(data)[HEADER.size:]
+        if magic != MAGIC:
+            raise ValueError("not a bot snapshot")
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            raise ValueError("snapshot is corrupt")
+        state = pickle.loads(payload)
+        if state.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"unsupported snapshot version {state.get('version')}")
+        return state
+
+    def write(self, data, journal_seq=None):
+        """Atomically replace the snapshot with ``data``, then drop journal records up to ``journal_seq``."""
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        if self.fsync:
+            _fsync_dir(self.directory)
+        if journal_seq is not None:
+            self.journal.compact(journal_seq)
+
+    def capture(self, state):
+        """Serialize ``state`` tagged with the current journal position; returns ``(data, seq)`` for ``write``."""
+        seq = self.journal.seq
+        return self.dumps({**state, 'journal_seq': seq}), seq
+
+    def save(self, state):
+        """Snapshot ``state`` synchronously."""
+        self.write(*self.capture(state))
+
+    def load(self):
+        """The last snapshot's state dict, or None if there is none (or it cannot be trusted)."""
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            state = self.loads(data)
+        except (ValueError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        # The journal may have been compacted empty; keep numbering after the snapshot
+        self.journal.seq = max(self.journal.seq, state['journal_seq'])
+        return state
+
+    def close(self):
+        self.journal.close()
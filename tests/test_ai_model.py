@@ -0,0 +1,38 @@
+"""AIModel's NumPy fast path against the fitted scikit-learn model."""
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+
+from ai_model import AIModel, CLASSES  # noqa: E402
+
+
+def fitted(kind):
+    from sklearn.linear_model import LogisticRegression
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    y = np.sign(X[:, 0] + 0.5 * X[:, 1]).astype(int) if kind == "binary" else rng.choice(CLASSES, 300)
+    model = AIModel(model_path=None)
+    model.model = LogisticRegression(max_iter=1000).fit(X, y)
+    model._extract_coefficients()
+    return model, X
+
+
+@pytest.mark.parametrize("kind", ["binary", "multiclass"])
+def test_fast_path_matches_the_model(kind):
+    model, X = fitted(kind)
+    np.testing.assert_array_equal(model.predict_batch(X), model.predict_batch(X, fast=False))
+
+
+@pytest.mark.parametrize("kind", ["binary", "multiclass"])
+def test_non_finite_rows_skip_the_fast_path(kind):
+    model, X = fitted(kind)
+    X = X[:5].copy()
+    X[2, 1] = np.nan
+    with pytest.raises(ValueError):
+        model.predict_batch(X)
+    X[2, 1] = np.inf
+    with pytest.raises(ValueError):
+        model.predict_batch(X)
+    np.testing.assert_array_equal(model.predict_batch(np.delete(X, 2, axis=0)),
+                                  model.model.predict(np.delete(X, 2, axis=0)))
@@ -0,0 +1,88 @@
+"""The vectorized backtest against the bar-by-bar live loop it stands in for."""
+import numpy as np
+import pytest
+
+from backtest_engine import bot_indicator_frame, run_backtest
+from benchmarks.synthetic import synthetic_ohlcv
+from bot import MomentumBot
+
+
+@pytest.fixture(scope="module")
+def df():
+    return synthetic_ohlcv(1500, seed=3, volatility=0.002)
+
+
+def live_loop(df):
+    """main.py's per-bar order: exit check on the close, then a new trade on a signal when flat."""
+    bot = MomentumBot()
+    close, high, low = (df[c].tolist() for c in ("Close", "High", "Low"))
+    trades = []
+    for i in range(len(close)):
+        if bot.check_exit_conditions(close[i]):
+            trades[-1].update(exit_bar=i, exit_price=close[i], balance=bot.account_balance)
+        result = bot.momentum_strategy(close[:i + 1], high[:i + 1], low[:i + 1], close[:i + 1])
+        if bot.in_position or not (result['buy_signal'] or result['sell_signal']):
+            continue
+        side = "BUY" if result['buy_signal'] else "SELL"
+        bot.execute_trade(side, close[i], result['position_size'], result['stop_loss'], result['take_profit'])
+        trades.append({'entry_bar': i, 'side': side, 'entry_price': close[i], 'size': result['position_size'],
+                       'stop_loss': result['stop_loss'], 'take_profit': result['take_profit']})
+    return trades, bot.account_balance
+
+
+def test_trades_match_bar_by_bar_loop(df):
+    expected, expected_balance = live_loop(df)
+    bot = MomentumBot()
+    trades, equity = run_backtest(bot, df)
+    assert len(expected) > 5
+    assert len(trades) == len(expected)
+    positions = {ts: i for i, ts in enumerate(df.index)}
+    for row, reference in zip(trades.to_dict("records"), expected):
+        assert positions[row['entry_time']] == reference['entry_bar']
+        assert row['side'] == reference['side']
+        for key in ('entry_price', 'size', 'stop_loss', 'take_profit'):
+            assert row[key] == pytest.approx(reference[key], rel=1e-9)
+        if 'exit_bar' in reference:
+            assert positions[row['exit_time']] == reference['exit_bar']
+            assert row['exit_price'] == reference['exit_price']
+            assert row['balance'] == pytest.approx(reference['balance'], rel=1e-9)
+    assert bot.account_balance == pytest.approx(expected_balance, rel=1e-9)
+    assert len(equity) == len(df)
+
+
+def test_indicator_frame_rows_match_momentum_strategy(df):
+    bot = MomentumBot()
+    frame = bot_indicator_frame(bot, df)
+    close, high, low = (df[c].to_numpy() for c in ("Close", "High", "Low"))
+    for i in list(range(49, len(df), 97)) + [len(df) - 1]:
+        result = bot.momentum_strategy(close[:i + 1], high[:i + 1], low[:i + 1], close[:i + 1])
+        for key in ('ema_13', 'ema_20', 'ema_50', 'stoch_k', 'stoch_d', 'ao_current'):
+            assert frame[key].iloc[i] == pytest.approx(result[key], rel=1e-9, nan_ok=True), (i, key)
+
+
+def test_pnl_is_signed_by_side(df):
+    bot = MomentumBot()
+    start = bot.account_balance
+    trades, equity = run_backtest(bot, df)
+    closed = trades.dropna(subset=["pnl"])
+    assert {"BUY", "SELL"} <= set(closed["side"])
+    direction = np.where(closed["side"] == "BUY", 1.0, -1.0)
+    np.testing.assert_allclose(closed["pnl"], direction * (closed["exit_price"] - closed["entry_price"]) * closed["size"])
+    # A short's target sits below its entry: hitting it is a gain
+    shorts = closed[(closed["side"] == "SELL") & (closed["take_profit"] < closed["entry_price"])]
+    assert (shorts.loc[shorts["exit_reason"] == "TAKE-PROFIT", "pnl"] > 0).all()
+    # Cash only moves by realized P&L between flat bars
+    assert closed["balance"].iloc[-1] == pytest.approx(start + closed["pnl"].sum(), rel=1e-9)
+    flat = equity["position_size"] == 0
+    np.testing.assert_allclose(equity.loc[flat, "equity"], equity.loc[flat, "cash"])
+
+
+def test_bot_books_shorts_by_side():
+    bot = MomentumBot(initial_balance=1000)
+    bot.execute_trade("SELL", 100.0, 2.0, 105.0, 90.0)
+    assert bot.account_balance == 1200.0
+    assert bot.check_exit_conditions(89.0) == "🎯 TAKE-PROFIT | P&L: $22.00"
+    assert bot.account_balance == 1022.0
+    bot.execute_trade("BUY", 100.0, 2.0, 95.0, 110.0)
+    assert bot.check_exit_conditions(94.0) == "🛑 STOP-LOSS | P&L: $-12.00"
+    assert bot.account_balance == 1010.0
@@ -0,0 +1,52 @@
+"""MomentumBot: the signal-only path against the full momentum_strategy result."""
+import pytest
+
+from benchmarks.synthetic import synthetic_ohlcv
+from bot import MomentumBot
+
+
+@pytest.fixture(scope="module")
+def bars():
+    frame = synthetic_ohlcv(1500, seed=7)
+    return [frame[column].to_numpy(copy=True) for column in ("High", "Low", "Close")]
+
+
+def test_momentum_signal_matches_momentum_strategy(bars):
+    high, low, close = bars
+    bot = MomentumBot()
+    fired = 0
+    for end in range(40, len(close) + 1, 3):
+        window = slice(max(0, end - 200), end)
+        result = bot.momentum_strategy(close[window], high[window], low[window], close[window])
+        signal = bot.momentum_signal(close[window], high[window], low[window], close[window])
+        if result['buy_signal'] or result['sell_signal']:
+            fired += 1
+            assert signal is not None and signal.to_result() == result
+        else:
+            assert signal is None
+    assert fired > 20
+
+
+def test_momentum_signal_incremental_matches_the_streaming_strategy(bars):
+    high, low, close = bars
+    full, lazy = MomentumBot(), MomentumBot()
+    fired = 0
+    for h, l, c in zip(high.tolist(), low.tolist(), close.tolist()):
+        result = full.momentum_strategy_incremental(c, h, l)
+        signal = lazy.momentum_signal_incremental(c, h, l)
+        if result['buy_signal'] or result['sell_signal']:
+            fired += 1
+            assert signal is not None and signal.to_result() == result
+        else:
+            assert signal is None
+    assert fired > 50
+
+
+def test_momentum_signal_is_none_while_in_a_position(bars):
+    high, low, close = bars
+    bot = MomentumBot()
+    signal = next(signal for end in range(50, len(close))
+                  if (signal := bot.momentum_signal(close[:end], high[:end], low[:end], close[:end])))
+    bot.execute_trade(signal.side, signal.price, signal.position_size, signal.stop_loss, signal.take_profit)
+    assert bot.momentum_signal(close, high, low, close) is None
+    assert bot.momentum_signal_incremental(close[-1], high[-1], low[-1]) is None
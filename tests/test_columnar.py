@@ -0,0 +1,60 @@
+"""The columnar CSV converter: column-name mapping, date parsing and cache invalidation."""
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from columnar import FORMAT_VERSION, META_FILE, canonical_name, open_csv
+
+
+@pytest.mark.parametrize("column, expected", [
+    ("High", "High"), ("close", "Close"), ("VOLUME", "Volume"), ("Adj Close", "Adj Close"),
+    ("adj_close", "Adj Close"), ("AdjClose", "Adj Close"),
+    ("High_AAPL", "High"), ("Close_EURUSD=X", "Close"), ("Low_^GSPC", "Low"), ("Adj Close_BRK-B", "Adj Close"),
+])
+def test_known_spellings_map_to_ohlcv(column, expected):
+    assert canonical_name(column) == expected
+
+
+@pytest.mark.parametrize("column", ["open_interest", "Open_interest", "close_to_close", "volume_ma_20",
+                                    "High_water_mark", "EMA_10", "Closed", "signal"])
+def test_other_columns_keep_their_name(column):
+    assert canonical_name(column) == column
+
+
+def write_csv(path, **columns):
+    pd.DataFrame(columns).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize("stamps", [[1704067200, 1704067260], [1704067200.0, 1704067260.5]])
+def test_numeric_timestamps_are_epoch_seconds(tmp_path, stamps):
+    frame = open_csv(write_csv(tmp_path / "bars.csv", timestamp=stamps, close=[1.0, 1.1]))
+    assert frame.index.tolist() == list(pd.to_datetime(stamps, unit="s"))
+    assert frame["Close"].tolist() == [1.0, 1.1]
+
+
+def test_date_strings_are_parsed_as_dates(tmp_path):
+    frame = open_csv(write_csv(tmp_path / "bars.csv", Date=["2024-01-01 00:00:00+01:00", "2024-01-02 00:00:00+00:00"],
+                               Close=[1.0, 1.1]))
+    assert frame.index.tolist() == [pd.Timestamp("2023-12-31 23:00"), pd.Timestamp("2024-01-02")]
+
+
+def test_copies_from_another_format_version_are_rebuilt(tmp_path):
+    csv_path = write_csv(tmp_path / "bars.csv", Close=[1.0, 1.1])
+    frame = open_csv(csv_path)
+    assert frame.meta['version'] == FORMAT_VERSION
+    meta_path = os.path.join(frame.path, META_FILE)
+    # An older converter's copy, which mapped nothing: same mtime, no version
+    meta = dict(frame.meta, columns={})
+    del meta['version']
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+    assert open_csv(csv_path).columns == ["Close"]
+    # An up-to-date copy is reused as is
+    with open(meta_path) as f:
+        meta = json.load(f)
+    with open(meta_path, "w") as f:
+        json.dump(dict(meta, length=1), f)
+    assert len(open_csv(csv_path)) == 1
@@ -0,0 +1,62 @@
+"""Universe-wide indicator matrices against the per-symbol ``MomentumBot`` calculations."""
+import numpy as np
+import pytest
+
+import cross_section
+from benchmarks.synthetic import synthetic_universe
+from bot import MomentumBot
+
+N_SYMBOLS, N_BARS, LATE_START = 8, 260, 70
+
+
+@pytest.fixture(scope="module")
+def universe():
+    frames = synthetic_universe(N_SYMBOLS, N_BARS, seed=5)
+    close, high, low = (np.stack([df[c].to_numpy() for df in frames.values()]) for c in ("Close", "High", "Low"))
+    # A symbol listed later: NaN-padded at the front of the matrix
+    for matrix in (close, high, low):
+        matrix[3, :LATE_START] = np.nan
+    return close, high, low
+
+
+def per_symbol_values(bot, c, h, l):
+    macd, macd_signal = bot.calculate_macd(c)
+    bb_upper, bb_middle, bb_lower = bot.calculate_bollinger_bands(c)
+    stoch_k, stoch_d = bot.calculate_stochastic(h, l, c)
+    ao_current, ao_prev = bot.calculate_awesome_oscillator(h, l)
+    values = {f"ema_{w}": bot.calculate_ema(c, w) for w in bot.ema_windows}
+    values.update(stoch_k=stoch_k, stoch_d=stoch_d, ao_current=ao_current, ao_prev=ao_prev,
+                  atr=bot.calculate_atr(h, l, c), rsi=bot.calculate_rsi(c), macd=macd, macd_signal=macd_signal,
+                  bb_upper=bb_upper, bb_middle=bb_middle, bb_lower=bb_lower)
+    return values
+
+
+def test_universe_matches_per_symbol(universe):
+    close, high, low = universe
+    bot = MomentumBot()
+    indicators = cross_section.compute_universe(close, high, low)
+    buy, sell, _ = cross_section.consensus_matrix(close, indicators)
+    for s in range(N_SYMBOLS):
+        first = LATE_START if s == 3 else 0
+        for t in list(range(first, N_BARS, 11)) + [N_BARS - 1]:
+            c, h, l = close[s, first:t + 1], high[s, first:t + 1], low[s, first:t + 1]
+            for name, expected in per_symbol_values(bot, c, h, l).items():
+                got = indicators[name][s, t]
+                if expected is None:
+                    assert np.isnan(got), (s, t, name, got)
+                else:
+                    assert got == pytest.approx(expected, rel=1e-9, abs=1e-12, nan_ok=True), (s, t, name)
+            result = bot.momentum_strategy(c, h, l, c)
+            assert (bool(buy[s, t]), bool(sell[s, t])) == (result['buy_signal'], result['sell_signal']), (s, t)
+
+
+def test_screen_is_last_column(universe):
+    close, high, low = universe
+    bot = MomentumBot()
+    buy, sell, _, latest = cross_section.screen(bot, close, high, low)
+    for s in range(N_SYMBOLS):
+        first = LATE_START if s == 3 else 0
+        c, h, l = close[s, first:], high[s, first:], low[s, first:]
+        result = bot.momentum_strategy(c, h, l, c)
+        assert (bool(buy[s]), bool(sell[s])) == (result['buy_signal'], result['sell_signal'])
+        assert latest['stoch_k'][s] == pytest.approx(result['stoch_k'], rel=1e-9)
@@ -0,0 +1,83 @@
+"""ExitMonitor: tick-level stops and targets against check_exit_conditions' rules."""
+import random
+
+import pytest
+
+from bot import MomentumBot
+from exit_monitor import STOP_LOSS, TAKE_PROFIT, ExitMonitor
+
+
+def test_longs_exit_at_the_bid_and_shorts_at_the_ask():
+    monitor = ExitMonitor()
+    monitor.add("EURUSD=X", "BUY", 100, 1.0, 0.98, 1.02, key="long")
+    monitor.add("EURUSD=X", "SELL", 100, 1.0, 1.02, 0.98, key="short")
+    # The ask reaches 1.02 but the bid does not: only the short's stop fires
+    [exit_] = monitor.on_tick("EURUSD=X", 1.019, 1.021)
+    assert exit_ == ("short", "EURUSD=X", "SELL", 100, 1.0, 1.021, STOP_LOSS, pytest.approx(-2.1))
+    assert "long" in monitor and "short" not in monitor
+    monitor.add("EURUSD=X", "SELL", 100, 1.0, 1.02, 0.98, key="short")
+    # The bid falls to 0.98 but the ask does not: only the long's stop fires
+    [exit_] = monitor.on_tick("EURUSD=X", 0.979, 0.981)
+    assert exit_[:2] == ("long", "EURUSD=X") and exit_[5:7] == (0.979, STOP_LOSS)
+    [exit_] = monitor.on_tick("EURUSD=X", 0.978, 0.979)
+    assert exit_[0] == "short" and exit_[5:7] == (0.979, TAKE_PROFIT) and exit_[7] == pytest.approx(2.1)
+    assert len(monitor) == 0 and monitor.symbols() == []
+
+
+def test_stop_wins_when_one_tick_crosses_both_levels():
+    # Trend-based levels can put both on the same side of the entry
+    monitor = ExitMonitor()
+    monitor.add("EURUSD=X", "BUY", 100, 1.0, 0.99, 0.98)
+    [exit_] = monitor.on_tick("EURUSD=X", 0.975)
+    assert exit_[6] == STOP_LOSS
+    bot = MomentumBot(initial_balance=1000)
+    bot.execute_trade("BUY", 1.0, 100, 0.99, 0.98)
+    assert bot.check_exit_conditions(0.975).startswith("🛑 STOP-LOSS")
+
+
+def test_discard_forgets_the_levels():
+    monitor = ExitMonitor()
+    monitor.add("EURUSD=X", "BUY", 100, 1.0, 0.98, 1.02)
+    monitor.add("GBPUSD=X", "SELL", 100, 1.3, 1.31, 1.28)
+    assert monitor.discard("EURUSD=X") and not monitor.discard("EURUSD=X")
+    assert monitor.on_tick("EURUSD=X", 0.9) == [] and monitor.symbols() == ["GBPUSD=X"]
+    # Re-adding under a key replaces the old levels
+    monitor.add("GBPUSD=X", "SELL", 100, 1.3, 1.35, 1.25)
+    assert monitor.on_tick("GBPUSD=X", 1.32) == [] and len(monitor) == 1
+
+
+def test_a_tick_closes_exactly_the_positions_it_crosses():
+    monitor = ExitMonitor()
+    stops = [0.95, 0.96, 0.97, 0.98, 0.99]
+    for i, stop in enumerate(stops):
+        monitor.add("EURUSD=X", "BUY", 10, 1.0, stop, 1.0 + (1.0 - stop), key=i)
+    assert monitor.on_tick("EURUSD=X", 0.975) == [
+        (i, "EURUSD=X", "BUY", 10, 1.0, 0.975, STOP_LOSS, pytest.approx(-0.25)) for i in (3, 4)]
+    assert sorted(monitor.orders) == [0, 1, 2]
+    assert [exit_[0] for exit_ in monitor.on_tick("EURUSD=X", 1.045)] == [1, 2]
+    assert sorted(monitor.orders) == [0]
+
+
+def test_random_ticks_match_check_exit_conditions():
+    rng = random.Random(3)
+    monitor = ExitMonitor()
+    bots = {}
+    for key in range(200):
+        side = rng.choice(["BUY", "SELL"])
+        entry = rng.uniform(0.9, 1.1)
+        stop_loss, take_profit = (entry + rng.uniform(-0.05, 0.05) for _ in range(2))
+        monitor.add("EURUSD=X", side, 10, entry, stop_loss, take_profit, key=key)
+        bot = bots[key] = MomentumBot(initial_balance=1000)
+        bot.execute_trade(side, entry, 10, stop_loss, take_profit)
+    for _ in range(100):
+        bid = rng.uniform(0.85, 1.15)
+        ask = bid + 0.001
+        fired = {exit_[0]: exit_[6] for exit_ in monitor.on_tick("EURUSD=X", bid, ask)}
+        expected = {}
+        for key, bot in list(bots.items()):
+            message = bot.check_exit_conditions(bid if bot.position_side > 0 else ask)
+            if message:
+                expected[key] = STOP_LOSS if "STOP-LOSS" in message else TAKE_PROFIT
+                del bots[key]
+        assert fired == expected
+    assert sorted(monitor.orders) == sorted(bots)
@@ -0,0 +1,53 @@
+"""Per-bar indicator memo: LRU bounds, versioned bar keys and shared values."""
+from benchmarks.synthetic import synthetic_ohlcv
+from bot import MomentumBot
+from features import bar_feature_row, latest_feature_row
+from indicator_cache import IndicatorCache
+from momentum_bot_with_ai import MomentumBotWithAI
+
+
+def test_lru_eviction_and_counters():
+    cache = IndicatorCache(maxsize=2)
+    calls = []
+    compute = lambda: calls.append(1) or len(calls)
+    assert cache.get("A", 1, "ema", (("window", 13),), compute) == 1
+    assert cache.get("A", 1, "ema", (("window", 13),), compute) == 1
+    cache.bar("A", 2)
+    cache.bar("A", 1)  # touch: bar 2 is now the least recently used
+    cache.bar("A", 3)
+    assert ("A", 1, None) in cache and ("A", 2, None) not in cache
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 1, "bars": 2, "hit_rate": 0.5}
+
+
+def test_version_separates_a_reforming_bar():
+    cache = IndicatorCache()
+    first = cache.get("A", 100, "ema", (), lambda: 1.0, version=0)
+    second = cache.get("A", 100, "ema", (), lambda: 2.0, version=1)
+    assert (first, second) == (1.0, 2.0)
+
+
+def test_consumers_share_one_computation():
+    df = synthetic_ohlcv(120, seed=4)
+    close, high, low = (df[c].to_numpy() for c in ("Close", "High", "Low"))
+    bot = MomentumBot()
+    ai_bot = MomentumBotWithAI(ai_model_path="")
+    cache = IndicatorCache()
+    bar = cache.bar("SYN", df.index[-1])
+    expected = bot.momentum_strategy(close, high, low, close)
+    assert bot.momentum_strategy(close, high, low, close, bar=bar) == expected
+    misses = cache.misses
+    ai_bot.momentum_strategy_with_ai(close, high, low, close, bar=bar)
+    row = latest_feature_row(close, high, low, bot=bot, bar=bar)
+    assert cache.misses == misses == 6
+    assert row == bar_feature_row(bar, bot) == MomentumBotWithAI.feature_row(expected)
+
+
+def test_incremental_strategy_records_engine_values():
+    df = synthetic_ohlcv(120, seed=4)
+    bot = MomentumBot()
+    cache = IndicatorCache()
+    for i, (c, h, l) in enumerate(zip(df["Close"], df["High"], df["Low"])):
+        bar = cache.bar("SYN", i)
+        result = bot.momentum_strategy_incremental(c, h, l, bar=bar)
+    assert bar_feature_row(bar, bot) == MomentumBotWithAI.feature_row(result)
+    assert bot.recall(bar, "atr", window=14) == bot.indicators.snapshot()["atr"]
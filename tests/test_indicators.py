@@ -0,0 +1,66 @@
+"""The streaming indicator engine against the batch ``calculate_*`` / ``momentum_strategy`` it replaces."""
+import math
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import synthetic_ohlcv
+from bot import MomentumBot
+
+
+def same(a, b, tolerance=1e-9):
+    if a is None or b is None:
+        return a is None and b is None
+    a, b = float(a), float(b)
+    if math.isnan(a) or math.isnan(b):
+        return math.isnan(a) and math.isnan(b)
+    return abs(a - b) <= tolerance * max(1.0, abs(a))
+
+
+@pytest.fixture(scope="module")
+def bars():
+    df = synthetic_ohlcv(400, seed=7)
+    return tuple(df[c].tolist() for c in ("Close", "High", "Low"))
+
+
+def test_incremental_strategy_matches_full_recompute(bars):
+    close, high, low = bars
+    batch, streaming = MomentumBot(), MomentumBot()
+    for i in range(1, len(close) + 1):
+        result = streaming.momentum_strategy_incremental(close[i - 1], high[i - 1], low[i - 1])
+        if i % 5 and i < len(close) - 2:
+            continue
+        expected = batch.momentum_strategy(close[:i], high[:i], low[:i], close[:i])
+        assert result.keys() == expected.keys()
+        for key, value in expected.items():
+            if value is None or isinstance(value, (float, np.floating)):
+                assert same(value, result[key]), (i, key, value, result[key])
+            else:
+                assert value == result[key], (i, key, value, result[key])
+
+
+def test_engine_snapshot_matches_batch_indicators(bars):
+    close, high, low = bars
+    batch, streaming = MomentumBot(), MomentumBot()
+    for i in range(1, len(close) + 1):
+        streaming.indicators.update(close[i - 1], high[i - 1], low[i - 1])
+        if i % 9 and i != len(close):
+            continue
+        snapshot = streaming.indicators.snapshot()
+        c, h, l = close[:i], high[:i], low[:i]
+        macd, signal = batch.calculate_macd(c)
+        upper, middle, lower = batch.calculate_bollinger_bands(c)
+        expected = {'rsi': batch.calculate_rsi(c), 'atr': batch.calculate_atr(h, l, c), 'macd': macd,
+                    'macd_signal': signal, 'bb_upper': upper, 'bb_middle': middle, 'bb_lower': lower}
+        for key, value in expected.items():
+            assert same(value, snapshot[key]), (i, key, value, snapshot[key])
+
+
+def test_prime_indicators_matches_streaming(bars):
+    close, high, low = bars
+    primed, streamed = MomentumBot(), MomentumBot()
+    primed.prime_indicators(close[:300], high[:300], low[:300])
+    for c, h, l in zip(close[:300], high[:300], low[:300]):
+        streamed.momentum_strategy_incremental(c, h, l)
+    for c, h, l in zip(close[300:], high[300:], low[300:]):
+        assert primed.momentum_strategy_incremental(c, h, l) == streamed.momentum_strategy_incremental(c, h, l)
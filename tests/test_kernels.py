@@ -0,0 +1,82 @@
+"""The kernel backends against each other and against the pandas formulas they replace."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import kernels
+from benchmarks.kernels import max_difference, pandas_atr, pandas_awesome_oscillator, pandas_stochastic
+from benchmarks.synthetic import synthetic_ohlcv
+from bot import MomentumBot
+
+TOLERANCE = 1e-9
+# Without Numba its uncompiled loop kernels stand in for it
+BACKENDS = kernels.available_backends() + (() if "numba" in kernels.available_backends() else ("loops",))
+
+
+def random_bars(n=600, seed=0):
+    df = synthetic_ohlcv(n, seed=seed)
+    return tuple(df[c].to_numpy(copy=True) for c in ("High", "Low", "Close"))
+
+
+def nan_gapped_bars(n=600, seed=1):
+    high, low, close = random_bars(n, seed)
+    rng = np.random.default_rng(seed)
+    for start in rng.choice(n - 10, 8, replace=False):
+        gap = slice(start, start + rng.integers(1, 6))
+        high[gap] = low[gap] = close[gap] = np.nan
+    return high, low, close
+
+
+def constant_bars(n=300):
+    high, low, close = random_bars(n, seed=2)
+    # Flat stretches longer than every window, at the start, the middle and the end
+    for flat in (slice(0, 60), slice(120, 200), slice(n - 50, n)):
+        high[flat] = low[flat] = close[flat] = 1.2345
+    return high, low, close
+
+
+INPUTS = {"random": random_bars, "nan_gapped": nan_gapped_bars, "constant": constant_bars}
+
+
+@pytest.mark.parametrize("inputs", INPUTS)
+def test_backends_agree(inputs):
+    high, low, close = INPUTS[inputs]()
+    for backend in BACKENDS[1:]:
+        report = kernels.cross_check(high, low, close, backends=(BACKENDS[0], backend))
+        assert max(report.values()) <= TOLERANCE, (backend, report)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("inputs", INPUTS)
+def test_matches_pandas(backend, inputs):
+    high, low, close = INPUTS[inputs]()
+    assert max_difference(pandas_awesome_oscillator(high, low),
+                          kernels.awesome_oscillator(high, low, backend=backend)) <= TOLERANCE
+    assert max_difference(pandas_atr(high, low, close), kernels.atr(high, low, close, backend=backend)) <= TOLERANCE
+    if inputs != "nan_gapped":
+        # Across NaN gaps the EWM follows StreamingEMA's recurrence, which pandas departs from at span 3
+        assert max_difference(np.stack(pandas_stochastic(high, low, close)),
+                              np.stack(kernels.stochastic(high, low, close, backend=backend))) <= TOLERANCE
+
+
+@pytest.mark.parametrize("span", [3, 13, 50])
+def test_ewm_matches_pandas(span):
+    _, _, close = random_bars()
+    expected = pd.Series(close).ewm(span=span, adjust=False).mean().to_numpy()
+    for backend in BACKENDS:
+        assert max_difference(expected, kernels.ewm(close, span, backend=backend)) <= TOLERANCE
+
+
+def test_bot_indicators_match_pandas():
+    high, low, close = random_bars(200)
+    bot = MomentumBot()
+    k, d = pandas_stochastic(high, low, close)
+    assert bot.calculate_stochastic(high, low, close) == pytest.approx((k[-1], d[-1]), abs=TOLERANCE)
+    ao = pandas_awesome_oscillator(high, low)
+    assert bot.calculate_awesome_oscillator(high, low) == pytest.approx((ao[-1], ao[-2]), abs=TOLERANCE)
+    assert bot.calculate_atr(high, low, close) == pytest.approx(pandas_atr(high, low, close)[-1], abs=TOLERANCE)
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        kernels.set_backend("fortran")
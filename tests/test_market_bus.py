@@ -0,0 +1,101 @@
+"""The shared-memory market data bus and its worker-side reader."""
+import uuid
+
+import numpy as np
+import pytest
+
+from market_bus import BusReader, MarketDataBus
+
+
+@pytest.fixture
+def bus():
+    bus = MarketDataBus.create(["EURUSD=X", "GBPUSD=X"], capacity=4, name=f"test_bus_{uuid.uuid4().hex[:8]}")
+    yield bus
+    bus.close()
+    bus.unlink()
+
+
+@pytest.fixture
+def worker(bus):
+    attached = MarketDataBus.attach(bus.name)
+    yield attached
+    attached.close()
+
+
+def publish(bus, symbol, prices, start=0):
+    for i, price in enumerate(prices, start):
+        bus.publish(symbol, price, price + 0.5, price - 0.5, price, 10.0 * i, 60.0 * i)
+
+
+def test_read_copies_the_latest_bars(bus, worker):
+    publish(bus, "EURUSD=X", [1.0, 2.0, 3.0])
+    count, bars = worker.read("EURUSD=X")
+    assert count == 3 and bars.shape == (6, 3)
+    assert bars[3].tolist() == [1.0, 2.0, 3.0] and bars[5].tolist() == [0.0, 60.0, 120.0]
+    assert worker.read("EURUSD=X", since=2)[1][3].tolist() == [3.0]
+    # Only the ring's capacity survives a wrap
+    publish(bus, "EURUSD=X", [4.0, 5.0, 6.0], start=3)
+    count, bars = worker.read("EURUSD=X", since=1)
+    assert count == 6 and bars[3].tolist() == [3.0, 4.0, 5.0, 6.0]
+
+
+def test_attached_views_are_read_only(bus, worker):
+    publish(bus, "EURUSD=X", [1.0])
+    _, _, view = worker.view("EURUSD=X")
+    with pytest.raises(ValueError):
+        view[3, 0] = 9.0
+    with pytest.raises(ValueError):
+        worker.publish("EURUSD=X", 1.0, 1.0, 1.0, 1.0)
+    # The owner's views are read-only too
+    with pytest.raises(ValueError):
+        bus.view("EURUSD=X")[2][3, 0] = 9.0
+    assert worker.read("EURUSD=X")[1][3].tolist() == [1.0]
+
+
+def test_read_times_out_on_a_write_left_in_progress(bus, worker):
+    publish(bus, "EURUSD=X", [1.0])
+    # The feeder died between making the sequence odd and making it even again
+    bus._control[0, 0] += 1
+    with pytest.raises(TimeoutError):
+        worker.read("EURUSD=X", timeout=0.05)
+    assert worker.read("GBPUSD=X", timeout=0.05)[0] == 0
+
+
+def test_fetch_latest_hands_out_each_bar_once_and_skips_overwritten_ones(bus, worker):
+    publish(bus, "EURUSD=X", [1.0])
+    reader = BusReader(worker)
+    assert reader.seen == {"EURUSD=X": 1, "GBPUSD=X": 0}
+    assert reader.fetch_latest(["EURUSD=X", "GBPUSD=X"]) == {}
+    publish(bus, "EURUSD=X", [2.0, 3.0], start=1)
+    assert reader.fetch_latest(["EURUSD=X"])["EURUSD=X"]["price"] == 2.0
+    assert reader.seen["EURUSD=X"] == 2
+    # Six more bars wrap the 4-bar ring past the unseen bar 3.0
+    publish(bus, "EURUSD=X", [4.0, 5.0, 6.0, 7.0, 8.0, 9.0], start=3)
+    first = reader.fetch_latest(["EURUSD=X"])["EURUSD=X"]
+    assert first == {'price': 6.0, 'high': 6.5, 'low': 5.5, 'open': 6.0, 'volume': 50.0, 'timestamp': 300.0}
+    assert reader.seen["EURUSD=X"] == 6
+    assert [reader.fetch_latest(["EURUSD=X"])["EURUSD=X"]["price"] for _ in range(3)] == [7.0, 8.0, 9.0]
+    assert reader.fetch_latest(["EURUSD=X", "UNKNOWN"]) == {}
+
+
+def test_poll_and_fetch_history(bus, worker):
+    reader = BusReader(worker)
+    publish(bus, "GBPUSD=X", [1.0, 2.0])
+    polled = reader.poll()
+    assert list(polled) == ["GBPUSD=X"] and [bar["price"] for bar in polled["GBPUSD=X"]] == [1.0, 2.0]
+    assert reader.poll() == {}
+    publish(bus, "GBPUSD=X", [3.0, 4.0, 5.0], start=2)
+    bus.publish("EURUSD=X", 1.0, 1.0, 1.0, 1.0)
+    history = reader.fetch_history(["GBPUSD=X", "EURUSD=X", "UNKNOWN"])
+    assert history["GBPUSD=X"]["prices"] == [2.0, 3.0, 4.0, 5.0]
+    assert history["EURUSD=X"]["timestamps"] == [None]
+    assert reader.seen == {"EURUSD=X": 1, "GBPUSD=X": 5}
+    assert reader.poll() == {}
+
+
+def test_publish_history_keeps_the_last_capacity_bars(bus, worker):
+    closes = [float(i) for i in range(10)]
+    bus.publish_history("EURUSD=X", {'prices': closes, 'timestamps': [60.0 * i for i in range(10)]})
+    count, bars = worker.read("EURUSD=X")
+    assert count == 4 and bars[3].tolist() == closes[-4:]
+    np.testing.assert_array_equal(bars[4], 0.0)
@@ -0,0 +1,107 @@
+"""OandaClient's retries and order deduplication against the local OANDA stand-in."""
+import pytest
+import requests
+
+from oanda_client import OandaAPIError, OandaClient
+from oanda_stub import StubOandaServer
+
+ORDERS = "/v3/accounts/TEST/orders"
+
+
+@pytest.fixture
+def server():
+    with StubOandaServer(seed=1) as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    with OandaClient("token", "TEST", base_url=server.base_url, backoff=0.001, timeout=0.3) as client:
+        yield client
+
+
+def posts(server):
+    return [path for method, path in server.requests if method == "POST"]
+
+
+def lookups(server):
+    return [path for method, path in server.requests if method == "GET" and path.startswith(ORDERS + "/@")]
+
+
+def test_filled_order_is_returned_once(server, client):
+    response = client.place_order("EUR_USD", 100)
+    assert response["orderFillTransaction"]["units"] == "100"
+    assert len(server.market.orders) == 1 and len(posts(server)) == 1 and not lookups(server)
+
+
+@pytest.mark.parametrize("fault", [dict(delay=0.6), dict(status=503)], ids=["timeout", "5xx"])
+def test_unknown_outcome_is_looked_up_not_resent(server, client, fault):
+    server.fail_next("POST", processed=True, **fault)
+    response = client.place_order("EUR_USD", 100, client_id="abc")
+    assert response["order"]["clientExtensions"]["id"] == "abc"
+    assert response["order"]["units"] == "100"
+    assert len(server.market.orders) == 1
+    assert len(posts(server)) == 1 and lookups(server) == [ORDERS + "/@abc"]
+
+
+def test_order_never_received_is_resent_after_the_lookup(server, client):
+    server.fail_next("POST", status=503)
+    response = client.place_order("EUR_USD", -50, client_id="xyz")
+    assert response["orderFillTransaction"]["units"] == "-50"
+    assert len(server.market.orders) == 1
+    assert len(posts(server)) == 2 and lookups(server) == [ORDERS + "/@xyz"]
+
+
+def test_rejected_order_raises_without_retrying(server, client):
+    server.fail_next("POST", status=400)
+    with pytest.raises(OandaAPIError) as error:
+        client.place_order("EUR_USD", 100)
+    assert error.value.status_code == 400
+    assert not server.market.orders and len(posts(server)) == 1 and not lookups(server)
+
+
+def test_rate_limited_order_backs_off_and_retries(server, client, monkeypatch):
+    delays = []
+    sleep = client._sleep
+    monkeypatch.setattr(client, "_sleep", lambda attempt, retry_after=None: (delays.append(retry_after),
+                                                                            sleep(attempt, retry_after)))
+    server.fail_next("POST", status=429)
+    response = client.place_order("EUR_USD", 100)
+    assert "orderFillTransaction" in response
+    assert len(server.market.orders) == 1 and len(posts(server)) == 2 and not lookups(server)
+    assert delays == ["0"]
+
+
+def test_order_gives_up_after_max_retries(server):
+    with OandaClient("token", "TEST", base_url=server.base_url, backoff=0.001, max_retries=1) as client:
+        for _ in range(4):
+            server.fail_next("POST", status=429)
+        with pytest.raises(OandaAPIError):
+            client.place_order("EUR_USD", 100)
+    assert not server.market.orders
+
+
+def test_prices_are_fetched_in_one_batch(server, client):
+    prices = client.get_prices(["EUR_USD", "GBP_USD", "USD_JPY"])
+    assert set(prices) == {"EUR_USD", "GBP_USD", "USD_JPY"}
+    assert all(bid < ask for bid, ask in prices.values())
+    assert [path for method, path in server.requests if method == "GET"] == ["/v3/accounts/TEST/pricing"]
+
+
+def test_failed_price_request_is_retried(server, client):
+    server.fail_next("GET", status=502)
+    assert set(client.get_prices("EUR_USD")) == {"EUR_USD"}
+    assert len(server.requests) == 2
+
+
+def test_price_timeout_is_retried(server, client):
+    server.fail_next("GET", delay=0.6)
+    assert client.get_price("EUR_USD")[0] > 0
+    assert len(server.requests) == 2
+
+
+def test_unreachable_server_raises(server):
+    server.stop()
+    with OandaClient("token", "TEST", base_url=server.base_url, backoff=0.001, max_retries=1) as client:
+        with pytest.raises(requests.ConnectionError):
+            client.get_prices("EUR_USD")
@@ -0,0 +1,34 @@
+"""Trade statistics of PerformanceTracker in every mode that feeds it."""
+import pytest
+
+from backtest_engine import run_backtest
+from benchmarks.synthetic import synthetic_ohlcv
+from bot import MomentumBot
+from performance import PerformanceTracker
+
+
+@pytest.mark.parametrize("side, exit_price, pnl", [
+    ("BUY", 110.0, 20.0), ("BUY", 95.0, -10.0), ("SELL", 90.0, 20.0), ("SELL", 105.0, -10.0),
+])
+def test_default_pnl_is_signed_by_side(side, exit_price, pnl):
+    tracker = PerformanceTracker()
+    tracker.open_trade(0, side, 100.0, 2.0, None, None)
+    assert tracker.close_trade(1, exit_price, "CLOSE")["pnl"] == pnl
+    assert (tracker.wins, tracker.losses) == ((1, 0) if pnl > 0 else (0, 1))
+
+
+def test_live_and_backtest_trades_agree():
+    df = synthetic_ohlcv(1500, seed=3, volatility=0.002)
+    trades, _ = run_backtest(MomentumBot(), df)
+    closed = trades.dropna(subset=["pnl"])
+    assert "SELL" in set(closed["side"])
+    recorded, replayed = PerformanceTracker(), PerformanceTracker()
+    for trade in closed.to_dict("records"):
+        recorded.record_trade(trade)
+        # The live runner's open_trade/close_trade, without a pnl
+        replayed.open_trade(trade["entry_time"], trade["side"], trade["entry_price"], trade["size"],
+                            trade["stop_loss"], trade["take_profit"])
+        assert replayed.close_trade(trade["exit_time"], trade["exit_price"], trade["exit_reason"])["pnl"] == \
+            pytest.approx(trade["pnl"], rel=1e-12)
+    for key in ("win_rate", "profit_factor", "trades"):
+        assert replayed.metrics()[key] == pytest.approx(recorded.metrics()[key])
@@ -0,0 +1,91 @@
+"""Portfolio's position table and its O(1) per-symbol aggregates."""
+import numpy as np
+import pytest
+
+from portfolio import Portfolio, PositionTable
+
+
+def test_slots_are_reused_lowest_first_and_survive_growth():
+    table = PositionTable(capacity=2)
+    first = [table.add(0, 1, 1.0, 10.0, 9.0, 12.0) for _ in range(2)]
+    assert first == [0, 1]
+    grown = table.add(1, -1, 2.0, 20.0, 21.0, 18.0)
+    assert table.capacity == 4 and grown == 2
+    # Rows written before the growth kept their values
+    assert table.entry[:3].tolist() == [10.0, 10.0, 20.0] and table.side[2] == -1
+    table.remove([0, 1])
+    assert table.count == 1 and table.slots().tolist() == [2]
+    assert [table.add(0, 1, 1.0, 11.0, 10.0, 13.0) for _ in range(3)] == [0, 1, 3]
+    assert table.slots(symbol=0).tolist() == [0, 1, 3]
+
+
+def expected_aggregates(portfolio):
+    table = portfolio.positions
+    n = portfolio._n
+    net, basis, notional, count = (np.zeros(n) for _ in range(4))
+    for slot in table.slots().tolist():
+        sid, side, size, entry = table.symbol[slot], table.side[slot], table.size[slot], table.entry[slot]
+        net[sid] += side * size
+        basis[sid] += side * size * entry
+        notional[sid] += size * entry
+        count[sid] += 1
+    return net, basis, notional, count
+
+
+def test_aggregates_follow_open_close_and_reprice():
+    rng = np.random.default_rng(11)
+    portfolio = Portfolio(initial_balance=1e6, capacity=2, max_positions_per_symbol=100)
+    symbols = ["AAA", "BBB", "CCC"]
+    realized = 0.0
+    for step in range(400):
+        table = portfolio.positions
+        open_slots = table.slots().tolist()
+        action = rng.integers(3) if open_slots else 0
+        if action == 0:
+            side = 1 if rng.random() < 0.5 else -1
+            price = float(rng.uniform(50, 150))
+            assert portfolio.open(symbols[rng.integers(3)], side, float(rng.uniform(1, 10)), price,
+                                  price - side * 5, price + side * 10) is not None
+        elif action == 1:
+            slot = int(rng.choice(open_slots))
+            price = float(rng.uniform(50, 150))
+            side, size, entry = table.side[slot], table.size[slot], table.entry[slot]
+            pnl = portfolio.close([slot], price)[0][-1]
+            assert pnl == pytest.approx(side * size * (price - entry))
+            realized += pnl
+            # Slippage booked on the exit afterwards
+            fill = price + float(rng.normal(0, 0.1))
+            portfolio.reprice_exit("BUY" if side > 0 else "SELL", size, price, fill)
+            realized += side * size * (fill - price)
+        else:
+            slot = int(rng.choice(open_slots))
+            assert portfolio.reprice_entry(slot, float(table.entry[slot] + rng.normal(0, 0.5)))
+        net, basis, notional, count = expected_aggregates(portfolio)
+        n = portfolio._n
+        np.testing.assert_allclose(portfolio.net_units[:n], net, atol=1e-9)
+        np.testing.assert_allclose(portfolio.basis[:n], basis, atol=1e-6)
+        np.testing.assert_allclose(portfolio.notional[:n], notional, atol=1e-6)
+        np.testing.assert_array_equal(portfolio.open_count[:n], count)
+        assert portfolio.gross_notional == pytest.approx(notional.sum(), abs=1e-6)
+        assert portfolio.margin_used == pytest.approx(notional.sum() * portfolio.margin_rate, abs=1e-6)
+        assert portfolio.realized_pnl == pytest.approx(realized, abs=1e-6)
+    assert portfolio.positions.capacity > 2
+
+
+def test_reprice_entry_of_a_closed_position_is_refused():
+    portfolio = Portfolio()
+    position = portfolio.open("AAA", 1, 1.0, 100.0, 95.0, 110.0)
+    portfolio.close([position], 101.0)
+    assert not portfolio.reprice_entry(position, 100.5)
+
+
+@pytest.mark.parametrize("side, exit_price, reason, pnl", [
+    (1, 94.0, "STOP-LOSS", -12.0), (1, 111.0, "TAKE-PROFIT", 22.0),
+    (-1, 106.0, "STOP-LOSS", -12.0), (-1, 89.0, "TAKE-PROFIT", 22.0),
+])
+def test_check_exits_reason_and_pnl_by_side(side, exit_price, reason, pnl):
+    portfolio = Portfolio()
+    portfolio.open("AAA", side, 2.0, 100.0, 100.0 - side * 5, 100.0 + side * 10)
+    portfolio.mark("AAA", exit_price)
+    [(_, _, _, _, _, _, got_reason, got_pnl)] = portfolio.check_exits("AAA")
+    assert (got_reason, got_pnl) == (reason, pytest.approx(pnl))
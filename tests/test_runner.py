@@ -0,0 +1,280 @@
+"""MultiSymbolRunner: decisions, broker orders and bookkeeping."""
+import asyncio
+
+import pytest
+
+from bot import MomentumBot
+from replay import MockOandaBroker
+from runner import MultiSymbolRunner
+
+
+class ScriptedBot(MomentumBot):
+    """Votes whatever ``script`` says for each bar's price instead of computing indicators."""
+
+    def __init__(self, script, **kwargs):
+        super().__init__(**kwargs)
+        self.script = script
+
+    def momentum_strategy_incremental(self, price, high=None, low=None, bar=None):
+        result = self._empty_result()
+        side, size, stop_loss, take_profit = self.script.get(price, (None, 0, 0, 0))
+        result.update(ema_13=price, stoch_k=50.0, buy_signal=side == "BUY", sell_signal=side == "SELL",
+                      position_size=size, stop_loss=stop_loss, take_profit=take_profit)
+        return result
+
+
+def bar(price, timestamp):
+    return {'price': price, 'high': price, 'low': price, 'timestamp': timestamp}
+
+
+def scripted_runner(script, **kwargs):
+    return MultiSymbolRunner(["EUR_USD"], fetch_latest=dict, fetch_history=dict,
+                             bot_factory=lambda symbol: ScriptedBot(script, initial_balance=1000), **kwargs)
+
+
+@pytest.mark.parametrize("side, stop_loss, take_profit, exit_price", [
+    ("SELL", 1.2, 0.9, 0.89), ("SELL", 1.2, 0.9, 1.21), ("BUY", 0.9, 1.2, 1.21), ("BUY", 0.9, 1.2, 0.89),
+])
+def test_bot_balance_follows_the_broker_cash(side, stop_loss, take_profit, exit_price):
+    broker = MockOandaBroker(spread=0.002, slippage=0.0005, seed=1)
+    runner = scripted_runner({1.0: (side, 100, stop_loss, take_profit)}, broker=broker)
+    state = runner.states["EUR_USD"]
+    for i, price in enumerate((1.0, exit_price)):
+        broker.update_quote("EUR_USD", price, 60.0 * i)
+        runner.evaluate(state, bar(price, 60.0 * i))
+    direction = 1 if side == "BUY" else -1
+    assert [fill['units'] for fill in broker.fills] == [direction * 100, -direction * 100]
+    assert state.open_units == 0 and not state.bot.in_position
+    broker_cash = -sum(fill['units'] * fill['price'] for fill in broker.fills)
+    assert state.bot.account_balance - 1000 == pytest.approx(broker_cash, rel=1e-9)
+    # Without costs that is the side-signed move
+    won = direction * (exit_price - 1.0) > 0
+    assert (broker_cash > 0) == won
+
+
+def primed(runner, n=30, price=1.0):
+    """Warm each bot's ATR with ``n`` bars of a 0.01 range around ``price``."""
+    for state in runner.states.values():
+        state.bot.prime_indicators([price] * n, [price + 0.005] * n, [price - 0.005] * n)
+    return runner
+
+
+@pytest.mark.parametrize("side", ["BUY", "SELL"])
+def test_portfolio_levels_follow_the_signal_side(side):
+    from portfolio import Portfolio
+    # The bot's own levels point the other way, as calculate_stop_loss_take_profit gives for an UPTREND short
+    levels = (0.99, 1.02) if side == "SELL" else (1.01, 0.98)
+    runner = primed(scripted_runner({1.0: (side, 100, *levels)}, portfolio=Portfolio()))
+    state = runner.states["EUR_USD"]
+    runner.evaluate(state, bar(1.0, 0.0))
+    table = runner.portfolio.positions
+    [slot] = table.slots().tolist()
+    direction = 1 if side == "BUY" else -1
+    atr = state.bot.indicators.atr.value
+    assert table.side[slot] == direction
+    assert table.stop[slot] == pytest.approx(1.0 - direction * atr)
+    assert table.target[slot] == pytest.approx(1.0 + direction * atr * state.bot.risk_reward_ratio)
+    # A move in the position's favour reaches the target, with a gain
+    runner.evaluate(state, bar(1.0 + direction * 3 * atr, 60.0))
+    assert not table.slots().tolist()
+    assert state.last_result is not None and runner.portfolio.realized_pnl > 0
+
+
+def test_portfolio_opens_nothing_without_an_atr():
+    from portfolio import Portfolio
+    runner = scripted_runner({1.0: ("SELL", 100, 0, 0)}, portfolio=Portfolio())
+    state = runner.states["EUR_USD"]
+    runner.evaluate(state, bar(1.0, 0.0))
+    assert runner.portfolio.positions.count == 0
+
+
+def quoted_runner(script, **kwargs):
+    """A runner with an exit monitor; ``quote_source`` defaults to one that never quotes."""
+    kwargs.setdefault("quote_source", lambda symbols: {})
+    return scripted_runner(script, **kwargs)
+
+
+@pytest.mark.parametrize("side, quotes, exit_price", [
+    ("BUY", [(1.019, 1.021), (1.0205, 1.0215)], 1.0205),
+    ("SELL", [(0.9795, 0.9805), (0.9785, 0.9795)], 0.9795),
+])
+def test_on_quote_closes_the_bot_at_its_side_of_the_quote(side, quotes, exit_price):
+    levels = (0.99, 1.02) if side == "BUY" else (1.01, 0.98)
+    exits = []
+    runner = quoted_runner({1.0: (side, 100, *levels)}, on_exit=lambda *args: exits.append(args))
+    state = runner.states["EUR_USD"]
+    runner.evaluate(state, bar(1.0, 0.0))
+    assert "EUR_USD" in runner.exit_monitor
+    # The first quote reaches the target on the other side of the spread only
+    assert runner.on_quote("EUR_USD", *quotes[0]) == []
+    assert state.bot.in_position
+    [message] = runner.on_quote("EUR_USD", *quotes[1])
+    assert message == "🎯 TAKE-PROFIT | P&L: $2.05"
+    assert exits == [("EUR_USD", exit_price, message)]
+    assert not state.bot.in_position and len(runner.exit_monitor) == 0
+    assert state.bot.account_balance == pytest.approx(1002.05)
+    assert runner.on_quote("EUR_USD", *quotes[1]) == []
+
+
+def test_a_bar_exit_stops_watching_the_bot():
+    runner = quoted_runner({1.0: ("BUY", 100, 0.99, 1.02)})
+    state = runner.states["EUR_USD"]
+    runner.evaluate(state, bar(1.0, 0.0))
+    runner.evaluate(state, bar(0.985, 60.0))
+    assert not state.bot.in_position and len(runner.exit_monitor) == 0
+    assert runner.on_quote("EUR_USD", 0.98, 0.981) == []
+
+
+def test_on_quote_closes_exactly_the_portfolio_positions_crossed():
+    from portfolio import Portfolio
+    prices = (1.0, 1.001, 1.002)
+    runner = primed(quoted_runner({price: ("BUY", 0, 0, 0) for price in prices}, portfolio=Portfolio()))
+    state = runner.states["EUR_USD"]
+    for i, price in enumerate(prices):
+        runner.evaluate(state, bar(price, 60.0 * i))
+    table = runner.portfolio.positions
+    slots = table.slots().tolist()
+    stops = [float(table.stop[slot]) for slot in slots]
+    assert len(slots) == 3 and stops == sorted(stops)
+    bid = (stops[0] + stops[1]) / 2
+    messages = runner.on_quote("EUR_USD", bid, bid + 0.0001)
+    assert len(messages) == 2 and all(message.startswith("🛑 STOP-LOSS") for message in messages)
+    assert table.slots().tolist() == slots[:1] and sorted(runner.exit_monitor.orders) == slots[:1]
+    assert runner.portfolio.realized_pnl < 0
+    assert state.bot.account_balance == runner.portfolio.equity
+
+
+def test_exit_loop_polls_open_symbols_and_survives_a_failed_poll():
+    polls = []
+
+    def quote_source(symbols):
+        polls.append(list(symbols))
+        if len(polls) == 1:
+            raise ConnectionError("pricing endpoint down")
+        return {"EUR_USD": (0.985, 0.986)}
+
+    async def main():
+        closed = asyncio.Event()
+        runner = quoted_runner({1.0: ("BUY", 100, 0.99, 1.02)}, quote_source=quote_source, quote_interval=0.01,
+                               on_exit=lambda *args: closed.set())
+        runner.evaluate(runner.states["EUR_USD"], bar(1.0, 0.0))
+        task = asyncio.create_task(runner.exit_loop())
+        try:
+            await asyncio.wait_for(closed.wait(), 2)
+        finally:
+            task.cancel()
+        return runner
+
+    runner = asyncio.run(main())
+    assert polls[:2] == [["EUR_USD"], ["EUR_USD"]]
+    assert not runner.states["EUR_USD"].bot.in_position
+
+
+class Feed:
+    """``fetch_latest`` serving one bar per symbol per poll, at ``prices[poll]``."""
+
+    def __init__(self, prices):
+        self.prices = prices
+        self.polls = 0
+
+    def __call__(self, symbols):
+        price = self.prices[min(self.polls, len(self.prices) - 1)]
+        self.polls += 1
+        return {symbol: bar(price, 60.0 * self.polls) for symbol in symbols}
+
+
+def feed_runner(symbols, feed, bot_factory=None, **kwargs):
+    bot_factory = bot_factory or (lambda symbol: ScriptedBot({}, initial_balance=1000))
+    return MultiSymbolRunner(symbols, interval=0, fetch_latest=feed, fetch_history=lambda symbols: {},
+                             bot_factory=bot_factory, **kwargs)
+
+
+def test_a_full_queue_holds_up_the_fetcher():
+    symbols = [f"SYM{i}" for i in range(5)]
+    runner = feed_runner(symbols, Feed([1.0]), queue_size=2)
+
+    async def main():
+        runner._queue = asyncio.Queue(maxsize=runner.queue_size)
+        fetcher = asyncio.create_task(runner.fetch_loop(iterations=1))
+        for _ in range(100):
+            if runner._queue.full():
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        # No decider yet: two bars wait in the queue and the fetcher waits on the third
+        assert runner._queue.qsize() == 2 and not fetcher.done()
+        decider = asyncio.create_task(runner.decision_loop())
+        await fetcher
+        await runner._queue.put(None)
+        await decider
+
+    asyncio.run(main())
+    assert [runner.states[symbol].ticks for symbol in symbols] == [1] * 5
+
+
+class FailingBot(ScriptedBot):
+    def momentum_strategy_incremental(self, price, high=None, low=None, bar=None):
+        if price == 2.0:
+            raise ArithmeticError("bad bar")
+        return super().momentum_strategy_incremental(price, high, low, bar)
+
+
+def test_a_failed_bar_does_not_stop_the_decisions(caplog):
+    runner = feed_runner(["AAA", "BBB"], Feed([1.0, 2.0, 3.0]),
+                         bot_factory=lambda symbol: (FailingBot if symbol == "AAA" else ScriptedBot)(
+                             {}, initial_balance=1000))
+    asyncio.run(runner.run(iterations=3))
+    aaa, bbb = runner.states["AAA"], runner.states["BBB"]
+    # AAA's second bar raised and was skipped; its third and every BBB bar were decided
+    assert (aaa.ticks, bbb.ticks) == (2, 3)
+    assert aaa.prev_price == bbb.prev_price == 3.0
+    assert "decision failed for AAA" in caplog.text
+
+
+class ClosingTracker:
+    """A performance tracker that only records when it is closed."""
+
+    def __init__(self, events):
+        self.events = events
+
+    def update(self, *args, **kwargs):
+        pass
+
+    def close(self):
+        self.events.append("close")
+
+
+def test_shutdown_decides_every_fetched_bar_then_saves_then_closes(tmp_path):
+    from state_store import StateStore
+    events = []
+    symbols = [f"SYM{i}" for i in range(4)]
+    runner = feed_runner(symbols, Feed([1.0, 1.1, 1.2]), state_store=StateStore(str(tmp_path), fsync=False),
+                         performance_factory=lambda symbol: ClosingTracker(events), queue_size=1)
+    save_state = runner.save_state
+
+    def saving():
+        events.append(("save", sum(state.ticks for state in runner.states.values())))
+        save_state()
+
+    runner.save_state = saving
+    asyncio.run(runner.run(iterations=3))
+    assert events == [("save", 12)] + ["close"] * 4
+    snapshot = runner.state_store.load()
+    assert sorted(snapshot['symbols']) == symbols
+    assert snapshot['symbols']['SYM0']['prev_price'] == 1.2
+    runner.state_store.close()
+
+
+def test_a_dead_decider_stops_the_run(tmp_path):
+    from state_store import StateStore
+    runner = feed_runner(["AAA"], Feed([1.0]), state_store=StateStore(str(tmp_path), fsync=False),
+                         snapshot_interval=0)
+
+    def broken_snapshot():
+        raise OSError("disk gone")
+
+    runner._start_snapshot = broken_snapshot
+    # Without iterations only the decider's death can end the run
+    with pytest.raises(OSError, match="disk gone"):
+        asyncio.run(asyncio.wait_for(runner.run(), 5))
+    runner.state_store.close()
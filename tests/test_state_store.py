@@ -0,0 +1,133 @@
+"""Snapshots, the trade journal and a runner's warm restart from them."""
+import json
+import os
+
+import pytest
+
+from benchmarks.synthetic import synthetic_universe
+from portfolio import Portfolio
+from replay import MockOandaBroker
+from runner import MultiSymbolRunner
+from state_store import HEADER, MAGIC, StateStore, TradeJournal
+
+
+def test_journal_drops_a_torn_last_line(tmp_path):
+    path = str(tmp_path / "trades.wal")
+    journal = TradeJournal(path, fsync=False)
+    journal.append("open", "AAA", price=1.0)
+    journal.append("close", "AAA", price=1.1)
+    journal.close()
+    with open(path, "a") as f:
+        f.write('{"seq":3,"kind":"op')
+    journal = TradeJournal(path, fsync=False)
+    assert [r['seq'] for r in journal.records()] == [1, 2] and journal.seq == 2
+    # The torn record is gone from disk, so the next one starts on its own line
+    assert journal.append("open", "BBB", price=2.0) == 3
+    journal.close()
+    with open(path) as f:
+        assert [json.loads(line)['seq'] for line in f] == [1, 2, 3]
+
+
+def test_compact_keeps_the_numbering(tmp_path):
+    journal = TradeJournal(str(tmp_path / "trades.wal"), fsync=False)
+    for i in range(5):
+        journal.append("open", "AAA", price=float(i))
+    journal.compact(3)
+    assert [r['seq'] for r in journal.records()] == [4, 5]
+    assert journal.append("close", "AAA", price=9.0) == 6
+    assert [r['seq'] for r in journal.records(after=4)] == [5, 6]
+    journal.close()
+
+
+def test_numbering_continues_after_a_snapshot_emptied_the_journal(tmp_path):
+    store = StateStore(str(tmp_path), fsync=False)
+    for _ in range(3):
+        store.journal.append("open", "AAA", price=1.0)
+    store.save({'symbols': {}, 'portfolio': None})
+    assert store.journal.records() == []
+    store.close()
+    store = StateStore(str(tmp_path), fsync=False)
+    assert store.load()['journal_seq'] == 3
+    assert store.journal.append("close", "AAA", price=1.0) == 4
+    store.close()
+
+
+@pytest.mark.parametrize("damage", ["crc", "magic", "truncated"])
+def test_load_rejects_a_damaged_snapshot(tmp_path, damage):
+    store = StateStore(str(tmp_path), fsync=False)
+    store.save({'symbols': {'AAA': 1}, 'portfolio': None})
+    assert store.load()['symbols'] == {'AAA': 1}
+    with open(store.snapshot_path, "rb") as f:
+        data = bytearray(f.read())
+    if damage == "crc":
+        data[-1] ^= 0xFF
+    elif damage == "magic":
+        data[:len(MAGIC)] = b"XXXXXXXX"
+    else:
+        data = data[:HEADER.size - 1]
+    with open(store.snapshot_path, "wb") as f:
+        f.write(data)
+    assert store.load() is None
+    with pytest.raises(ValueError):
+        StateStore.loads(bytes(data))
+    store.close()
+
+
+class FlakyBroker(MockOandaBroker):
+    """Cost-free fills, except that every third order fails."""
+
+    def __init__(self):
+        super().__init__(spread=0.0, slippage=0.0)
+        self.calls = 0
+
+    def place_order(self, instrument="EUR_USD", units=100):
+        self.calls += 1
+        if self.calls % 3 == 0:
+            raise ConnectionError("order lost")
+        return super().place_order(instrument, units)
+
+
+def make_runner(directory, frames, broker, portfolio):
+    return MultiSymbolRunner(list(frames), fetch_latest=dict, fetch_history=dict, broker=broker,
+                             portfolio=Portfolio(initial_balance=30000) if portfolio else None,
+                             state_store=StateStore(directory, fsync=False))
+
+
+def trading_state(runner):
+    """What a restart must get back: positions, cash and the units the broker holds."""
+    symbols = {symbol: (round(state.bot.account_balance, 6), state.bot.in_position, state.bot.position_side,
+                        state.bot.position_size, state.bot.entry_price, state.bot.stop_loss, state.open_units)
+               for symbol, state in runner.states.items()}
+    portfolio = runner.portfolio
+    if portfolio is None:
+        return symbols, None
+    table = portfolio.positions
+    positions = sorted((int(slot), int(table.side[slot]), float(table.size[slot]), float(table.entry[slot]),
+                        float(table.stop[slot])) for slot in table.slots().tolist())
+    # Bot balances mirror the equity only as of each symbol's last bar
+    symbols = {symbol: values[1:] for symbol, values in symbols.items()}
+    return symbols, (positions, round(portfolio.realized_pnl, 6), portfolio.net_units[:portfolio._n].tolist())
+
+
+@pytest.mark.parametrize("portfolio", [False, True], ids=["bots", "portfolio"])
+def test_restore_replays_the_journal_after_the_snapshot(tmp_path, portfolio):
+    frames = synthetic_universe(3, 1200, seed=4)
+    broker = FlakyBroker()
+    runner = make_runner(str(tmp_path), frames, broker, portfolio)
+    for i in range(1200):
+        for symbol, df in frames.items():
+            price = float(df["Close"].iloc[i])
+            broker.update_quote(symbol, price, 60.0 * i)
+            runner.evaluate(runner.states[symbol], {'price': price, 'high': float(df["High"].iloc[i]),
+                                                    'low': float(df["Low"].iloc[i]), 'timestamp': 60.0 * i})
+        if i == 600:
+            runner.save_state()
+    kinds = [record['kind'] for record in runner.state_store.journal.records()]
+    assert {"open", "close", "unfilled"} <= set(kinds)
+    expected = trading_state(runner)
+    runner.state_store.close()  # a crash: no final snapshot
+
+    restarted = make_runner(str(tmp_path), frames, FlakyBroker(), portfolio)
+    assert restarted.restore_state() == set(frames)
+    assert trading_state(restarted) == expected
+    restarted.state_store.close()
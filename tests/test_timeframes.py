@@ -0,0 +1,24 @@
+"""History the multi-timeframe vote needs before every timeframe can vote."""
+import numpy as np
+
+from bot import MomentumBot
+from timeframes import history_period, vote_history
+
+
+def test_min_history_follows_the_bot_windows():
+    assert MomentumBot(timeframes=("1m", "1h")).timeframes.min_history == 50
+    bot = MomentumBot(ema_windows=(5, 8, 21), k_period=14, d_period=3, ao_slow=34, timeframes=("1m", "1h"))
+    assert bot.timeframes.min_history == vote_history(bot) == 35
+
+
+def test_warmup_history_lets_every_timeframe_vote():
+    consensus = MomentumBot(timeframes=("1m", "5m", "15m", "1h")).timeframes
+    assert consensus.warmup_seconds == 50 * 3600
+    assert consensus.history_period() == history_period(["1m", "1h", "5m"]) == "5d"
+    assert history_period(["1m"]) == "3d" and history_period(["1m", "4h"]) == "7d"
+    # One more 1m bar than the warm-up, so the last 1h bar has closed
+    n = consensus.warmup_seconds // 60 + 1
+    rng = np.random.default_rng(3)
+    close = (100 + np.cumsum(rng.normal(0, 0.05, n))).tolist()
+    consensus.prime([60.0 * i for i in range(n)], close)
+    assert all(engine.count >= consensus.min_history for engine in consensus.engines.values())
@@ -0,0 +1,222 @@
+import math
+import re
+from datetime import datetime
+
+from indicators import MIN_HISTORY
+from ring_buffer import Bar, OHLCVRingBuffer
+
+
+DEFAULT_TIMEFRAMES = ("1m", "5m", "15m", "1h")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def timeframe_seconds(timeframe):
+    """Length of a timeframe such as ``"5m"``, ``"1h"`` or ``"1d"`` (or a number of seconds)."""
+    if isinstance(timeframe, (int, float)):
+        return int(timeframe)
+    match = re.fullmatch(r"(\d+)\s*([smhd])", timeframe.strip().lower())
+    if match is None:
+        raise ValueError(f"Unknown timeframe {timeframe!r}; use e.g. '1m', '5m', '15m', '1h'")
+    return int(match.group(1)) * _UNITS[match.group(2)]
+
+
+def _epoch(timestamp):
+    """Seconds since the epoch for a number, ``datetime`` or ``pandas.Timestamp``."""
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    # numpy.datetime64 and similar
+    return float(timestamp.astype("datetime64[ns]").astype("int64")) / 1e9
+
+
+class BarAggregator:
+    """Resamples one stream of ticks (or 1m bars) into several timeframes at once.
+
+    Every input updates the open bar of each timeframe in O(1); when an input
+    falls into a later bucket, the timeframe's previous bar is closed,
+    appended to that timeframe's ``OHLCVRingBuffer`` and reported as a
+    ``(timeframe, Bar)`` event (shortest timeframe first), both as the return
+    value of ``update`` and through ``on_close``. Buckets are aligned to the
+    epoch, so a 1h bar covers HH:00-HH:59 UTC.
+
+    Polling the same source bar repeatedly (same timestamp) revises it rather
+    than double counting its volume.
+    """
+
+    def __init__(self, timeframes=DEFAULT_TIMEFRAMES, depth=200, on_close=None):
+        self.timeframes = sorted(timeframes, key=timeframe_seconds)
+        self.seconds = {tf: timeframe_seconds(tf) for tf in self.timeframes}
+        self.history = {tf: OHLCVRingBuffer(depth) for tf in self.timeframes}
+        self.on_close = on_close
+        # Per timeframe: [bucket start, open, high, low, close, volume] of the bar being built
+        self._open = {tf: None for tf in self.timeframes}
+        self._last_ts = None
+        self._last_volume = 0.0
+
+    def update(self, timestamp, price, high=None, low=None, volume=0.0, open=None):
+        """Ingest one tick or source bar; returns the ``(timeframe, Bar)`` events it closed."""
+        ts = _epoch(timestamp)
+        high = price if high is None else high
+        low = price if low is None else low
+        open = price if open is None else open
+        if ts == self._last_ts:
+            added_volume = volume - self._last_volume
+        else:
+            if self._last_ts is not None and ts < self._last_ts:
+                raise ValueError(f"Out-of-order input: {timestamp} is before the previous input")
+            added_volume = volume
+        self._last_ts = ts
+        self._last_volume = volume
+
+        closed = []
+        for tf in self.timeframes:
+            seconds = self.seconds[tf]
+            bucket = ts - ts % seconds
+            bar = self._open[tf]
+            if bar is not None and bucket != bar[0]:
+                closed.append((tf, self._close(tf, bar)))
+                bar = None
+            if bar is None:
+                self._open[tf] = [bucket, open, high, low, price, added_volume]
+            else:
+                if high > bar[2]:
+                    bar[2] = high
+                if low < bar[3]:
+                    bar[3] = low
+                bar[4] = price
+                bar[5] += added_volume
+        if self.on_close is not None:
+            for tf, bar in closed:
+                self.on_close(tf, bar)
+        return closed
+
+    def update_many(self, timestamps, closes, highs=None, lows=None, volumes=None):
+        """Replay a block of history; returns every close event in order."""
+        highs = closes if highs is None else highs
+        lows = closes if lows is None else lows
+        volumes = [0.0] * len(closes) if volumes is None else volumes
+        events = []
+        for ts, close, high, low, volume in zip(timestamps, closes, highs, lows, volumes):
+            events.extend(self.update(ts, close, high, low, volume))
+        return events
+
+    def _close(self, tf, bar):
+        bucket, open_, high, low, close, volume = bar
+        closed = Bar(open_, high, low, close, volume, bucket)
+        self.history[tf].append_bar(closed)
+        return closed
+
+    def current(self, timeframe):
+        """The bar still being built for ``timeframe`` (None before the first input)."""
+        bar = self._open[timeframe]
+        if bar is None:
+            return None
+        return Bar(bar[1], bar[2], bar[3], bar[4], bar[5], bar[0])
+
+    def flush(self):
+        """Close every open bar, e.g. at the end of a replay."""
+        closed = []
+        for tf in self.timeframes:
+            bar = self._open[tf]
+            if bar is not None:
+                closed.append((tf, self._close(tf, bar)))
+                self._open[tf] = None
+        if self.on_close is not None:
+            for tf, bar in closed:
+                self.on_close(tf, bar)
+        return closed
+
+
+def vote_history(bot):
+    """Bars until every indicator in ``bot``'s 2 out of 3 vote has a value (50 for the defaults)."""
+    # The stochastic's %D needs k + d bars; the AO signal compares with the previous bar's value
+    return max(*bot.ema_windows, bot.k_period + bot.d_period, bot.ao_slow + 1)
+
+
+def history_period(timeframes, min_history=MIN_HISTORY, max_days=7):
+    """yfinance ``period`` in which the longest of ``timeframes`` closes ``min_history`` bars.
+
+    Adds two days for a weekend and caps the result at ``max_days``. Needs no
+    bot, so the data fetchers can be set up before any bot exists.
+    """
+    longest = max(timeframe_seconds(tf) for tf in timeframes)
+    days = math.ceil(min_history * longest / 86400) + 2
+    return f"{max(1, min(days, max_days))}d"
+
+
+class MultiTimeframeConsensus:
+    """Runs the momentum vote independently on several timeframes of one symbol.
+
+    A single ``BarAggregator`` builds every timeframe from the incoming
+    stream; each timeframe owns a streaming ``IndicatorEngine`` (configured
+    like ``bot``'s) that is updated only when one of its bars closes, and
+    keeps that timeframe's latest 2 out of 3 vote. The combined signal needs
+    ``min_agree`` timeframes (default: a majority) voting the same way.
+
+    A timeframe votes once it has ``min_history`` closed bars, by default
+    the bars ``bot``'s slowest EMA, stochastic or Awesome Oscillator needs.
+    For the longest timeframe that is a lot of source bars (50 hours of
+    1m bars for "1h" with the default windows): ``warmup_seconds`` and
+    ``history_period`` say how much history ``prime`` should be given.
+    """
+
+    def __init__(self, bot, timeframes=DEFAULT_TIMEFRAMES, depth=200, min_agree=None, min_history=None):
+        self.bot = bot
+        self.aggregator = BarAggregator(timeframes, depth, on_close=self._on_close)
+        self.timeframes = self.aggregator.timeframes
+        self.engines = {tf: bot._new_indicator_engine() for tf in self.timeframes}
+        self.votes = {tf: None for tf in self.timeframes}
+        self.min_agree = min_agree or len(self.timeframes) // 2 + 1
+        self.min_history = min_history or vote_history(bot)
+
+    @property
+    def warmup_seconds(self):
+        """Span of source history after which every timeframe has ``min_history`` closed bars."""
+        return self.min_history * self.aggregator.seconds[self.timeframes[-1]]
+
+    def history_period(self, max_days=7):
+        """yfinance ``period`` covering ``warmup_seconds`` (plus a weekend), at most ``max_days``."""
+        return history_period(self.timeframes, self.min_history, max_days)
+
+    def update(self, timestamp, price, high=None, low=None, volume=0.0):
+        return self.aggregator.update(timestamp, price, high, low, volume)
+
+    def prime(self, timestamps, closes, highs=None, lows=None, volumes=None):
+        """Warm every timeframe from historical source bars."""
+        self.aggregator.update_many(timestamps, closes, highs, lows, volumes)
+
+    def _on_close(self, timeframe, bar):
+        engine = self.engines[timeframe]
+        engine.update(bar.close, bar.high, bar.low)
+        self.votes[timeframe] = self._vote(engine, bar.close)
+
+    def _vote(self, engine, price):
+        """``"BUY"``, ``"SELL"`` or None from the same rules as ``MomentumBot._consensus_result``."""
+        if engine.count < self.min_history:
+            return None
+        bot = self.bot
+        fast, mid, slow = (engine.ema(w) for w in bot.ema_windows)
+        stoch_k, stoch_d = engine.stochastic.value
+        ao_current, ao_prev = engine.ao.value
+        stoch_signal, _ = bot.get_stochastic_signal(stoch_k, stoch_d, bot.overbought, bot.oversold)
+        ao_signal, _ = bot.get_ao_signal(ao_current, ao_prev)
+        trend, _ = bot.detect_trend_ema(fast, mid, slow, price)
+        buy_votes = (trend == "UPTREND") + (stoch_signal == "BUY") + (ao_signal == "BUY")
+        sell_votes = (trend == "DOWNTREND") + (stoch_signal == "SELL") + (ao_signal == "SELL")
+        if buy_votes >= 2:
+            return "BUY"
+        if sell_votes >= 2:
+            return "SELL"
+        return None
+
+    def result(self):
+        """Fields merged into the ``momentum_strategy`` result dict."""
+        buys = sum(vote == "BUY" for vote in self.votes.values())
+        sells = sum(vote == "SELL" for vote in self.votes.values())
+        signal = "BUY" if buys >= self.min_agree else "SELL" if sells >= self.min_agree else None
+        return {
+            'mtf_votes': dict(self.votes),
+            'mtf_signal': signal,
+            'mtf_agreement': max(buys, sells),
+        }
@@ -0,0 +1,242 @@
+import json
+import logging
+import logging.handlers
+import math
+import queue
+import sys
+import threading
+import time
+
+
+LOGGER_NAME = "momentum_bot"
+
+# Event types: every tick (DEBUG, full result dict), new signals (deduped and
+# rate-limited per symbol), executed trades and exits, and errors (always kept)
+TICK, SIGNAL, TRADE, EXIT, ERROR = "tick", "signal", "trade", "exit", "error"
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+def _json_default(value):
+    # NumPy scalars and anything else json doesn't know
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+def _clean(value):
+    """NaN/inf are not valid JSON; write them as null (also inside nested dicts)."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _clean(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_clean(item) for item in value]
+    return value
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, event, symbol, message and the record's ``fields``."""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'event': getattr(record, "event", None),
+            'symbol': getattr(record, "symbol", None),
+            'msg': record.getMessage(),
+        }
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry['suppressed'] = suppressed
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update({key: _clean(value) for key, value in fields.items()})
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=_json_default, ensure_ascii=False)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Compact one-line console display: ``HH:MM:SS [SYMBOL] message``."""
+
+    def format(self, record):
+        stamp = time.strftime("%H:%M:%S", time.localtime(record.created))
+        symbol = getattr(record, "symbol", None)
+        prefix = f"{stamp} [{symbol}] " if symbol else f"{stamp} "
+        suppressed = getattr(record, "suppressed", 0)
+        suffix = f" (+{suppressed} repeats suppressed)" if suppressed else ""
+        return prefix + record.getMessage() + suffix
+
+
+class SignalFilter(logging.Filter):
+    """Per-symbol deduplication and rate limiting of signal records.
+
+    A signal identical to the symbol's previous one is dropped until
+    ``repeat_after`` seconds have passed; distinct signals are limited to
+    ``rate`` per second per symbol (bursts up to ``burst``). The next record
+    that gets through carries the number dropped in between as
+    ``suppressed``. Records of other events pass untouched.
+    """
+
+    def __init__(self, repeat_after=60.0, rate=1.0, burst=5, clock=time.monotonic):
+        super().__init__()
+        self.repeat_after = repeat_after
+        self.rate = rate
+        self.burst = float(burst)
+        self.clock = clock
+        self._state = {}
+        self.suppressed_total = 0
+
+    def filter(self, record):
+        if getattr(record, "event", None) != SIGNAL:
+            return True
+        now = self.clock()
+        symbol = getattr(record, "symbol", None)
+        signature = getattr(record, "signature", None)
+        state = self._state.get(symbol)
+        if state is None:
+            # [last signature, last emitted at, tokens, last refill, suppressed since last emit]
+            state = self._state[symbol] = [None, -math.inf, self.burst, now, 0]
+        if signature == state[0] and now - state[1] < self.repeat_after:
+            return self._suppress(state)
+        state[2] = min(self.burst, state[2] + (now - state[3]) * self.rate)
+        state[3] = now
+        if state[2] < 1:
+            return self._suppress(state)
+        state[2] -= 1
+        record.suppressed = state[4]
+        state[0], state[1], state[4] = signature, now, 0
+        return True
+
+    def _suppress(self, state):
+        state[4] += 1
+        self.suppressed_total += 1
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler over a bounded queue that drops (and counts) records when full."""
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogWriter:
+    """Queue-backed background log writer.
+
+    The trading loop only formats a record and puts it on a bounded queue;
+    a ``QueueListener`` thread writes JSON lines to a size-rotated file and
+    the compact display to the console. If the writer falls behind, records
+    are dropped rather than blocking the caller.
+    """
+
+    def __init__(self, path="trading_bot.jsonl", level=logging.INFO, console=True,
+                 console_level=logging.INFO, max_bytes=10 * 1024 * 1024, backup_count=5,
+                 queue_size=10000, repeat_after=60.0, rate=1.0, burst=5):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.handler = NonBlockingQueueHandler(self.queue)
+        self.signal_filter = SignalFilter(repeat_after, rate, burst)
+        self.handler.addFilter(self.signal_filter)
+        handlers = []
+        if path:
+            file_handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+            file_handler.setFormatter(JsonLinesFormatter())
+            handlers.append(file_handler)
+        if console:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setLevel(console_level)
+            console_handler.setFormatter(ConsoleFormatter())
+            handlers.append(console_handler)
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.level = level
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self):
+        with self._lock:
+            if not self._started:
+                logger.setLevel(self.level)
+                logger.propagate = False
+                logger.addHandler(self.handler)
+                self.listener.start()
+                self._started = True
+        return self
+
+    def stop(self):
+        """Detach from the logger and flush everything still queued."""
+        with self._lock:
+            if self._started:
+                logger.removeHandler(self.handler)
+                self.listener.stop()
+                for handler in self.listener.handlers:
+                    handler.close()
+                self._started = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def dropped(self):
+        return self.handler.dropped
+
+    @property
+    def suppressed(self):
+        return self.signal_filter.suppressed_total
+
+
+def setup_logging(**kwargs):
+    """Start a ``LogWriter`` for the ``momentum_bot`` logger and return it (call ``stop()`` on exit)."""
+    return LogWriter(**kwargs).start()
+
+
+def log_event(event, symbol, message, level=logging.INFO, signature=None, **fields):
+    if logger.isEnabledFor(level):
+        logger.log(level, message, extra={'event': event, 'symbol': symbol,
+                                          'signature': signature, 'fields': fields})
+
+
+def log_error(symbol, message, exc_info=True, **fields):
+    """Log a failure with the traceback being handled (or of ``exc_info``, an exception; False for none)."""
+    logger.error(message, exc_info=exc_info, extra={'event': ERROR, 'symbol': symbol, 'signature': None,
+                                                    'fields': fields})
+
+
+def log_decision(symbol, price, result, exit_message=None, trade_msg=None, latency_ms=None, balance=None,
+                 bar=None):
+    """Log one strategy evaluation.
+
+    Exits and trades are always written; a non-empty signal list is written
+    as a ``signal`` event (deduplicated per symbol); the full
+    ``momentum_strategy`` result goes out as a DEBUG ``tick`` event, which
+    costs nothing unless DEBUG is enabled. Given the bar's ``IndicatorCache``
+    handle, the tick event also carries every indicator value computed for
+    the bar, read from the cache rather than recomputed.
+    """
+    if exit_message:
+        log_event(EXIT, symbol, f"🔔 {exit_message}", price=price, balance=balance)
+    if trade_msg:
+        log_event(TRADE, symbol, f"🎯 {trade_msg}", price=price, balance=balance,
+                  side="BUY" if result.get('buy_signal') else "SELL", stop_loss=result.get('stop_loss'),
+                  take_profit=result.get('take_profit'), position_size=result.get('position_size'))
+    signals = result.get('signals')
+    if signals:
+        log_event(SIGNAL, symbol, f"📢 Signals: {', '.join(signals)} | 📈 {result.get('trend')}",
+                  signature=tuple(signals), price=price, trend=result.get('trend'),
+                  buy_signal=result.get('buy_signal'), sell_signal=result.get('sell_signal'),
+                  mtf_signal=result.get('mtf_signal'), mtf_votes=result.get('mtf_votes'))
+    if logger.isEnabledFor(logging.DEBUG):
+        extra = {} if bar is None else {'indicators': bar.snapshot()}
+        log_event(TICK, symbol, f"tick {price}", level=logging.DEBUG, price=price,
+                  latency_ms=latency_ms, balance=balance, result=result, **extra)